@@ -0,0 +1,217 @@
+# asset_bundle.py
+
+import json
+import mmap
+import os
+import struct
+import numpy as np
+import pygame
+import config
+
+# File layout: magic, format version, index length, JSON index, then raw
+# RGBA pixel data for every frame starting at a page-aligned offset.
+MAGIC = b'ERAB'
+FORMAT_VERSION = 1
+PREFIX = struct.Struct('<4sII')
+DATA_ALIGNMENT = 4096
+
+
+def bundle_manifest():
+    """
+    AssetManager keys of every sprite and tile frame the game loads, so the
+    bundle holds them exactly as the loaders would produce them.
+    """
+    tile_size = (config.TILE_SIZE, config.TILE_SIZE)
+    player_size = (config.PLAYER_SPRITE_WIDTH * 2, config.PLAYER_SPRITE_HEIGHT * 2)
+    keys = [('image', path, tile_size) for path in config.TERRAIN_TILES.values()]
+    keys += [('image', path, tile_size) for path in (config.TREE_IMAGE, config.PATH_IMAGE, config.ROCK_IMAGE,
+                                                    config.SANDCASTLE_IMAGE, config.FLOWER_IMAGE)]
+    keys += [
+        ('frames', config.FRUIT_IMAGE, config.TILE_SIZE, config.TILE_SIZE, tile_size),
+        ('frames', config.OCEAN_ANIMATION, config.TILE_SIZE, config.TILE_SIZE, tile_size),
+        ('frames', config.MUSHROOM_IMAGE, config.MUSHROOM_FRAME_SIZE, config.MUSHROOM_FRAME_SIZE, tile_size),
+        ('frames', config.PLAYER_SPRITE_PATH, config.PLAYER_SPRITE_WIDTH, config.PLAYER_SPRITE_HEIGHT, player_size),
+        ('grid', config.EYE_ROCK_IMAGE, config.ENEMY_SHEET_ROWS, config.ENEMY_SHEET_COLS),
+        ('grid', config.FOOT_SOLDIER_IMAGE, config.ENEMY_SHEET_ROWS, config.ENEMY_SHEET_COLS),
+    ]
+    return keys
+
+
+def relative_path(path):
+    return os.path.relpath(path, config.BASE_DIR).replace(os.sep, '/')
+
+
+def bundle_key(key):
+    """
+    Serialize an AssetManager key, with file paths relative to BASE_DIR so a
+    bundle stays valid when the game directory moves.
+    """
+    return json.dumps([relative_path(part) if isinstance(part, str) and os.path.isabs(part) else part
+                       for part in key])
+
+
+def source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _data_offset(index_length):
+    end = PREFIX.size + index_length
+    return -(-end // DATA_ALIGNMENT) * DATA_ALIGNMENT
+
+
+def _scale(pixels, size):
+    """
+    Nearest-neighbour scale of a (height, width, 4) array, sampling the same
+    source pixels as pygame.transform.scale.
+    """
+    width, height = size
+    src_height, src_width = pixels.shape[:2]
+    ys = np.arange(height) * src_height // height
+    xs = np.arange(width) * src_width // width
+    return pixels[ys][:, xs]
+
+
+def _slice(pixels, frame_width, frame_height):
+    """
+    Cut a sheet into frames, row by row, like AssetManager.load_frames.
+    """
+    return [pixels[row * frame_height:(row + 1) * frame_height, col * frame_width:(col + 1) * frame_width]
+            for row in range(pixels.shape[0] // frame_height)
+            for col in range(pixels.shape[1] // frame_width)]
+
+
+def bake_frames(key, pixels):
+    """
+    Produce the list of RGBA frames an AssetManager key stands for.
+    """
+    kind = key[0]
+    if kind == 'image':
+        size = key[2]
+        return [_scale(pixels, size) if size else pixels]
+    if kind == 'frames':
+        _, _, frame_width, frame_height, size = key
+        frames = _slice(pixels, frame_width, frame_height)
+        return [_scale(frame, size) for frame in frames] if size else frames
+    if kind == 'grid':
+        _, _, rows, cols = key
+        return _slice(pixels, pixels.shape[1] // cols, pixels.shape[0] // rows)
+    raise ValueError(f"Unknown asset kind: {kind}")
+
+
+def bake(path=None, keys=None):
+    """
+    Offline step: decode every manifest image with Pillow, scale and slice it,
+    and write the raw RGBA frames plus an index to the bundle file.
+    Images that cannot be read are left out and keep loading from disk.
+    """
+    from PIL import Image  # Only needed when baking
+
+    path = path or config.ASSET_BUNDLE_PATH
+    entries = {}
+    sources = {}
+    blobs = []
+    offset = 0
+    for key in keys or bundle_manifest():
+        source = key[1]
+        try:
+            with Image.open(source) as image:
+                pixels = np.asarray(image.convert('RGBA'))
+        except OSError as e:
+            print(f"Skipping {relative_path(source)} in asset bundle: {e}")
+            continue
+        frames = []
+        for frame in bake_frames(key, pixels):
+            data = np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+            frames.append([offset, frame.shape[1], frame.shape[0]])
+            blobs.append(data)
+            offset += len(data)
+        entries[bundle_key(key)] = {'source': relative_path(source), 'frames': frames}
+        sources[relative_path(source)] = source_stamp(source)
+
+    index = json.dumps({'entries': entries, 'sources': sources}, sort_keys=True).encode('utf-8')
+    temp_path = path + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(index)))
+            f.write(index)
+            f.write(b'\0' * (_data_offset(len(index)) - PREFIX.size - len(index)))
+            for data in blobs:
+                f.write(data)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Unable to write asset bundle at {path}: {e}")
+        return None
+    print(f"Baked {len(entries)} assets ({offset / 1024:.1f} KB) into {path}")
+    return path
+
+
+class AssetBundle:
+    """
+    Read side of a baked bundle. The file is memory-mapped and each frame is
+    turned into a Surface straight from its raw RGBA bytes with
+    pygame.image.frombuffer, so no PNG is decoded at startup.
+
+    Entries whose source image changed since the bundle was baked are ignored,
+    so an out-of-date bundle never hides edited art.
+    """
+    def __init__(self, path, index, data, data_offset):
+        self.path = path
+        self.entries = index['entries']
+        self.data = data
+        self.data_offset = data_offset
+        self.stale_sources = set()
+        for source, stamp in index['sources'].items():
+            try:
+                if source_stamp(os.path.join(config.BASE_DIR, source)) != stamp:
+                    self.stale_sources.add(source)
+            except OSError:
+                self.stale_sources.add(source)
+        if self.stale_sources and config.DEBUG:
+            print(f"Asset bundle is stale for {len(self.stale_sources)} images; loading them from disk.")
+
+    @classmethod
+    def open(cls, path=None):
+        """
+        Map the bundle at `path`. Returns None if it is missing or unreadable.
+        """
+        path = path or config.ASSET_BUNDLE_PATH
+        try:
+            with open(path, 'rb') as f:
+                magic, version, index_length = PREFIX.unpack(f.read(PREFIX.size))
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    return None
+                index = json.loads(f.read(index_length).decode('utf-8'))
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, struct.error, ValueError):
+            return None
+        return cls(path, index, data, _data_offset(index_length))
+
+    def surface(self, offset, width, height):
+        start = self.data_offset + offset
+        view = memoryview(self.data)[start:start + width * height * 4]
+        # frombuffer shares the mapped bytes; convert to the display format so
+        # the Surface owns its pixels and blits at full speed
+        return pygame.image.frombuffer(view, (width, height), 'RGBA').convert_alpha()
+
+    def lookup(self, key):
+        """
+        Return the asset for an AssetManager key, shaped like its loader's
+        result, or None if the bundle does not hold an up-to-date copy.
+        """
+        entry = self.entries.get(bundle_key(key))
+        if entry is None or entry['source'] in self.stale_sources:
+            return None
+        frames = [self.surface(*frame) for frame in entry['frames']]
+        kind = key[0]
+        if kind == 'image':
+            return frames[0]
+        if kind == 'grid':
+            cols = key[3]
+            return [frames[row * cols:(row + 1) * cols] for row in range(key[2])]
+        return frames
+
+
+if __name__ == '__main__':
+    bake()
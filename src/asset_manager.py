@@ -0,0 +1,182 @@
+# asset_manager.py
+
+import pygame
+import config
+from asset_bundle import AssetBundle
+
+
+class AssetManager:
+    """
+    Central registry that loads, converts, scales and slices each asset file
+    once and hands out shared references afterwards.
+
+    Returned Surfaces and frame lists are shared between every caller, so
+    they must be treated as read-only (copy before drawing onto them).
+
+    Assets present in the compiled bundle (see asset_bundle.py) are taken
+    from it instead of being decoded, scaled and sliced from their PNGs.
+    """
+    def __init__(self):
+        self.cache = {}  # key -> loaded asset (Surface, list of Surfaces, dict, Sound, ...)
+        self.failures = {}  # key -> error message, so missing files are not retried
+        self.groups = {}  # group name -> list of loader callables
+        self.bundle = None
+        self.bundle_checked = False
+
+    def get_bundle(self):
+        """
+        Map the asset bundle on first use. Returns None if it is disabled or missing.
+        """
+        if not self.bundle_checked:
+            self.bundle_checked = True
+            if config.ASSET_BUNDLE_ENABLED:
+                self.bundle = AssetBundle.open()
+                if self.bundle is None and config.DEBUG:
+                    print("No asset bundle found; loading images from disk.")
+        return self.bundle
+
+    def get(self, key, loader):
+        """
+        Return the cached asset for `key`, calling `loader()` to create it on first use.
+        """
+        if key in self.cache:
+            return self.cache[key]
+        if key in self.failures:
+            raise pygame.error(self.failures[key])
+        bundle = self.get_bundle()
+        asset = bundle.lookup(key) if bundle is not None else None
+        if asset is not None:
+            self.cache[key] = asset
+            return asset
+        try:
+            asset = loader()
+        except (pygame.error, OSError, ValueError) as e:
+            self.failures[key] = str(e)
+            raise pygame.error(str(e)) from e
+        self.cache[key] = asset
+        return asset
+
+    def load_image(self, path, size=None):
+        """
+        Load an image with per-pixel alpha, optionally scaled to `size`.
+        Raises pygame.error if the file cannot be loaded.
+        """
+        def loader():
+            if size is None:
+                return self.load_image_file(path)
+            return pygame.transform.scale(self.load_image(path), size)
+        return self.get(('image', path, size), loader)
+
+    def load_image_file(self, path):
+        return pygame.image.load(path).convert_alpha()
+
+    def load_frames(self, path, frame_width, frame_height, size=None):
+        """
+        Slice a sprite sheet into frame_width x frame_height frames (row-major),
+        optionally scaling each frame to `size`.
+        """
+        def loader():
+            sheet = self.load_image(path)
+            sheet_width, sheet_height = sheet.get_size()
+            frames = []
+            for row in range(sheet_height // frame_height):
+                for col in range(sheet_width // frame_width):
+                    frame = sheet.subsurface((col * frame_width, row * frame_height, frame_width, frame_height))
+                    frames.append(pygame.transform.scale(frame, size) if size else frame)
+            return frames
+        return self.get(('frames', path, frame_width, frame_height, size), loader)
+
+    def load_grid(self, path, rows, cols):
+        """
+        Split a sprite sheet into a rows x cols grid of frames.
+        Returns a list of rows, each a list of subsurfaces of the shared sheet.
+        """
+        def loader():
+            sheet = self.load_image(path)
+            frame_width = sheet.get_width() // cols
+            frame_height = sheet.get_height() // rows
+            return [[sheet.subsurface((col * frame_width, row * frame_height, frame_width, frame_height))
+                     for col in range(cols)]
+                    for row in range(rows)]
+        return self.get(('grid', path, rows, cols), loader)
+
+    def load_variants(self, key, frames):
+        """
+        Tinted copies of `frames` (a Surface, or a list or dict of them, as
+        loaded for asset `key`) for every config.SPRITE_VARIANTS entry.
+        Built once per key; returns {variant: frames shaped like `frames`}.
+        """
+        return {variant: self.get(('variant', variant, key), lambda tint=tint: self.tint(frames, *tint))
+                for variant, tint in config.SPRITE_VARIANTS.items()}
+
+    def tint(self, frames, multiply, add):
+        if isinstance(frames, pygame.Surface):
+            image = frames.copy()
+            image.fill(multiply, special_flags=pygame.BLEND_RGB_MULT)
+            image.fill(add, special_flags=pygame.BLEND_RGB_ADD)
+            return image
+        if isinstance(frames, dict):
+            return {name: self.tint(value, multiply, add) for name, value in frames.items()}
+        return [self.tint(frame, multiply, add) for frame in frames]
+
+    def load_sound(self, path):
+        """
+        Load a sound effect. Returns None (once reported) if it cannot be loaded.
+        """
+        try:
+            return self.get(('sound', path), lambda: pygame.mixer.Sound(path))
+        except pygame.error as e:
+            if ('sound', path) not in self.cache:
+                self.cache[('sound', path)] = None
+                print(f"Unable to load sound at {path}: {e}")
+            return None
+
+    def define_group(self, name, *loaders):
+        """
+        Register callables that load a group of related assets, for preload().
+        """
+        self.groups.setdefault(name, []).extend(loaders)
+
+    def preload(self, *names):
+        """
+        Load every asset of the named groups now, e.g. behind a loading screen.
+        """
+        for name in names:
+            for loader in self.groups.get(name, []):
+                try:
+                    loader()
+                except pygame.error as e:
+                    print(f"Unable to preload asset group '{name}': {e}")
+
+    def report(self):
+        """
+        Return (key, bytes) for every resident asset, largest first.
+        Subsurfaces share their sheet's pixels and count as 0 bytes.
+        """
+        entries = [(key, self.asset_bytes(asset)) for key, asset in self.cache.items()]
+        return sorted(entries, key=lambda entry: entry[1], reverse=True)
+
+    def resident_bytes(self):
+        return sum(size for _, size in self.report())
+
+    def print_report(self):
+        for key, size in self.report():
+            print(f"{size / 1024:10.1f} KB  {key}")
+        print(f"{len(self.cache)} assets resident, {self.resident_bytes() / 1024:.1f} KB total")
+
+    def asset_bytes(self, asset):
+        if isinstance(asset, pygame.Surface):
+            if asset.get_parent() is not None:
+                return 0
+            return asset.get_width() * asset.get_height() * asset.get_bytesize()
+        if isinstance(asset, dict):
+            return sum(self.asset_bytes(value) for value in asset.values())
+        if isinstance(asset, (list, tuple)):
+            return sum(self.asset_bytes(value) for value in asset)
+        if isinstance(asset, pygame.mixer.Sound):
+            return len(asset.get_raw())
+        return 0
+
+
+# Shared registry used by the whole game
+assets = AssetManager()
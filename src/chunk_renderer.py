@@ -0,0 +1,305 @@
+# chunk_renderer.py
+
+from collections import OrderedDict
+import numpy as np
+import pygame
+import config
+from tile_store import TERRAIN_IDS
+
+WATER_ID = TERRAIN_IDS['water']
+
+
+class ChunkRenderer:
+    """
+    Draws the world terrain from pre-rendered per-chunk Surfaces.
+
+    Each land tile of a chunk is copied from its pre-composited TileAtlas
+    cell, once, into a single Surface and kept in an LRU cache bounded by
+    config.CHUNK_CACHE_BUDGET_MB. A cached Surface is rebuilt only when its
+    chunk's version changes. Water is left transparent in the chunk Surfaces
+    and drawn underneath from a pre-tiled plane per animation frame, so water
+    animation never invalidates the cache.
+
+    Chunks and water are composited into a terrain back-buffer that scrolls
+    with the camera, so a frame normally costs one blit of the buffer plus
+    the strips of terrain the camera has just uncovered.
+    """
+    def __init__(self, world):
+        self.world = world
+        self.images = world.images
+        self.chunk_size = config.CHUNK_SIZE
+        self.chunk_pixels = self.chunk_size * config.TILE_SIZE
+        self.budget_bytes = config.CHUNK_CACHE_BUDGET_MB * 1024 * 1024
+        self.cache = OrderedDict()  # (cx, cy) -> (version, has_water, surface), least recently used first
+        self.cache_bytes = 0
+        self.water_planes = []
+        self.water_plane_size = (0, 0)
+        self.drawn_versions = {}  # (cx, cy) -> chunk version on screen, for changed_rects()
+        self.buffer = None  # Terrain back-buffer, a margin larger than the view on every side
+        self.buffer_x = 0  # World pixel at the buffer's top-left corner
+        self.buffer_y = 0
+        self.buffer_frame = 0  # Water animation frame the buffer was drawn with
+        self.buffer_versions = {}  # (cx, cy) -> chunk version drawn into the buffer
+
+    def build_water_planes(self, width, height):
+        """
+        Pre-tile every water animation frame into a plane one tile larger than
+        the back-buffer, so any frame of water in it is a single blit.
+        """
+        width += config.TILE_SIZE
+        height += config.TILE_SIZE
+        self.water_planes = []
+        for frame in self.images['water']:
+            plane = pygame.Surface((width, height)).convert()
+            for y in range(0, height, config.TILE_SIZE):
+                for x in range(0, width, config.TILE_SIZE):
+                    plane.blit(frame, (x, y))
+            self.water_planes.append(plane)
+        self.water_plane_size = (width, height)
+
+    def build_chunk_surface(self, chunk):
+        """
+        Rasterize one chunk. Returns (has_water, surface).
+        """
+        size = self.chunk_size
+        tiles = self.world.tiles
+        # Only tiles inside the map are drawn; edge chunks are padded past it
+        cols = min(size, tiles.cols - chunk.cx * size)
+        rows = min(size, tiles.rows - chunk.cy * size)
+        terrain = chunk.terrain[:rows, :cols]
+        land = terrain != WATER_ID  # Water is drawn from the animated water plane
+
+        has_water = not land.all()
+        full = cols == size and rows == size
+        if has_water or not full:
+            surface = pygame.Surface((self.chunk_pixels, self.chunk_pixels), pygame.SRCALPHA).convert_alpha()
+            surface.fill((0, 0, 0, 0))
+        else:
+            surface = pygame.Surface((self.chunk_pixels, self.chunk_pixels)).convert()
+
+        # Every land tile is a single pre-composited atlas cell; look up each
+        # distinct (terrain, overlay, fruit) combination only once
+        keys = (terrain.astype(np.int32) << 16) | (chunk.overlay[:rows, :cols].astype(np.int32) << 8) \
+            | chunk.fruit[:rows, :cols]
+        combos, cell_index = np.unique(keys[land], return_inverse=True)
+        atlas = self.world.atlas
+        cells = [atlas.rect_for(key >> 16, (key >> 8) & 0xFF, key & 0xFF) for key in combos.tolist()]
+        atlas_surface = atlas.surface
+        tile_rows, tile_cols = np.nonzero(land)
+        surface.blits([(atlas_surface, (c * config.TILE_SIZE, r * config.TILE_SIZE), cells[i])
+                       for r, c, i in zip(tile_rows.tolist(), tile_cols.tolist(), cell_index.tolist())],
+                      doreturn=False)
+
+        # Water cells leave their terrain to the water plane but still show
+        # any overlay or fruit on top of it
+        decorated = ~land & (keys & 0xFFFF != 0)
+        if decorated.any():
+            tile_rows, tile_cols = np.nonzero(decorated)
+            # The cells are still fully transparent, so taking the brighter of
+            # each channel copies the decal in unblended
+            surface.blits([(atlas.decal_for((key >> 8) & 0xFF, key & 0xFF),
+                            (c * config.TILE_SIZE, r * config.TILE_SIZE), None, pygame.BLEND_RGBA_MAX)
+                           for r, c, key in zip(tile_rows.tolist(), tile_cols.tolist(),
+                                                keys[decorated].tolist())],
+                          doreturn=False)
+        return has_water, surface
+
+    def get_chunk_surface(self, chunk):
+        """
+        Return (has_water, surface) for a chunk, rebuilding it if its contents changed.
+        """
+        key = (chunk.cx, chunk.cy)
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] == chunk.version:
+            self.cache.move_to_end(key)
+            return entry[1], entry[2]
+
+        if entry is not None:
+            self.cache_bytes -= self.surface_bytes(entry[2])
+            del self.cache[key]
+        has_water, surface = self.build_chunk_surface(chunk)
+        self.cache[key] = (chunk.version, has_water, surface)
+        self.cache_bytes += self.surface_bytes(surface)
+        self.trim()
+        return has_water, surface
+
+    def surface_bytes(self, surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def trim(self):
+        """
+        Evict least recently used chunk Surfaces until the cache fits its budget.
+        The most recently used entry is always kept.
+        """
+        while self.cache_bytes > self.budget_bytes and len(self.cache) > 1:
+            _, (_, _, surface) = self.cache.popitem(last=False)
+            self.cache_bytes -= self.surface_bytes(surface)
+
+    def invalidate(self):
+        """
+        Drop every cached chunk Surface (e.g. after tile images change).
+        """
+        self.cache.clear()
+        self.cache_bytes = 0
+
+    def chunks_in(self, left, top, width, height):
+        """
+        (chunk, has_water, surface) for every loaded chunk overlapping a
+        rect of world pixels.
+        """
+        tiles = self.world.tiles
+        cx0 = max(0, left // self.chunk_pixels)
+        cy0 = max(0, top // self.chunk_pixels)
+        cx1 = min(tiles.chunks_x, (left + width - 1) // self.chunk_pixels + 1)
+        cy1 = min(tiles.chunks_y, (top + height - 1) // self.chunk_pixels + 1)
+
+        found = []
+        for cy in range(cy0, cy1):
+            for cx in range(cx0, cx1):
+                chunk = tiles.get_chunk(cx, cy)
+                if chunk is None:
+                    continue
+                has_water, chunk_surface = self.get_chunk_surface(chunk)
+                found.append((chunk, has_water, chunk_surface))
+        return found
+
+    def visible_chunks(self, camera):
+        """
+        (chunk, has_water, surface, screen position) for every loaded chunk in view.
+        """
+        return [(chunk, has_water, chunk_surface, (chunk.cx * self.chunk_pixels - camera.offset_x,
+                                                   chunk.cy * self.chunk_pixels - camera.offset_y))
+                for chunk, has_water, chunk_surface in
+                self.chunks_in(camera.offset_x, camera.offset_y, camera.width, camera.height)]
+
+    def draw(self, surface, camera, animation_frame=0):
+        """
+        Draw the visible part of the world: a single blit from the terrain
+        back-buffer, after bringing the buffer up to date.
+        """
+        self.update_buffer(camera, animation_frame)
+        surface.blit(self.buffer, (0, 0), (camera.offset_x - self.buffer_x, camera.offset_y - self.buffer_y,
+                                           camera.width, camera.height))
+
+    # --- Terrain back-buffer ---------------------------------------------
+
+    def update_buffer(self, camera, animation_frame):
+        """
+        Keep the back-buffer covering the camera view.
+
+        The buffer is larger than the view by config.TERRAIN_BUFFER_MARGIN on
+        every side, so small camera moves need no drawing at all. Once the
+        view leaves the buffer, the buffer is re-centred on it with
+        Surface.scroll and only the newly exposed strips are rasterized.
+        Jumps further than the buffer is wide redraw it entirely.
+        """
+        margin = config.TERRAIN_BUFFER_MARGIN
+        size = (camera.width + 2 * margin, camera.height + 2 * margin)
+        if self.buffer is None or self.buffer.get_size() != size:
+            self.buffer = pygame.Surface(size).convert()
+            self.buffer_x = camera.offset_x - margin
+            self.buffer_y = camera.offset_y - margin
+            self.rasterize(self.buffer.get_rect(), animation_frame)
+
+        width, height = size
+        view = pygame.Rect(camera.offset_x - self.buffer_x, camera.offset_y - self.buffer_y, camera.width, camera.height)
+        if not self.buffer.get_rect().contains(view):
+            dx = camera.offset_x - margin - self.buffer_x
+            dy = camera.offset_y - margin - self.buffer_y
+            self.buffer_x += dx
+            self.buffer_y += dy
+            if abs(dx) >= width or abs(dy) >= height:
+                self.buffer_versions.clear()
+                self.rasterize(self.buffer.get_rect(), animation_frame)
+            else:
+                self.buffer.scroll(-dx, -dy)
+                # Newly exposed columns, then newly exposed rows
+                if dx:
+                    self.rasterize(pygame.Rect(width - dx if dx > 0 else 0, 0, abs(dx), height), animation_frame)
+                if dy:
+                    self.rasterize(pygame.Rect(0, height - dy if dy > 0 else 0, width, abs(dy)), animation_frame)
+
+        self.refresh_stale(animation_frame)
+
+    def refresh_stale(self, animation_frame):
+        """
+        Rasterize again the parts of the buffer whose chunks changed since
+        they were drawn (rebuilt, loaded or evicted), and the chunks with
+        water when the water animation has moved on.
+        """
+        width, height = self.buffer.get_size()
+        water_changed = animation_frame != self.buffer_frame
+        self.buffer_frame = animation_frame
+        inside = set()
+        stale = []
+        for chunk, has_water, _ in self.chunks_in(self.buffer_x, self.buffer_y, width, height):
+            key = (chunk.cx, chunk.cy)
+            inside.add(key)
+            if self.buffer_versions.get(key) != chunk.version or (water_changed and has_water):
+                stale.append(key)
+        for key in list(self.buffer_versions):
+            if key not in inside:
+                del self.buffer_versions[key]
+                stale.append(key)  # Evicted while on screen; anything still in view goes back to black
+        buffer_rect = self.buffer.get_rect()
+        for cx, cy in stale:
+            rect = pygame.Rect(cx * self.chunk_pixels - self.buffer_x, cy * self.chunk_pixels - self.buffer_y,
+                               self.chunk_pixels, self.chunk_pixels).clip(buffer_rect)
+            if rect.width and rect.height:
+                self.rasterize(rect, animation_frame)
+
+    def rasterize(self, rect, animation_frame):
+        """
+        Draw the terrain under `rect` (in buffer pixels) into the back-buffer:
+        black outside the map, the water plane, then the chunk Surfaces.
+        """
+        buffer = self.buffer
+        buffer.set_clip(rect)
+        buffer.fill(config.BLACK)
+        found = self.chunks_in(self.buffer_x + rect.x, self.buffer_y + rect.y, rect.width, rect.height)
+        if any(has_water for _, has_water, _ in found):
+            self.draw_water(buffer, rect, animation_frame)
+        buffer.blits([(chunk_surface, (chunk.cx * self.chunk_pixels - self.buffer_x,
+                                       chunk.cy * self.chunk_pixels - self.buffer_y))
+                      for chunk, _, chunk_surface in found], doreturn=False)
+        buffer.set_clip(None)
+        for chunk, _, _ in found:
+            self.buffer_versions[(chunk.cx, chunk.cy)] = chunk.version
+
+    def changed_rects(self, camera, water_changed=False):
+        """
+        Screen rects of the visible chunks that look different since the last
+        call: chunks rebuilt or loaded in the meantime, and every chunk with
+        water when the water animation has moved on.
+        """
+        versions = {}
+        rects = []
+        for chunk, has_water, _, position in self.visible_chunks(camera):
+            key = (chunk.cx, chunk.cy)
+            versions[key] = chunk.version
+            if self.drawn_versions.get(key) != chunk.version or (water_changed and has_water):
+                rects.append(pygame.Rect(position, (self.chunk_pixels, self.chunk_pixels)))
+        # Chunks that were on screen before but are gone now (evicted) left their old picture behind
+        for key in self.drawn_versions.keys() - versions.keys():
+            rects.append(pygame.Rect(key[0] * self.chunk_pixels - camera.offset_x,
+                                     key[1] * self.chunk_pixels - camera.offset_y,
+                                     self.chunk_pixels, self.chunk_pixels))
+        self.drawn_versions = versions
+        return rects
+
+    def draw_water(self, surface, rect, animation_frame):
+        """
+        Blit the current water animation frame under the map area of `rect`
+        (in buffer pixels).
+        """
+        width, height = surface.get_size()
+        if self.water_plane_size != (width + config.TILE_SIZE, height + config.TILE_SIZE):
+            self.build_water_planes(width, height)
+        plane = self.water_planes[animation_frame % len(self.water_planes)]
+        # Align the tiled plane with the world tile grid and clip it to the map
+        map_rect = pygame.Rect(-self.buffer_x, -self.buffer_y, self.world.width, self.world.height)
+        surface.set_clip(map_rect.clip(rect))
+        left = self.buffer_x + rect.x
+        top = self.buffer_y + rect.y
+        surface.blit(plane, (rect.x - left % config.TILE_SIZE, rect.y - top % config.TILE_SIZE))
+        surface.set_clip(rect)
@@ -21,6 +21,7 @@ SANDCASTLE_IMAGE = os.path.join(BASE_DIR, 'assets', 'images', 'sandcastle.png')
 FRUIT_IMAGE = os.path.join(BASE_DIR, 'assets', 'images', 'fruit.png')  # 4x4 sprite sheet
 FLOWER_IMAGE = os.path.join(BASE_DIR, 'assets', 'images', 'flower.png')
 MUSHROOM_IMAGE = os.path.join(BASE_DIR, 'assets', 'images', 'mushroom.png')
+MUSHROOM_FRAME_SIZE = 16  # mushroom.png is a sheet of 16x16 frames
 
 # Animated Tiles
 OCEAN_ANIMATION = os.path.join(BASE_DIR, 'assets', 'images', 'ocean.png')  # Changed from ocean.gif
@@ -28,6 +29,22 @@ OCEAN_ANIMATION = os.path.join(BASE_DIR, 'assets', 'images', 'ocean.png')  # Cha
 # Corrected Enemy Image Paths
 EYE_ROCK_IMAGE = os.path.join(BASE_DIR, 'assets', 'enemies', 'eye-rock.png')
 FOOT_SOLDIER_IMAGE = os.path.join(BASE_DIR, 'assets', 'enemies', 'foot-soldier.png')
+ENEMY_SHEET_ROWS = 4  # One row per direction
+ENEMY_SHEET_COLS = 3  # Walking frames per direction
+
+# Compiled asset bundle: every sprite and tile frame pre-scaled into raw RGBA
+# buffers. Bake it with `python src/asset_bundle.py`; without it (or when a
+# source image changed since baking) assets are decoded from the PNGs.
+ASSET_BUNDLE_ENABLED = True
+ASSET_BUNDLE_PATH = os.path.join(BASE_DIR, 'cache', 'assets.bundle')
+
+# Tinted sprite variants, built once per animation frame at load. Each
+# pixel's color becomes rgb * multiply / 255 + add; alpha is kept.
+SPRITE_VARIANTS = {
+    'flash': ((255, 255, 255), (255, 0, 0)),  # Enemy hit flash: push red to full
+    'damage': ((155, 155, 155), (100, 0, 0)),  # Player hurt: blend 40% towards red
+    'freeze': ((128, 128, 128), (50, 90, 128)),  # Frozen: blend 50% towards ice blue
+}
 
 # Screen dimensions
 WIDTH = 800
@@ -54,13 +71,94 @@ PLAYER_ANIMATION_SPEED = 0.1  # Adjust for animation smoothness
 # Frames per second
 FPS = 60
 
+# Presentation: while the camera is still, redraw and present only the parts of the screen that changed
+DIRTY_RECTS = True
+DIRTY_RECT_LIMIT = 32  # More separate changed regions than this and the whole screen is redrawn
+DIRTY_RECT_MAX_COVERAGE = 0.5  # Fraction of the screen past which a full redraw is cheaper
+RENDER_SCALE = 1  # World resolution as a fraction of the window (0.5 draws a quarter of the pixels); the UI stays at full resolution
+
 # Tile configuration
 TILE_SIZE = 16  # 16x16 pixels
+CHUNK_SIZE = 32  # Tiles per side of a world storage chunk
+CHUNK_CACHE_BUDGET_MB = 64  # Memory budget for pre-rendered chunk Surfaces
+TERRAIN_BUFFER_MARGIN = 4 * TILE_SIZE  # Extra terrain kept drawn around the view, so small camera moves draw nothing new
 
 # World dimensions
 WORLD_WIDTH = 900 * TILE_SIZE  # 4800 pixels
 WORLD_HEIGHT = 900 * TILE_SIZE  # 4800 pixels
 
+# World generation parameters
+WORLD_SEED = 1337  # Seeds overlay, tree and fruit placement
+NOISE_SCALE = 200.0  # Larger values give smoother biome transitions
+NOISE_OCTAVES = 4
+NOISE_PERSISTENCE = 0.5
+NOISE_LACUNARITY = 2.0
+NOISE_REPEAT = 1024  # Noise wraps after this many noise units
+NOISE_BASE = 0
+GENERATION_REGION_CHUNKS = 8  # Chunks per side of each independently generated region
+GENERATION_WORKERS = None  # Worker processes for world generation (None = one per CPU core)
+PARALLEL_GENERATION_MIN_TILES = 2048 * 2048  # Smaller maps are generated in-process
+WORLD_CACHE_ENABLED = True  # Reuse generated worlds from disk when parameters match
+WORLD_CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+
+# World streaming: generate chunks on first touch instead of at startup.
+# Makes startup cost independent of WORLD_WIDTH/WORLD_HEIGHT, so very large
+# ("infinite") worlds become practical.
+WORLD_STREAMING = False
+STREAM_PRELOAD_MARGIN = 1  # Chunks generated ahead of the visible area
+STREAM_KEEP_RADIUS = 4  # Chunks beyond the visible area kept resident before eviction
+
+# Overlays that block movement (terrain-wise, only water does)
+BLOCKING_OVERLAYS = ['rock', 'sandcastle']
+
+# Terrain and overlays that block enemies' line of sight
+SIGHT_BLOCKING_TERRAIN = ['mountain']
+SIGHT_BLOCKING_OVERLAYS = ['tree', 'rock']
+
+# Enemy pathfinding
+FLOW_FIELD_RADIUS = 24  # Tiles around the player covered by the chase flow field
+PATH_QUERY_BUDGET = 2  # Most long-range paths planned per frame, for chasers the flow field cannot route
+PATH_REPLAN_DISTANCE = 4  # Tiles the player may move from the end of a chaser's path before it is planned again
+PATHFINDER_WARM_BUDGET = 1  # Chunks per frame whose abstract pathfinding graph is built ahead of time
+
+# Enemy AI level of detail: enemies far from the player think less often and
+# make up for skipped frames with longer steps
+AI_NEAR_MARGIN = 200  # Pixels beyond the camera view's half-diagonal within which enemies think every frame
+AI_MID_DISTANCE = 1600  # Pixels within which enemies think every AI_MID_INTERVAL frames
+AI_MID_INTERVAL = 4  # Frames between AI ticks for mid-range enemies
+AI_FAR_INTERVAL = 30  # Frames between coarse AI ticks for far enemies (0 freezes them)
+AI_TICK_BUDGET = 1500  # Most mid-range and far enemies ticked in one frame; the rest wait their turn
+
+# Enemy crowd separation: enemies closer than SEPARATION_RADIUS (between
+# centers) push each other apart, found through a grid of that cell size
+SEPARATION_RADIUS = 32  # Pixels
+SEPARATION_STRENGTH = 1.5  # Pixels per frame an enemy is pushed by a fully overlapping neighbour
+
+# Enemy queries (rects, radius, nearest): live enemies are bucketed by the
+# grid cell of their top-left corner, rebuilt once per frame after they move
+ENEMY_INDEX_CELL_SIZE = 64  # Pixels
+
+# Enemy spawning: the spawn director keeps the chunks around the player
+# populated. Chunks far from the player go to sleep: their enemies are
+# stored as compact records and only simulated again (catching up on the
+# time that passed) when the chunk wakes.
+ENEMY_DENSITY = {'water': 0, 'sand': 0.5, 'grass': 1, 'forest': 1.5, 'mountain': 1}  # Target enemies per chunk of each terrain
+ENEMY_BIOME_TYPES = {  # Enemy types that spawn on each terrain
+    'sand': ['eye-rock'],
+    'grass': ['foot-soldier', 'eye-rock'],
+    'forest': ['foot-soldier'],
+    'mountain': ['eye-rock'],
+}
+SPAWN_RADIUS = 2  # Chunks around the player's chunk kept populated
+WAKE_RADIUS = 3  # Sleeping chunks within this many chunks of the player's chunk wake up
+SLEEP_RADIUS = 4  # Enemies more than this many chunks from the player's chunk go to sleep
+SPAWN_INTERVAL = 30  # Frames between spawn director passes
+SPAWN_BUDGET = 4  # Most enemies spawned per pass
+SLEEP_BUDGET = 16  # Most enemies put to sleep per pass
+CATCH_UP_STEPS = 8  # Most wander steps simulated for a waking chunk, however long it slept
+SPAWN_ATTEMPTS = 4  # Random positions tried per enemy before giving up until the next pass
+ENEMY_POOL_SIZE = 128  # Enemy slots (arrays and sprite views) allocated up front
+
 # Quest configuration
 QUEST_TYPES = ['collection', 'exploration', 'combat', 'delivery']
 
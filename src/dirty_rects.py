@@ -0,0 +1,70 @@
+# dirty_rects.py
+
+import pygame
+import config
+
+
+class DirtyRectTracker:
+    """
+    Works out which parts of the screen have to be redrawn this frame.
+
+    Every frame the caller hands over a key describing everything that
+    affects the whole screen at once (camera offset, lighting colour, open
+    menus), the sprites on screen as (image, screen rect) pairs, and any
+    other rects known to have changed (e.g. animated water). While the key
+    stays the same, only the sprites that appeared, disappeared, moved or
+    changed image are dirty, together with wherever the UI was drawn last
+    frame. When the key changes, or too much of the screen changed anyway,
+    plan() asks for a full redraw instead.
+    """
+    def __init__(self, width, height, enabled=config.DIRTY_RECTS):
+        self.screen = pygame.Rect(0, 0, width, height)
+        self.enabled = enabled
+        self.previous_key = None
+        self.previous_sprites = set()
+        self.previous_ui = []
+
+    def plan(self, key, sprites, changed):
+        """
+        Rects to redraw this frame, or None if the whole screen should be redrawn.
+        """
+        moved = sprites ^ self.previous_sprites
+        self.previous_sprites = sprites
+        full = not self.enabled or key != self.previous_key
+        self.previous_key = key
+        if full:
+            return None
+
+        rects = [pygame.Rect(rect) for _, rect in moved]
+        rects = merge_rects([rect.clip(self.screen) for rect in rects + changed + self.previous_ui])
+        if len(rects) > config.DIRTY_RECT_LIMIT or \
+                sum(rect.width * rect.height for rect in rects) > config.DIRTY_RECT_MAX_COVERAGE * self.screen.width * self.screen.height:
+            return None
+        return rects
+
+    def finish(self, rects, ui_rects):
+        """
+        Remember where the UI was drawn. Returns False if part of it landed
+        outside `rects`, in which case the frame has to be redrawn in full.
+        """
+        self.previous_ui = ui_rects
+        if rects is None:
+            return True
+        return all(any(rect.contains(ui_rect) for rect in rects)
+                   for ui_rect in ui_rects if ui_rect.width and ui_rect.height)
+
+
+def merge_rects(rects):
+    """
+    Union overlapping rects until none overlap. Empty rects are dropped.
+    """
+    merged = []
+    for rect in rects:
+        if not (rect.width and rect.height):
+            continue
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
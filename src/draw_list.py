@@ -0,0 +1,79 @@
+# draw_list.py
+
+# Layers in drawing order; sprites in the y-sorted ones are drawn back to front
+DRAW_LAYERS = ('items', 'entities', 'particles')
+SORTED_LAYERS = ('entities',)
+
+
+class DrawList:
+    """
+    Per-frame list of world sprites to draw.
+
+    Each frame the world, enemies, player and particles submit (image,
+    position) pairs in world coordinates. Anything outside the camera view
+    is dropped on submission, the remaining entries are kept per layer, and
+    flush() draws every layer with a single Surface.fblits (or blits) call
+    instead of one blit call per sprite. Entries of the y-sorted layers are
+    drawn in order of their bottom edge, so sprites lower on the screen
+    overlap those behind them.
+    """
+    def __init__(self, layers=DRAW_LAYERS, sorted_layers=SORTED_LAYERS):
+        self.layers = {layer: [] for layer in layers}
+        self.sorted_layers = set(sorted_layers)
+        self.offset_x = 0
+        self.offset_y = 0
+        self.view_width = 0
+        self.view_height = 0
+
+    def begin(self, camera):
+        """
+        Empty every layer and cull against the camera's current view.
+        """
+        for entries in self.layers.values():
+            entries.clear()
+        self.offset_x = camera.offset_x
+        self.offset_y = camera.offset_y
+        self.view_width = camera.width
+        self.view_height = camera.height
+
+    def submit(self, layer, image, x, y):
+        """
+        Queue `image` with its top-left corner at world position (x, y).
+        Returns False if it lies outside the view and was dropped.
+        """
+        width, height = image.get_size()
+        screen_x = int(x) - self.offset_x
+        screen_y = int(y) - self.offset_y
+        if screen_x + width <= 0 or screen_y + height <= 0 or \
+                screen_x >= self.view_width or screen_y >= self.view_height:
+            return False
+        # Sort key first, so sorting the layer needs no key function
+        self.layers[layer].append((screen_y + height, image, (screen_x, screen_y)))
+        return True
+
+    def flush(self, surface):
+        """
+        Draw every layer onto `surface`, in layer order.
+        """
+        # fblits skips building the list of changed rects; it is new in pygame 2.6
+        fblits = getattr(surface, 'fblits', None)
+        for layer, entries in self.layers.items():
+            if not entries:
+                continue
+            if layer in self.sorted_layers:
+                entries.sort(key=lambda entry: entry[0])  # Stable: equal rows keep submission order
+            sequence = [(image, position) for _, image, position in entries]
+            if fblits is not None:
+                fblits(sequence)
+            else:
+                surface.blits(sequence, doreturn=False)
+
+    def sprites(self):
+        """
+        Set of (image, screen rect) pairs queued this frame, for dirty-rect tracking.
+        """
+        return {(image, position + image.get_size())
+                for entries in self.layers.values() for _, image, position in entries}
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.layers.values())
@@ -0,0 +1,726 @@
+# enemy_system.py
+
+import itertools
+import math
+import numpy as np
+import pygame
+import config
+from enemy import Enemy, DIRECTIONS, ENEMY_TYPES
+
+# Enemy behaviour (the same values the per-sprite Enemy class used)
+ENEMY_HEALTH = 50
+ENEMY_SPEED = 2
+CHASE_DISTANCE = 150  # Pixels between centers below which an enemy chases the player
+IDLE_TURN_CHANCE = 2 / 101  # Chance per frame that an idle enemy picks a new direction
+ANIMATION_FRAME_TIME = 10  # Frames per animation frame
+ATTACK_SPEED = 60  # Frames between contact attacks
+CONTACT_DAMAGE = 5
+FLASH_DURATION = 10  # Frames an enemy flashes after being hit
+INDEX_TAIL_LIMIT = 256  # Enemies spawned since the index was built that are tested one by one before rebuilding it
+
+IDLE = 0
+CHASING = 1
+
+# Unit step for each entry of DIRECTIONS
+DIRECTION_STEPS = np.array([{'up': (0, -1), 'down': (0, 1), 'left': (-1, 0), 'right': (1, 0)}[direction]
+                            for direction in DIRECTIONS], dtype=np.float64)
+DIRECTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS)}
+
+# Per-enemy arrays and their types; row i of every array belongs to enemy i
+FIELDS = {
+    'x': np.float64,
+    'y': np.float64,
+    'vx': np.float64,
+    'vy': np.float64,
+    'health': np.int32,
+    'max_health': np.int32,
+    'state': np.int8,
+    'direction': np.int8,
+    'attack_cooldown': np.int32,
+    'animation_timer': np.int32,
+    'animation_frame': np.int32,
+    'flash_timer': np.int32,
+    'type_id': np.int16,
+    'width': np.int32,
+    'height': np.int32,
+    'serial': np.int64,  # Spawn order, to keep query results in a stable order
+    'last_tick': np.int64,  # Frame of the enemy's last AI tick
+    'sight_col': np.int32,  # Tile the enemy was on when it last looked for the player (-1: look again)
+    'sight_row': np.int32,
+    'sees_player': np.bool_,  # Result of that look
+    'on_route': np.bool_,  # Chasing along a long-range path (see follow_routes())
+}
+
+# Compact form of a sleeping enemy (see store() and restore())
+RECORD_DTYPE = np.dtype([
+    ('type_id', np.int16),
+    ('x', np.float32),
+    ('y', np.float32),
+    ('health', np.int16),
+    ('state', np.int8),
+    ('direction', np.int8),
+])
+
+
+class EnemySystem:
+    """
+    Simulation of all enemies as a structure of arrays.
+
+    Positions, velocities, health, AI state, cooldowns and animation timers
+    live in NumPy arrays, and update() advances every enemy at once: the
+    distance test, the chase/idle decision, movement, clamping to the world,
+    walkability and contact damage are whole-array operations. Only the
+    enemies that actually hit the player this frame are touched one by one.
+
+    Chasers steer by the world's flow field towards the player, and where
+    the way round leaves the field they follow a path from the world's
+    hierarchical pathfinder (see follow_routes()).
+
+    Enemies near the player (anywhere the camera can show) think every
+    frame. Further away they are ticked every few frames (level of detail,
+    see schedule()), with their moves and timers scaled by the frames they
+    skipped, and at most config.AI_TICK_BUDGET of them per frame.
+
+    Each enemy also has a thin Enemy sprite (a view onto its row of the
+    arrays) in `group` for drawing and attacks. Rect, radius and nearest
+    queries go through a grid index: the rows sorted by the cell of their
+    top-left corner, rebuilt from the arrays by one argsort on the first
+    query after the enemies move (see build_index()), rather than re-filing
+    thousands of moving sprites one by one. Live enemies occupy rows
+    [0, count); removing one moves the last enemy into its row.
+    """
+    def __init__(self, player, world, group, camera, capacity=config.ENEMY_POOL_SIZE):
+        self.player = player
+        self.world = world
+        self.camera = camera  # Its view size sets how far from the player enemies think every frame
+        self.group = group  # Sprite group holding the Enemy views
+        self.count = 0
+        self.capacity = capacity
+        for name, dtype in FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.views = []  # Row -> Enemy view
+        self.pool = [Enemy(self, None) for _ in range(capacity)]  # Spare views, reused by spawn()
+        self.type_names = []  # type_id -> enemy type
+        self.type_frames = []  # type_id -> {direction: frames}
+        self.type_variants = []  # type_id -> {variant: {direction: frames}}, e.g. the hit flash
+        self.type_sounds = []  # type_id -> hit sound (or None)
+        self.flash_duration = FLASH_DURATION
+        self.rng = np.random.default_rng()
+        self.counter = itertools.count()
+        self.frame = 0  # Frames simulated so far
+        self.sight_key = None  # Player tile the cached sight results hold for
+        self.routes = {}  # Serial -> [player tile, pixel waypoints or None, next waypoint] of long-range chasers
+        self.path_queries = 0  # Long-range paths planned this frame
+        # Grid index for queries (see build_index())
+        self.index_stale = True  # Enemies moved or changed rows since it was built
+        self.indexed = 0  # Rows [0, indexed) are in the index; later ones were spawned since
+        self.index_rows = np.zeros(0, dtype=np.intp)  # Indexed rows, in cell key order
+        self.index_keys = np.zeros(0, dtype=np.int64)  # Their cell keys, sorted
+        self.index_stride = config.WORLD_HEIGHT // config.ENEMY_INDEX_CELL_SIZE + 1  # Keys per grid column
+        self.index_max_width = 0
+        self.index_max_height = 0
+        world.perception.opacity.add_listener(self.invalidate_sight)
+        # Load every type's frames and sounds now rather than on its first spawn mid-game
+        for enemy_type in ENEMY_TYPES:
+            self.type_id_of(enemy_type)
+
+    # --- Enemy types -----------------------------------------------------
+
+    def type_id_of(self, enemy_type):
+        if enemy_type in self.type_names:
+            return self.type_names.index(enemy_type)
+        self.type_names.append(enemy_type)
+        images = Enemy.load_images(enemy_type)
+        self.type_frames.append(images)
+        self.type_variants.append(Enemy.load_variants(enemy_type, images))
+        self.type_sounds.append(Enemy.load_hit_sound(enemy_type))
+        return len(self.type_names) - 1
+
+    def type_size(self, enemy_type):
+        """
+        (width, height) of an enemy of this type.
+        """
+        return self.type_frames[self.type_id_of(enemy_type)]['down'][0].get_size()
+
+    # --- Spawning and removal -------------------------------------------
+
+    def grow(self):
+        self.capacity *= 2
+        for name in FIELDS:
+            array = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+
+    def spawn(self, x, y, enemy_type):
+        """
+        Add an enemy with its top-left corner at (x, y) and return its view.
+        """
+        if self.count == self.capacity:
+            self.grow()
+        type_id = self.type_id_of(enemy_type)
+        first_frame = self.type_frames[type_id]['down'][0]
+        index = self.count
+        self.count += 1
+        self.x[index] = x
+        self.y[index] = y
+        self.vx[index] = 0
+        self.vy[index] = 0
+        self.health[index] = ENEMY_HEALTH
+        self.max_health[index] = ENEMY_HEALTH
+        self.state[index] = IDLE
+        self.direction[index] = DIRECTION_INDEX['down']
+        self.attack_cooldown[index] = 0
+        self.animation_timer[index] = 0
+        self.animation_frame[index] = 0
+        self.flash_timer[index] = 0
+        self.type_id[index] = type_id
+        self.width[index] = first_frame.get_width()
+        self.height[index] = first_frame.get_height()
+        self.serial[index] = next(self.counter)
+        self.sight_col[index] = -1
+        self.on_route[index] = False
+        # Stagger the first reduced-rate tick so enemies spawned together do not all tick together
+        self.last_tick[index] = self.frame - self.serial[index] % max(config.AI_MID_INTERVAL, config.AI_FAR_INTERVAL, 1)
+        view = self.pool.pop() if self.pool else Enemy(self, None)
+        view.index = index
+        self.views.append(view)
+        self.group.add(view)
+        return view
+
+    def despawn(self, view):
+        """
+        Remove an enemy and keep its view for reuse. The last enemy moves
+        into the freed row.
+        """
+        index = view.index
+        last = self.count - 1
+        self.routes.pop(int(self.serial[index]), None)
+        if index != last:
+            for name in FIELDS:
+                array = getattr(self, name)
+                array[index] = array[last]
+            moved = self.views[last]
+            moved.index = index
+            self.views[index] = moved
+        self.views.pop()
+        self.count -= 1
+        self.index_stale = True
+        view.kill()
+        view.index = None
+        self.pool.append(view)
+
+    def store(self, rows):
+        """
+        Remove the enemies in `rows` and return them as compact records
+        (type, position, health, AI state, facing).
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        records = np.empty(rows.size, dtype=RECORD_DTYPE)
+        for name in RECORD_DTYPE.names:
+            records[name] = getattr(self, name)[rows]
+        # Views first: despawning moves rows around
+        for view in [self.views[index] for index in rows.tolist()]:
+            self.despawn(view)
+        return records
+
+    def restore(self, records):
+        """
+        Spawn live enemies from records made by store().
+        """
+        for record in records:
+            view = self.spawn(float(record['x']), float(record['y']), self.type_names[record['type_id']])
+            index = view.index
+            self.health[index] = record['health']
+            self.state[index] = record['state']
+            self.direction[index] = record['direction']
+
+    # --- Simulation -------------------------------------------------------
+
+    def update(self, flow_field=None):
+        """
+        Advance the simulation by one frame.
+        """
+        self.frame += 1
+        self.path_queries = 0
+        if self.count == 0:
+            return
+        ticked, elapsed = self.schedule()
+        if ticked.size:
+            self.tick(ticked, elapsed, flow_field)
+            self.last_tick[ticked] = self.frame
+            self.index_stale = True
+
+    def schedule(self):
+        """
+        Choose the enemies to tick this frame by their distance to the player:
+        every near one, and the mid-range and far ones whose interval has
+        passed, longest waiting first, up to the per-frame budget. Near is
+        within config.AI_NEAR_MARGIN of the camera view's half-diagonal, so
+        every enemy on screen is near wherever the camera is centred.
+        Returns (rows, frames to advance each of them by).
+        """
+        n = self.count
+        near_distance = math.hypot(self.camera.width, self.camera.height) / 2 + config.AI_NEAR_MARGIN
+        player_x, player_y = self.player.rect.center
+        distance = np.hypot(self.x[:n] + self.width[:n] // 2 - player_x, self.y[:n] + self.height[:n] // 2 - player_y)
+        elapsed = self.frame - self.last_tick[:n]
+        near = distance < near_distance
+        interval = np.where(distance < config.AI_MID_DISTANCE, config.AI_MID_INTERVAL, config.AI_FAR_INTERVAL)
+        due = np.nonzero(~near & (interval > 0) & (elapsed >= interval))[0]
+        budget = config.AI_TICK_BUDGET
+        if due.size > budget:
+            # Over budget: the rest keep waiting and take a longer step next time
+            due = due[np.argpartition(-elapsed[due], budget - 1)[:budget]]
+        near = np.nonzero(near)[0]
+        # Near enemies advance one frame, even if they have just come close after a long wait
+        ticked = np.concatenate((near, due))
+        return ticked, np.concatenate((np.ones(near.size, dtype=np.int64), elapsed[due]))
+
+    def tick(self, rows, elapsed, flow_field=None):
+        """
+        Run the AI of the given enemies, advancing each by `elapsed` frames.
+        """
+        x = self.x[rows]
+        y = self.y[rows]
+        direction = self.direction[rows]
+        width = self.width[rows]
+        height = self.height[rows]
+
+        # Animation and hit flash timers
+        timer = self.animation_timer[rows] + elapsed
+        self.animation_frame[rows] += timer // ANIMATION_FRAME_TIME
+        self.animation_timer[rows] = timer % ANIMATION_FRAME_TIME
+        self.flash_timer[rows] = np.maximum(self.flash_timer[rows] - elapsed, 0)
+
+        player_rect = self.player.rect
+        center_xs = x.astype(np.int64) + width // 2
+        center_ys = y.astype(np.int64) + height // 2
+        dx = (player_rect.centerx - center_xs).astype(np.float64)
+        dy = (player_rect.centery - center_ys).astype(np.float64)
+        distance = np.hypot(dx, dy)
+        # Chase when close to the player and able to see it
+        sees = distance < CHASE_DISTANCE
+        if sees.any():
+            sees[sees] = self.sees_player_batch(rows[sees], center_xs[sees], center_ys[sees])
+        # Enemies on a long-range path keep chasing out of sight until they reach its end
+        chasing = sees | self.on_route[rows]
+        self.state[rows] = np.where(chasing, CHASING, IDLE)
+
+        # Chasers follow the flow field, or a long-range path where the field has no direction (the
+        # way round leaves its window), or else head straight for the player
+        with np.errstate(invalid='ignore', divide='ignore'):
+            chase_x = np.where(distance != 0, dx / distance, 0)
+            chase_y = np.where(distance != 0, dy / distance, 0)
+        if flow_field is not None:
+            field_x, field_y, valid = flow_field.sample_batch(center_xs, center_ys)
+            chase_x = np.where(valid, field_x, chase_x)
+            chase_y = np.where(valid, field_y, chase_y)
+            lost = chasing & ~valid & (distance >= config.TILE_SIZE)
+            # Back inside the field: it leads the rest of the way
+            self.drop_routes(rows[self.on_route[rows] & ~lost])
+            lost = np.nonzero(lost)[0]
+            if lost.size:
+                route_x, route_y, routed = self.follow_routes(rows[lost], center_xs[lost], center_ys[lost],
+                                                              elapsed[lost], sees[lost])
+                chase_x[lost] = np.where(routed, route_x, chase_x[lost])
+                chase_y[lost] = np.where(routed, route_y, chase_y[lost])
+        facing_x = np.abs(chase_x) > np.abs(chase_y)
+        chase_direction = np.where(facing_x,
+                                   np.where(chase_x > 0, DIRECTION_INDEX['right'], DIRECTION_INDEX['left']),
+                                   np.where(chase_y > 0, DIRECTION_INDEX['down'], DIRECTION_INDEX['up']))
+
+        # Wanderers sometimes turn (at least once in `elapsed` frames), then keep walking the way they face
+        count = rows.size
+        turn_chance = 1 - (1 - IDLE_TURN_CHANCE) ** elapsed
+        turning = ~chasing & (self.rng.random(count) < turn_chance)
+        direction = np.where(turning, self.rng.integers(0, len(DIRECTIONS), count), direction)
+        direction = np.where(chasing, chase_direction, direction)
+        self.direction[rows] = direction
+        idle_step = DIRECTION_STEPS[direction]
+        vx = np.where(chasing, chase_x, idle_step[:, 0]) * ENEMY_SPEED
+        vy = np.where(chasing, chase_y, idle_step[:, 1]) * ENEMY_SPEED
+        self.vx[rows] = vx
+        self.vy[rows] = vy
+
+        # Move, spread out from crowded neighbours, stay inside the world and off water and obstacles
+        push_x, push_y = self.separation(rows)
+        # Enemies that skipped frames catch up on the pushes they missed, up to the separation radius
+        push_scale = np.minimum(elapsed, config.SEPARATION_RADIUS / np.maximum(np.hypot(push_x, push_y), 1e-9))
+        push_x = push_x * push_scale
+        push_y = push_y * push_scale
+        move_x = vx * elapsed + push_x
+        move_y = vy * elapsed + push_y
+        # Long moves of enemies that skipped frames go in steps of at most a tile, so they cannot jump over obstacles
+        steps = np.maximum(np.ceil(np.maximum(np.abs(move_x), np.abs(move_y)) / config.TILE_SIZE), 1).astype(np.int64)
+        step_x = move_x / steps
+        step_y = move_y / steps
+        moving = np.arange(count)
+        for step in range(int(steps.max())):
+            if step:
+                moving = moving[steps[moving] > step]
+            new_x = np.clip(x[moving] + step_x[moving], 0, config.WORLD_WIDTH - config.TILE_SIZE)
+            new_y = np.clip(y[moving] + step_y[moving], 0, config.WORLD_HEIGHT - config.TILE_SIZE)
+            x[moving], y[moving] = self.world.resolve_moves(x[moving], y[moving], new_x, new_y,
+                                                            width[moving], height[moving])
+        self.x[rows] = x
+        self.y[rows] = y
+
+        self.check_contacts(rows, elapsed)
+
+    def follow_routes(self, rows, center_xs, center_ys, elapsed, sees):
+        """
+        Unit steering vectors along long-range paths to the player for the
+        chasers in `rows`. Enemies that see the player plan a path with
+        World.find_path (at most config.PATH_QUERY_BUDGET per frame), and
+        plan again once the player is more than config.PATH_REPLAN_DISTANCE
+        tiles from its end. Out of sight they follow the path they have to
+        its end and then give up.
+        Returns (x, y, routed); routed is False where there is no path.
+        """
+        tile_size = config.TILE_SIZE
+        player_x, player_y = self.player.rect.center
+        player_tile = (player_x // tile_size, player_y // tile_size)
+        route_x = np.zeros(rows.size)
+        route_y = np.zeros(rows.size)
+        routed = np.zeros(rows.size, dtype=bool)
+        for i, row in enumerate(rows.tolist()):
+            serial = int(self.serial[row])
+            route = self.routes.get(serial)
+            if route is not None and sees[i] and max(abs(route[0][0] - player_tile[0]),
+                                                     abs(route[0][1] - player_tile[1])) > config.PATH_REPLAN_DISTANCE:
+                route = None
+            if route is None:
+                if not sees[i] or self.path_queries >= config.PATH_QUERY_BUDGET:
+                    continue  # Head straight for the player until a later frame plans the path
+                self.path_queries += 1
+                # None as well is kept, so an unreachable player is not searched for again every frame
+                route = [player_tile, self.world.find_path(center_xs[i], center_ys[i], player_x, player_y), 1]
+                self.routes[serial] = route
+            waypoints = route[1]
+            if waypoints is None:
+                continue
+            # Skip the waypoints this step reaches anyway
+            x, y = int(center_xs[i]), int(center_ys[i])
+            reach = ENEMY_SPEED * int(elapsed[i])
+            index = route[2]
+            while index < len(waypoints) and abs(waypoints[index][0] - x) + abs(waypoints[index][1] - y) <= reach:
+                index += 1
+            if index == len(waypoints):
+                self.drop_routes(np.array([row]))  # Arrived
+                continue
+            route[2] = index
+            self.on_route[row] = True
+            to_x = waypoints[index][0] - x
+            to_y = waypoints[index][1] - y
+            length = math.hypot(to_x, to_y)
+            route_x[i] = to_x / length
+            route_y[i] = to_y / length
+            routed[i] = True
+        return route_x, route_y, routed
+
+    def drop_routes(self, rows):
+        """
+        Forget the long-range paths of the enemies in `rows`.
+        """
+        for row in rows.tolist():
+            self.routes.pop(int(self.serial[row]), None)
+        self.on_route[rows] = False
+
+    def sees_player_batch(self, rows, center_xs, center_ys):
+        """
+        Whether each enemy in `rows` (centered at the given pixels) has a
+        line of sight to the player. Results are cached per enemy until it
+        or the player moves to another tile, or opacity changes somewhere
+        along its ray (see invalidate_sight); only stale ones are ray
+        marched, all in one batch.
+        """
+        perception = self.world.perception
+        tile_size = config.TILE_SIZE
+        player_col = self.player.rect.centerx // tile_size
+        player_row = self.player.rect.centery // tile_size
+        key = (player_col, player_row)
+        if key != self.sight_key:
+            self.sight_key = key
+            self.sight_col[:self.count] = -1
+        cols = center_xs // tile_size
+        tile_rows = center_ys // tile_size
+        stale = (self.sight_col[rows] != cols) | (self.sight_row[rows] != tile_rows)
+        if stale.any():
+            stale_rows = rows[stale]
+            self.sees_player[stale_rows] = perception.line_of_sight_batch(cols[stale], tile_rows[stale],
+                                                                          player_col, player_row)
+            self.sight_col[stale_rows] = cols[stale]
+            self.sight_row[stale_rows] = tile_rows[stale]
+        return self.sees_player[rows]
+
+    def invalidate_sight(self, col0, row0, width, height):
+        """
+        Opacity grid listener: forget the cached sight results of enemies
+        whose ray to the player could cross the changed block of tiles, i.e.
+        whose ray's bounding box overlaps it.
+        """
+        if self.sight_key is None or self.count == 0:
+            return
+        n = self.count
+        player_col, player_row = self.sight_key
+        cols = self.sight_col[:n]
+        rows = self.sight_row[:n]
+        crossing = (np.minimum(cols, player_col) < col0 + width) & (np.maximum(cols, player_col) >= col0) & \
+            (np.minimum(rows, player_row) < row0 + height) & (np.maximum(rows, player_row) >= row0)
+        cols[crossing] = -1
+
+    def neighbour_pairs(self, rows, radius):
+        """
+        Pairs (i, j) where i indexes `rows` and j is the row of another live
+        enemy whose center lies in a grid cell next to (or in) the cell of
+        enemy rows[i], for a grid of `radius`-pixel cells. Every enemy within
+        `radius` of rows[i] is among them. Returns (query positions, neighbour
+        rows, center x and y of all live enemies).
+        """
+        n = self.count
+        centers_x = self.x[:n] + self.width[:n] / 2
+        centers_y = self.y[:n] + self.height[:n] / 2
+        # Only enemies around the queried ones go into the grid
+        nearby = np.nonzero((centers_x >= centers_x[rows].min() - radius) & (centers_x <= centers_x[rows].max() + radius) &
+                            (centers_y >= centers_y[rows].min() - radius) & (centers_y <= centers_y[rows].max() + radius))[0]
+        nearby_x = centers_x[nearby]
+        nearby_y = centers_y[nearby]
+        cell_x0 = int(np.floor(nearby_x.min() / radius))
+        cell_y0 = int(np.floor(nearby_y.min() / radius))
+        # One sortable key per cell; cells one apart on x are `stride` keys apart
+        stride = int(np.floor(nearby_y.max() / radius)) - cell_y0 + 3
+
+        def cell_keys(xs, ys):
+            # Cells counted from one below/left of the nearby area, so neighbour keys never go negative
+            return (np.floor(xs / radius).astype(np.int64) - cell_x0 + 1) * stride + \
+                np.floor(ys / radius).astype(np.int64) - cell_y0 + 1
+
+        keys = cell_keys(nearby_x, nearby_y)
+        sorted_order = np.argsort(keys, kind='stable')
+        order = nearby[sorted_order]
+        sorted_keys = keys[sorted_order]
+
+        # Queries in key order too: binary searches for sorted values are much faster
+        query_keys = cell_keys(centers_x[rows], centers_y[rows])
+        query_order = np.argsort(query_keys, kind='stable')
+        query_keys = query_keys[query_order]
+        queries = []
+        neighbours = []
+        for offset_x in (-1, 0, 1):
+            # The three cells of a grid column have consecutive keys: one run of the sorted order
+            column = query_keys + offset_x * stride
+            starts = np.searchsorted(sorted_keys, column - 1, side='left')
+            counts = np.searchsorted(sorted_keys, column + 1, side='right') - starts
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # Expand each query's run [start, start + count) of the sorted order
+            query = np.repeat(query_order, counts)
+            run_offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            queries.append(query)
+            neighbours.append(order[np.repeat(starts, counts) + run_offset])
+        if not queries:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, centers_x, centers_y
+        return np.concatenate(queries), np.concatenate(neighbours), centers_x, centers_y
+
+    def separation(self, rows):
+        """
+        Push vectors that move each enemy in `rows` away from neighbours
+        closer than config.SEPARATION_RADIUS, stronger the closer they are.
+        Only nearby grid cells are searched, so the cost grows with the
+        number of enemies rather than the number of pairs.
+        """
+        radius = config.SEPARATION_RADIUS
+        push_x = np.zeros(rows.size)
+        push_y = np.zeros(rows.size)
+        if self.count < 2 or rows.size == 0 or radius <= 0:
+            return push_x, push_y
+        query, other, centers_x, centers_y = self.neighbour_pairs(rows, radius)
+        own = rows[query]
+        keep = own != other
+        query, own, other = query[keep], own[keep], other[keep]
+        dx = centers_x[own] - centers_x[other]
+        dy = centers_y[own] - centers_y[other]
+        distance = np.hypot(dx, dy)
+        close = distance < radius
+        query, own, other = query[close], own[close], other[close]
+        dx, dy, distance = dx[close], dy[close], distance[close]
+        # Enemies on exactly the same spot split along x by spawn order
+        stacked = distance == 0
+        dx[stacked] = np.where(self.serial[own[stacked]] < self.serial[other[stacked]], -1.0, 1.0)
+        distance[stacked] = 1.0
+        weight = (1 - distance / radius) * config.SEPARATION_STRENGTH / distance
+        push_x = np.bincount(query, weights=dx * weight, minlength=rows.size)
+        push_y = np.bincount(query, weights=dy * weight, minlength=rows.size)
+        return push_x, push_y
+
+    def check_contacts(self, rows, elapsed):
+        """
+        Damage the player for every ticked enemy touching it whose attack is ready.
+        """
+        player_rect = self.player.rect
+        cooldown = self.attack_cooldown[rows]
+        touching = self.overlapping(rows, player_rect)
+        for hit in np.nonzero(touching & (cooldown == 0))[0].tolist():
+            index = int(rows[hit])
+            center_x = int(self.x[index]) + int(self.width[index]) // 2
+            center_y = int(self.y[index]) + int(self.height[index]) // 2
+            # Direction of the player relative to the enemy
+            if center_x < player_rect.centerx:
+                attacker_direction = 'left'
+            elif center_x > player_rect.centerx:
+                attacker_direction = 'right'
+            elif center_y < player_rect.centery:
+                attacker_direction = 'up'
+            else:
+                attacker_direction = 'down'
+            self.player.take_damage(CONTACT_DAMAGE, attacker_direction)
+            print(f"Player collided with {self.type_names[self.type_id[index]]}. Took {CONTACT_DAMAGE} damage.")
+            cooldown[hit] = ATTACK_SPEED
+        self.attack_cooldown[rows] = np.maximum(cooldown - elapsed, 0)
+
+    # --- Queries ----------------------------------------------------------
+
+    def build_index(self):
+        """
+        Sort the live rows by the grid cell of their top-left corner, so the
+        enemies of a run of cells in one grid column are one run of the
+        sorted keys.
+        """
+        n = self.count
+        size = config.ENEMY_INDEX_CELL_SIZE
+        stride = self.index_stride
+        cell_x = np.maximum(self.x[:n].astype(np.int64) // size, 0)
+        cell_y = np.clip(self.y[:n].astype(np.int64) // size, 0, stride - 1)
+        keys = cell_x * stride + cell_y
+        order = np.argsort(keys, kind='stable')
+        self.index_rows = order
+        self.index_keys = keys[order]
+        self.index_max_width = int(self.width[:n].max()) if n else 0
+        self.index_max_height = int(self.height[:n].max()) if n else 0
+        self.indexed = n
+        self.index_stale = False
+
+    def overlapping(self, rows, rect):
+        """
+        Boolean array over `rows`: whose rect collides with `rect`.
+        """
+        # Same truncation to whole pixels as the views' rects
+        left = self.x[rows].astype(np.int64)
+        top = self.y[rows].astype(np.int64)
+        return (left < rect.right) & (left + self.width[rows] > rect.left) & \
+            (top < rect.bottom) & (top + self.height[rows] > rect.top)
+
+    def rows_in_rect(self, rect):
+        """
+        Rows of the live enemies whose rect collides with `rect`.
+        """
+        n = self.count
+        rect = pygame.Rect(rect)
+        if n == 0 or rect.width <= 0 or rect.height <= 0:
+            return np.zeros(0, dtype=np.intp)
+        if self.index_stale or n - self.indexed > INDEX_TAIL_LIMIT:
+            self.build_index()
+        size = config.ENEMY_INDEX_CELL_SIZE
+        stride = self.index_stride
+        # Cells whose enemies' top-left corners could lie close enough to overlap
+        cell_x0 = max((rect.left - self.index_max_width + 1) // size, 0)
+        cell_x1 = (rect.right - 1) // size
+        cell_y0 = max((rect.top - self.index_max_height + 1) // size, 0)
+        cell_y1 = min((rect.bottom - 1) // size, stride - 1)
+        if cell_x1 < cell_x0 or cell_y1 < cell_y0:
+            candidates = np.zeros(0, dtype=np.intp)
+        elif cell_x1 - cell_x0 + 1 > self.indexed:
+            # More grid columns than indexed enemies; test them all
+            candidates = np.arange(self.indexed)
+        else:
+            columns = np.arange(cell_x0, cell_x1 + 1, dtype=np.int64) * stride
+            starts = np.searchsorted(self.index_keys, columns + cell_y0, side='left')
+            counts = np.searchsorted(self.index_keys, columns + cell_y1, side='right') - starts
+            total = int(counts.sum())
+            # Expand each column's run [start, start + count) of the sorted rows
+            run_offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            candidates = self.index_rows[np.repeat(starts, counts) + run_offset]
+        # Enemies spawned since the index was built
+        if self.indexed < n:
+            candidates = np.concatenate((candidates, np.arange(self.indexed, n)))
+        return candidates[self.overlapping(candidates, rect)]
+
+    def rows_in_radius(self, x, y, radius):
+        """
+        Rows of the live enemies whose rect center lies within `radius`
+        pixels of (x, y), and those distances.
+        """
+        left = math.floor(x - radius)
+        top = math.floor(y - radius)
+        # Every rect whose center is in the circle overlaps its bounding square
+        rows = self.rows_in_rect((left, top, math.floor(x + radius) + 1 - left, math.floor(y + radius) + 1 - top))
+        # Same centers as the views' rects
+        distance = np.hypot(self.x[rows].astype(np.int64) + self.width[rows] // 2 - x,
+                            self.y[rows].astype(np.int64) + self.height[rows] // 2 - y)
+        within = distance <= radius
+        return rows[within], distance[within]
+
+    def query_rect(self, rect, ordered=False):
+        """
+        Enemy views whose rect collides with `rect`. With ordered=True they
+        are returned in the order they were spawned (e.g. for drawing).
+        """
+        hits = self.rows_in_rect(rect)
+        if ordered:
+            hits = hits[np.argsort(self.serial[hits])]
+        views = self.views
+        return [views[index] for index in hits.tolist()]
+
+    def query_radius(self, x, y, radius):
+        """
+        Enemy views whose rect center lies within `radius` pixels of (x, y).
+        """
+        rows, _ = self.rows_in_radius(x, y, radius)
+        views = self.views
+        return [views[index] for index in rows.tolist()]
+
+    def nearest(self, x, y, k=1, max_distance=None):
+        """
+        Up to k enemy views closest to (x, y) by rect center, nearest first.
+        Searches circles of doubling radius until one holds k enemies, as
+        nothing outside it can be closer than those.
+        """
+        if self.count == 0 or k <= 0:
+            return []
+        limit = math.inf if max_distance is None else max_distance
+        radius = min(config.ENEMY_INDEX_CELL_SIZE, limit)
+        while True:
+            rows, distance = self.rows_in_radius(x, y, radius)
+            if rows.size >= min(k, self.count) or radius >= limit:
+                break
+            radius = min(radius * 2, limit)
+        # Equally distant enemies in spawn order
+        ranked = rows[np.lexsort((self.serial[rows], distance))[:k]]
+        views = self.views
+        return [views[index] for index in ranked.tolist()]
+
+    def frame_image(self, index):
+        """
+        Current frame of enemy `index` for its direction and animation frame.
+        """
+        type_id = self.type_id[index]
+        direction = DIRECTIONS[self.direction[index]]
+        if self.flash_timer[index] > 0:
+            frames = self.type_variants[type_id]['flash'][direction]
+        else:
+            frames = self.type_frames[type_id][direction]
+        return frames[self.animation_frame[index] % len(frames)]
+
+    def submit_draw(self, draw_list, rect):
+        """
+        Queue the enemies overlapping `rect` on the draw list's entity layer.
+        """
+        hits = self.rows_in_rect(rect)
+        hits = hits[np.argsort(self.serial[hits])]  # Spawn order breaks ties in the y-sort
+        xs = self.x[hits].astype(np.int64).tolist()
+        ys = self.y[hits].astype(np.int64).tolist()
+        for index, x, y in zip(hits.tolist(), xs, ys):
+            draw_list.submit('entities', self.frame_image(index), x, y)
@@ -0,0 +1,129 @@
+# flow_field.py
+
+import numpy as np
+import config
+
+UNREACHED = np.iinfo(np.int32).max
+
+# Neighbour offsets (d_col, d_row): the 4 orthogonal ones first, then diagonals
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+NEIGHBOUR_DIRECTIONS = np.array([(dx, dy) for dx, dy in NEIGHBOURS], dtype=np.float32)
+NEIGHBOUR_DIRECTIONS /= np.hypot(NEIGHBOUR_DIRECTIONS[:, 0], NEIGHBOUR_DIRECTIONS[:, 1])[:, None]
+
+
+class FlowField:
+    """
+    Shared steering field towards a target tile (the player).
+
+    A breadth-first search runs outward from the target over the
+    walkability grid, limited to a square of `radius` tiles around it. Every
+    reachable tile then stores a unit vector pointing at its neighbour that
+    is closest to the target, so any number of chasing enemies can steer
+    around water and obstacles by sampling the field.
+
+    The field is only recomputed when the target moves to another tile or
+    the walkability grid changes, so its cost does not depend on how many
+    enemies use it.
+    """
+    def __init__(self, walkability, radius=config.FLOW_FIELD_RADIUS):
+        self.walkability = walkability
+        self.radius = radius
+        self.target = None  # Target tile (col, row) the field was computed for
+        self.walkability_version = None
+        self.origin_col = 0  # Tile at index [0, 0] of the field arrays
+        self.origin_row = 0
+        size = 2 * radius + 1
+        self.distance = np.full((size, size), UNREACHED, dtype=np.int32)
+        self.direction_x = np.zeros((size, size), dtype=np.float32)
+        self.direction_y = np.zeros((size, size), dtype=np.float32)
+
+    def update(self, x, y):
+        """
+        Retarget the field at pixel position (x, y).
+        Returns True if the field had to be recomputed.
+        """
+        target = (int(x // config.TILE_SIZE), int(y // config.TILE_SIZE))
+        if target == self.target and self.walkability.version == self.walkability_version:
+            return False
+        self.compute(*target)
+        return True
+
+    def compute(self, col, row):
+        radius = self.radius
+        size = 2 * radius + 1
+        self.target = (col, row)
+        self.walkability_version = self.walkability.version
+        self.origin_col = col - radius
+        self.origin_row = row - radius
+        cols = np.arange(self.origin_col, self.origin_col + size)
+        rows = np.arange(self.origin_row, self.origin_row + size)
+        walkable = self.walkability.tiles_walkable_batch(cols[None, :], rows[:, None])
+        walkable[radius, radius] = True  # Always expand from the target, even if it stands on a blocked tile
+
+        # Breadth-first search as a wavefront: each step grows the frontier by
+        # one tile in the four orthogonal directions
+        distance = np.full((size, size), UNREACHED, dtype=np.int32)
+        distance[radius, radius] = 0
+        frontier = np.zeros((size, size), dtype=bool)
+        frontier[radius, radius] = True
+        step = 0
+        while frontier.any():
+            step += 1
+            grown = np.zeros_like(frontier)
+            grown[1:, :] |= frontier[:-1, :]
+            grown[:-1, :] |= frontier[1:, :]
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :-1] |= frontier[:, 1:]
+            frontier = grown & walkable & (distance == UNREACHED)
+            distance[frontier] = step
+        self.distance = distance
+
+        # For every tile, pick the neighbour with the smallest distance.
+        # Diagonal steps are only allowed when both orthogonal tiles are open,
+        # so enemies never cut corners.
+        padded = np.full((size + 2, size + 2), UNREACHED, dtype=np.int32)
+        padded[1:-1, 1:-1] = distance
+        neighbour = np.stack([padded[1 + dy:1 + dy + size, 1 + dx:1 + dx + size] for dx, dy in NEIGHBOURS])
+        reached = neighbour != UNREACHED
+        for index, (dx, dy) in enumerate(NEIGHBOURS[4:], start=4):
+            side_x = NEIGHBOURS.index((dx, 0))
+            side_y = NEIGHBOURS.index((0, dy))
+            neighbour[index][~(reached[side_x] & reached[side_y])] = UNREACHED
+        best = neighbour.argmin(axis=0)
+        downhill = np.take_along_axis(neighbour, best[None], axis=0)[0] < distance
+        self.direction_x = np.where(downhill, NEIGHBOUR_DIRECTIONS[best, 0], 0).astype(np.float32)
+        self.direction_y = np.where(downhill, NEIGHBOUR_DIRECTIONS[best, 1], 0).astype(np.float32)
+
+    def sample(self, x, y):
+        """
+        Unit (dx, dy) steering vector at pixel position (x, y), or None if the
+        position is outside the field, cannot reach the target, or is already
+        on the target tile.
+        """
+        col = int(x // config.TILE_SIZE) - self.origin_col
+        row = int(y // config.TILE_SIZE) - self.origin_row
+        size = self.distance.shape[0]
+        if self.target is None or not (0 <= col < size and 0 <= row < size):
+            return None
+        dx = float(self.direction_x[row, col])
+        dy = float(self.direction_y[row, col])
+        if dx == 0 and dy == 0:
+            return None
+        return dx, dy
+
+    def sample_batch(self, xs, ys):
+        """
+        Vectorized sample for arrays of pixel positions.
+        Returns (dx, dy, valid) arrays; dx and dy are 0 where valid is False.
+        """
+        size = self.distance.shape[0]
+        cols = np.floor_divide(np.asarray(xs), config.TILE_SIZE).astype(np.intp) - self.origin_col
+        rows = np.floor_divide(np.asarray(ys), config.TILE_SIZE).astype(np.intp) - self.origin_row
+        inside = (cols >= 0) & (cols < size) & (rows >= 0) & (rows < size)
+        if self.target is None:
+            inside[...] = False
+        cols = np.where(inside, cols, 0)
+        rows = np.where(inside, rows, 0)
+        dx = np.where(inside, self.direction_x[rows, cols], 0)
+        dy = np.where(inside, self.direction_y[rows, cols], 0)
+        return dx, dy, inside & ((dx != 0) | (dy != 0))
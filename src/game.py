@@ -8,15 +8,19 @@ from player import Player
 from world import World
 from quests import QuestManager, Quest
 from camera import Camera
-from enemy import Enemy
+from enemy_system import EnemySystem
+from spawn_director import SpawnDirector
 from time_manager import TimeManager
 from hud import HUD
 from pause_menu import PauseMenu
 from particles import ParticleSystem
+from draw_list import DrawList
+from dirty_rects import DirtyRectTracker
+from render_target import RenderTarget
 from settings_menu import SettingsMenu
 from quest_display import QuestDisplay
+from asset_manager import assets
 import config
-import random
 import time
 import cProfile
 import pstats
@@ -28,59 +32,30 @@ class Game:
         self.clock = pygame.time.Clock()
         self.fps_font = pygame.font.SysFont('Arial', 20)
         self.time_manager = TimeManager()
+        # Load shared sprite sheets and sounds up front instead of on first spawn
+        assets.preload('items', 'enemies')
         self.world = World(config.WORLD_WIDTH, config.WORLD_HEIGHT, self.time_manager)
         self.player = Player(self.world.width // 2, self.world.height // 2)
         self.quest_manager = QuestManager()
         self.quest_manager.generate_quest(self.world)  # Start with one quest
-        self.camera = Camera(config.WIDTH, config.HEIGHT)
+        self.target = RenderTarget(self.window)  # The world may render below window resolution
+        self.camera = Camera(*self.target.size)
         self.inventory_visible = False  # Flag to toggle inventory display
         self.notifications = []  # List to store active notifications
-        self.enemies = pygame.sprite.Group()  # Group to hold all enemy instances
-        self.spawn_enemies(count=5)  # Initialize enemy spawning with desired count
+        self.enemies = pygame.sprite.Group()  # Sprite views of all enemies
+        self.enemy_system = EnemySystem(self.player, self.world, self.enemies, self.camera)  # Enemy state and simulation
+        self.spawn_director = SpawnDirector(self.enemy_system, self.world, self.player)  # Keeps enemies around the player
         self.hud = HUD(self.player, self.quest_manager, self.time_manager)
         self.quest_display = QuestDisplay(self.quest_manager, self.camera)  # Initialize QuestDisplay
         self.pause_menu = PauseMenu(self)
         self.paused = False
         self.particle_system = ParticleSystem(self.time_manager)
+        self.draw_list = DrawList()  # Sprites to draw this frame, batched per layer
+        self.dirty_rects = DirtyRectTracker(*self.target.size)
         self.profiler = cProfile.Profile()
+        if config.DEBUG:
+            assets.print_report()
         
-    def spawn_enemies(self, count=5):
-        """
-        Spawn a specified number of enemies near the player's position.
-        """
-        for _ in range(count):
-            enemy_type = random.choice(['eye-rock', 'foot-soldier'])
-            attempts = 0
-            max_attempts = 100  # Prevent infinite loop
-            while attempts < max_attempts:
-                # Define a spawn radius around the player (e.g., 200 pixels)
-                spawn_radius = 200
-                angle = random.uniform(0, 2 * math.pi)  # Use math.pi for better precision
-                distance = random.randint(100, spawn_radius)  # Minimum distance of 100 pixels
-                x = self.player.rect.x + distance * math.cos(angle)  # Use math.cos
-                y = self.player.rect.y + distance * math.sin(angle)  # Use math.sin
-                # Ensure x and y are within world bounds
-                x = max(0, min(int(x), config.WORLD_WIDTH - config.TILE_SIZE))
-                y = max(0, min(int(y), config.WORLD_HEIGHT - config.TILE_SIZE))
-                enemy_rect = pygame.Rect(x, y, config.TILE_SIZE, config.TILE_SIZE)
-                collision = False
-                if self.player.rect.colliderect(enemy_rect):
-                    collision = True
-                for enemy in self.enemies:
-                    if enemy.rect.colliderect(enemy_rect):
-                        collision = True
-                        break
-                if not collision:
-                    break  # Suitable spawn position found
-                attempts += 1
-            else:
-                print(f"Failed to spawn {enemy_type}: No suitable position found after {max_attempts} attempts.")
-                continue  # Skip spawning this enemy
-            enemy = Enemy(x, y, enemy_type, self.player)
-            self.enemies.add(enemy)
-            print(f"Spawned {enemy_type} at ({x}, {y})")
-        print(f"Spawned {count} enemies near the player.")
-
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -109,6 +84,7 @@ class Game:
                             dropped_y = (player_center_y // tile_size) * tile_size
                             item.x = dropped_x + (tile_size - config.TILE_SIZE) // 2
                             item.y = dropped_y + (tile_size - config.TILE_SIZE) // 2
+                            item.rect.topleft = (item.x, item.y)  # The item index buckets by rect
                             self.world.active_items.add(item)
                             print(f"Dropped {item.item_type} at ({item.x}, {item.y})")
             elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -123,7 +99,7 @@ class Game:
                 else:
                     if event.button == 1:  # Left click
                         # Determine attacker's direction based on mouse position
-                        mouse_x, mouse_y = pygame.mouse.get_pos()
+                        mouse_x, mouse_y = self.target.frame_point(pygame.mouse.get_pos())
                         # Convert mouse position to world coordinates
                         world_mouse_x = mouse_x + self.camera.offset_x
                         world_mouse_y = mouse_y + self.camera.offset_y
@@ -141,7 +117,7 @@ class Game:
                         else:
                             direction = 'left'
                         self.player.direction = direction
-                        self.player.attack(self.enemies)
+                        self.player.attack(self.enemy_system)
 
     def toggle_pause(self):
         self.paused = not self.paused
@@ -156,7 +132,11 @@ class Game:
             self.player.update(dt)
             self.quest_manager.update_quests(self.player, self.world, self) 
             self.camera.update(self.player, self.world)
-            self.enemies.update(self.player)  # Update all enemies
+            self.world.update_streaming(self.camera)  # Generate/evict chunks around the view
+            self.spawn_director.update(self.camera)  # Top up enemies near the player, sleep/wake distant chunks
+            self.world.flow_field.update(*self.player.rect.center)  # Recomputed only when the player changes tile
+            self.world.warm_pathfinder(*self.player.rect.center)  # Long-range paths near the player need no graph building
+            self.enemy_system.update(self.world.flow_field)  # Update all enemies at once
             self.time_manager.update(dt)  # Update time
             self.particle_system.update()  # Update particles
             self.quest_display.update_filtered_quests()
@@ -167,29 +147,80 @@ class Game:
             pass
 
     def render(self):
-        self.window.fill(config.BLACK)  # Clear the screen
-        self.world.draw(self.window, self.camera)
-        
-        # Draw all enemies with camera offset
-        for enemy in self.enemies:
-            draw_x = enemy.rect.x - self.camera.offset_x
-            draw_y = enemy.rect.y - self.camera.offset_y
-            self.window.blit(enemy.image, (draw_x, draw_y))
-        
-        self.player.draw(self.window, self.camera)
+        self.hud.update_health_display()
+        for notification in self.notifications:
+            notification['timer'] -= 1
+        water_changed = self.world.animate()
+
+        # Collect the sprites on screen; each layer is drawn in one batch
+        view = pygame.Rect(self.camera.offset_x, self.camera.offset_y, self.camera.width, self.camera.height)
+        self.draw_list.begin(self.camera)
+        self.world.submit_draw(self.draw_list, view)
+        self.enemy_system.submit_draw(self.draw_list, view)
+        self.player.submit_draw(self.draw_list)
+        self.particle_system.submit_draw(self.draw_list)
+
+        # While the camera and lighting stay the same only the changed parts of
+        # the screen are redrawn; menus and scrolling redraw everything
+        changed = self.world.renderer.changed_rects(self.camera, water_changed)
+        key = (self.camera.offset_x, self.camera.offset_y, self.time_manager.overlay_color(),
+               self.paused, self.inventory_visible, self.quest_display.active)
+        rects = self.dirty_rects.plan(key, self.draw_list.sprites(), changed)
+        if self.paused or self.inventory_visible or self.quest_display.active:
+            rects = None
+
+        ui_rects = self.draw_frame(rects)
+        if not self.dirty_rects.finish(rects, ui_rects):
+            rects = None
+            self.draw_frame(rects)  # The UI grew past the redrawn area
+
+        self.target.present(rects)
+
+    def draw_frame(self, rects=None):
+        """
+        Draw the world and the UI, everywhere or only inside `rects` (in
+        render target pixels). Returns the target rects the UI covered.
+        """
+        frame = self.target.surface
+        regions = [None] if rects is None else rects
+        for rect in regions:
+            frame.set_clip(rect)
+            frame.fill(config.BLACK)  # Clear the screen
+            self.world.draw(frame, self.camera)
+            self.draw_list.flush(frame)
+        frame.set_clip(None)
+
+        if self.target.scaled:
+            # The UI is drawn at window resolution after upscaling, so lighting only tints the world
+            self.draw_lighting(frame, regions)
+            self.target.upscale(rects)
+            ui_rects = self.draw_ui()
+        else:
+            ui_rects = self.draw_ui()
+            self.draw_lighting(frame, regions)
+
+        if self.paused:
+            self.pause_menu.draw(self.window)  # Draw pause menu overlay
+        return [self.target.to_internal(rect) for rect in ui_rects]
+
+    def draw_ui(self):
+        """
+        Draw the UI onto the window. Returns the window rects it covered.
+        """
+        ui_rects = []
         if self.inventory_visible:
             self.player.inventory.draw(self.window)
         if self.quest_display.active:
             self.quest_display.draw(self.window)
-        self.display_notifications()
-        self.hud.draw(self.window)  # Draw HUD elements
-        self.particle_system.draw(self.window, self.camera)  # Draw particles
-        self.time_manager.draw_lighting(self.window)  # Draw lighting overlays
-        
-        if self.paused:
-            self.pause_menu.draw(self.window)  # Draw pause menu overlay
-        
-        pygame.display.flip()
+        ui_rects += self.display_notifications()
+        ui_rects += self.hud.draw(self.window)  # Draw HUD elements
+        return ui_rects
+
+    def draw_lighting(self, frame, regions):
+        for rect in regions:
+            frame.set_clip(rect)
+            self.time_manager.draw_lighting(frame)  # Draw lighting overlays
+        frame.set_clip(None)
 
     def run(self):
         while True:
@@ -204,15 +235,17 @@ class Game:
     def display_notifications(self):
         """
         Render active notifications on the screen.
+        Returns the rects they were drawn to.
         """
         font = pygame.font.SysFont('Arial', 20)
         y_offset = 50  # Starting y position for notifications
+        rects = []
         for notification in self.notifications:
             text = font.render(notification['message'], True, config.YELLOW)
             surface_rect = text.get_rect(center=(config.WIDTH // 2, y_offset))
-            self.window.blit(text, surface_rect)
-            notification['timer'] -= 1
+            rects.append(self.window.blit(text, surface_rect))
             y_offset += 30  # Space between notifications
+        return rects
 
     def process_notifications(self):
         """
@@ -39,13 +39,15 @@ class HUD:
     def draw(self, surface):
         """
         Draw all HUD elements on the given surface.
-        """
-        self.update_health_display()
-        self.draw_health_bar(surface, 20, 20, 250, 30)
-        self.draw_xp_bar(surface, 20, 70, 250, 30)
-        self.draw_gold(surface, 20, 120)
-        self.draw_time(surface, 20, 170)
-        self.draw_player_level(surface, 20, 220)
+        Returns the rect each element covered.
+        """
+        return [
+            self.draw_health_bar(surface, 20, 20, 250, 30),
+            self.draw_xp_bar(surface, 20, 70, 250, 30),
+            self.draw_gold(surface, 20, 120),
+            self.draw_time(surface, 20, 170),
+            self.draw_player_level(surface, 20, 220),
+        ]
     
     def update_health_display(self):
         """
@@ -65,7 +67,7 @@ class HUD:
         Draw the player's health bar with smooth color transitions and shadowed text.
         """
         # Blit pre-created panel
-        surface.blit(self.health_panel, (x - 3, y - 3))
+        panel_rect = surface.blit(self.health_panel, (x - 3, y - 3))
         
         # Border
         pygame.draw.rect(surface, config.WHITE, (x, y, width, height), 2, border_radius=6)
@@ -83,8 +85,9 @@ class HUD:
         # Health Text with Shadow
         health_text = self.font.render(f"HP: {int(self.displayed_health)}/{self.player.max_health}", True, config.WHITE)
         shadow_text = self.font.render(f"HP: {int(self.displayed_health)}/{self.player.max_health}", True, self.text_shadow_color)
-        surface.blit(shadow_text, (x + width + 12 + self.shadow_offset, y + (height - health_text.get_height()) // 2 + self.shadow_offset))
-        surface.blit(health_text, (x + width + 12, y + (height - health_text.get_height()) // 2))
+        shadow_rect = surface.blit(shadow_text, (x + width + 12 + self.shadow_offset, y + (height - health_text.get_height()) // 2 + self.shadow_offset))
+        text_rect = surface.blit(health_text, (x + width + 12, y + (height - health_text.get_height()) // 2))
+        return panel_rect.unionall([shadow_rect, text_rect])
     
     def interpolate_color(self, start_color, end_color, ratio):
         """
@@ -101,7 +104,7 @@ class HUD:
         Draw the player's XP bar with modern styling.
         """
         # Blit pre-created panel
-        surface.blit(self.xp_panel, (x - 3, y - 3))
+        panel_rect = surface.blit(self.xp_panel, (x - 3, y - 3))
         
         # Border
         pygame.draw.rect(surface, config.WHITE, (x, y, width, height), 2, border_radius=6)
@@ -123,15 +126,16 @@ class HUD:
         # XP Text with Shadow
         xp_text = self.font.render(f"XP: {self.player.xp}/{xp_for_next_level}", True, config.WHITE)
         shadow_text = self.font.render(f"XP: {self.player.xp}/{xp_for_next_level}", True, self.text_shadow_color)
-        surface.blit(shadow_text, (x + width + 12 + self.shadow_offset, y + (height - xp_text.get_height()) // 2 + self.shadow_offset))
-        surface.blit(xp_text, (x + width + 12, y + (height - xp_text.get_height()) // 2))
+        shadow_rect = surface.blit(shadow_text, (x + width + 12 + self.shadow_offset, y + (height - xp_text.get_height()) // 2 + self.shadow_offset))
+        text_rect = surface.blit(xp_text, (x + width + 12, y + (height - xp_text.get_height()) // 2))
+        return panel_rect.unionall([shadow_rect, text_rect])
     
     def draw_gold(self, surface, x, y):
         """
         Draw the player's gold with modern styling.
         """
         # Blit pre-created panel
-        surface.blit(self.gold_panel, (x - 3, y - 3))
+        panel_rect = surface.blit(self.gold_panel, (x - 3, y - 3))
         
         # Border
         pygame.draw.rect(surface, config.WHITE, (x, y, 160, 40), 2, border_radius=6)
@@ -139,15 +143,16 @@ class HUD:
         # Gold Text with Shadow
         gold_text = self.font.render(f"Gold: {self.player.gold}", True, self.gold_color)
         shadow_text = self.font.render(f"Gold: {self.player.gold}", True, self.text_shadow_color)
-        surface.blit(shadow_text, (x + 10 + self.shadow_offset, y + 5 + self.shadow_offset))
-        surface.blit(gold_text, (x + 10, y + 5))
+        shadow_rect = surface.blit(shadow_text, (x + 10 + self.shadow_offset, y + 5 + self.shadow_offset))
+        text_rect = surface.blit(gold_text, (x + 10, y + 5))
+        return panel_rect.unionall([shadow_rect, text_rect])
     
     def draw_time(self, surface, x, y):
         """
         Draw the current in-game time with modern styling.
         """
         # Blit pre-created panel
-        surface.blit(self.time_panel, (x - 3, y - 3))
+        panel_rect = surface.blit(self.time_panel, (x - 3, y - 3))
         
         # Border
         pygame.draw.rect(surface, config.WHITE, (x, y, 220, 40), 2, border_radius=6)
@@ -155,15 +160,16 @@ class HUD:
         # Time Text with Shadow
         time_text = self.font.render(f"Time: {self.time_manager.get_time_display()}", True, config.WHITE)
         shadow_text = self.font.render(f"Time: {self.time_manager.get_time_display()}", True, self.text_shadow_color)
-        surface.blit(shadow_text, (x + 10 + self.shadow_offset, y + 5 + self.shadow_offset))
-        surface.blit(time_text, (x + 10, y + 5))
+        shadow_rect = surface.blit(shadow_text, (x + 10 + self.shadow_offset, y + 5 + self.shadow_offset))
+        text_rect = surface.blit(time_text, (x + 10, y + 5))
+        return panel_rect.unionall([shadow_rect, text_rect])
     
     def draw_player_level(self, surface, x, y):
         """
         Draw the player's current level with modern styling.
         """
         # Blit pre-created panel
-        surface.blit(self.level_panel, (x - 3, y - 3))
+        panel_rect = surface.blit(self.level_panel, (x - 3, y - 3))
         
         # Border
         pygame.draw.rect(surface, config.WHITE, (x, y, 120, 40), 2, border_radius=6)
@@ -171,5 +177,6 @@ class HUD:
         # Level Text with Shadow
         level_text = self.font.render(f"Level: {self.player.level}", True, config.WHITE)
         shadow_text = self.font.render(f"Level: {self.player.level}", True, self.text_shadow_color)
-        surface.blit(shadow_text, (x + 10 + self.shadow_offset, y + 5 + self.shadow_offset))
-        surface.blit(level_text, (x + 10, y + 5)) 
+        shadow_rect = surface.blit(shadow_text, (x + 10 + self.shadow_offset, y + 5 + self.shadow_offset))
+        text_rect = surface.blit(level_text, (x + 10, y + 5))
+        return panel_rect.unionall([shadow_rect, text_rect]) 
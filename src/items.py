@@ -2,6 +2,12 @@
 import pygame
 import config
 import random
+from asset_manager import assets
+
+def load_mushroom_frames():
+    return assets.load_frames(config.MUSHROOM_IMAGE, config.MUSHROOM_FRAME_SIZE, config.MUSHROOM_FRAME_SIZE,
+                              (config.TILE_SIZE, config.TILE_SIZE))
+
 
 class Item(pygame.sprite.Sprite):
     def __init__(self, x, y, item_type):
@@ -15,22 +21,11 @@ class Item(pygame.sprite.Sprite):
         self.usable = True if item_type == 'mushroom' else False  # Define usability
     
     def load_images(self):
+        # Frames are sliced once and shared by every item of the same type
         images = {}
         try:
             if self.item_type == 'mushroom':
-                mushroom_sheet = pygame.image.load(config.MUSHROOM_IMAGE).convert_alpha()
-                sheet_width, sheet_height = mushroom_sheet.get_size()
-                frame_width = 16
-                frame_height = 16
-                images_list = []
-                for row in range(sheet_height // frame_height):
-                    for col in range(sheet_width // frame_width):
-                        frame = mushroom_sheet.subsurface(
-                            (col * frame_width, row * frame_height, frame_width, frame_height)
-                        )
-                        scaled_frame = pygame.transform.scale(frame, (config.TILE_SIZE, config.TILE_SIZE))
-                        images_list.append(scaled_frame)
-                images['mushroom'] = images_list
+                images['mushroom'] = load_mushroom_frames()
         except pygame.error as e:
             print(f"Unable to load {self.item_type} image at {config.MUSHROOM_IMAGE}: {e}")
             # Fallback to a red square if image fails to load
@@ -44,7 +39,6 @@ class Item(pygame.sprite.Sprite):
         # Add more item types as needed
         return pygame.Surface((config.TILE_SIZE, config.TILE_SIZE))  # Fallback
 
-    def draw(self, surface, camera):
-        draw_x = self.x - camera.offset_x
-        draw_y = self.y - camera.offset_y
-        surface.blit(self.image, (draw_x, draw_y))
+
+# Item sprite sheets, for assets.preload('items')
+assets.define_group('items', load_mushroom_frames)
@@ -75,9 +75,6 @@ class ParticleSystem:
         particle = Particle(x, y, particle_type)
         self.particles.add(particle)
     
-    def draw(self, surface, camera):
+    def submit_draw(self, draw_list):
         for particle in self.particles:
-            # Adjust position based on camera
-            draw_x = particle.rect.x - camera.offset_x
-            draw_y = particle.rect.y - camera.offset_y
-            surface.blit(particle.image, (draw_x, draw_y))
+            draw_list.submit('particles', particle.image, particle.rect.x, particle.rect.y)
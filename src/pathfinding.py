@@ -0,0 +1,352 @@
+# pathfinding.py
+
+import heapq
+import itertools
+import numpy as np
+import config
+
+UNREACHED = -1
+ENTRANCE_SPLIT_LENGTH = 6  # Border openings at least this long get entrances at both ends as well as the middle
+
+# 4-connected moves; paths step one tile at a time like the walkability checks
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class HierarchicalPathfinder:
+    """
+    Hierarchical pathfinding (HPA*) over the walkability grid, using the
+    world storage chunks as clusters.
+
+    Wherever two neighbouring chunks share an open stretch of border, an
+    entrance is placed: a pair of tiles, one on each side. Inside each chunk
+    the distance from every entrance tile to every tile of the chunk is
+    found with a breadth-first search. A long route is then searched on the
+    small abstract graph of entrances first, and only the chunks along the
+    found route are refined into tile steps, by walking those precomputed
+    distance fields.
+
+    Abstract data is built lazily the first time a search touches a chunk,
+    or ahead of time a few chunks per frame around the player (see warm()),
+    and is dropped only for chunks whose walkability changes, together with
+    the borders they share.
+    """
+    def __init__(self, walkability, chunk_size=config.CHUNK_SIZE):
+        self.walkability = walkability
+        self.chunk_size = chunk_size
+        self.chunks_x = -(-walkability.cols // chunk_size)
+        self.chunks_y = -(-walkability.rows // chunk_size)
+        self.borders = {}  # ('h' | 'v', cx, cy) -> list of (tile, tile) entrance pairs
+        self.graphs = {}  # (cx, cy) -> (entrance tiles, tile -> index, distance fields)
+        self.warm_center = None  # Chunk warm() last worked outwards from
+        self.warm_ring = 0  # Rings around it whose chunks all have graphs
+        walkability.add_listener(self.invalidate_region)
+
+    # --- Abstract graph -------------------------------------------------
+
+    def invalidate_region(self, col0, row0, width, height):
+        """
+        Forget abstract data for the chunks overlapping a changed block of tiles.
+        """
+        size = self.chunk_size
+        for cy in range(row0 // size, (row0 + height - 1) // size + 1):
+            for cx in range(col0 // size, (col0 + width - 1) // size + 1):
+                self.invalidate_chunk(cx, cy)
+
+    def invalidate_chunk(self, cx, cy):
+        # The chunk's own borders change, and with them the entrance lists of
+        # the four neighbours sharing those borders
+        for key in (('h', cx - 1, cy), ('h', cx, cy), ('v', cx, cy - 1), ('v', cx, cy)):
+            self.borders.pop(key, None)
+        for key in ((cx, cy), (cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+            self.graphs.pop(key, None)
+        self.warm_ring = 0  # Warm the dropped graphs again
+
+    def border(self, kind, cx, cy):
+        """
+        Entrances between chunk (cx, cy) and its east ('h') or south ('v')
+        neighbour, as (tile in this chunk, tile in the neighbour) pairs.
+        """
+        key = (kind, cx, cy)
+        entrances = self.borders.get(key)
+        if entrances is not None:
+            return entrances
+        size = self.chunk_size
+        entrances = []
+        if kind == 'h' and 0 <= cx < self.chunks_x - 1 and 0 <= cy < self.chunks_y:
+            col = (cx + 1) * size - 1
+            rows = np.arange(cy * size, min((cy + 1) * size, self.walkability.rows))
+            open_run = self.walkability.tiles_walkable_batch(col, rows) & \
+                self.walkability.tiles_walkable_batch(col + 1, rows)
+            for row in self.entrance_positions(open_run, cy * size):
+                entrances.append(((col, row), (col + 1, row)))
+        elif kind == 'v' and 0 <= cx < self.chunks_x and 0 <= cy < self.chunks_y - 1:
+            row = (cy + 1) * size - 1
+            cols = np.arange(cx * size, min((cx + 1) * size, self.walkability.cols))
+            open_run = self.walkability.tiles_walkable_batch(cols, row) & \
+                self.walkability.tiles_walkable_batch(cols, row + 1)
+            for col in self.entrance_positions(open_run, cx * size):
+                entrances.append(((col, row), (col, row + 1)))
+        self.borders[key] = entrances
+        return entrances
+
+    def entrance_positions(self, open_run, start):
+        """
+        Positions along a border for entrances: the middle of every open
+        stretch, plus both ends of long stretches.
+        """
+        edges = np.diff(np.concatenate(([0], open_run.astype(np.int8), [0])))
+        positions = []
+        for run_start, run_end in zip(np.nonzero(edges == 1)[0].tolist(), np.nonzero(edges == -1)[0].tolist()):
+            if run_end - run_start >= ENTRANCE_SPLIT_LENGTH:
+                positions += [start + run_start, start + (run_start + run_end - 1) // 2, start + run_end - 1]
+            else:
+                positions.append(start + (run_start + run_end - 1) // 2)
+        return positions
+
+    def entrances(self, cx, cy):
+        """
+        Entrance tiles inside chunk (cx, cy), each with the tiles it connects
+        to in neighbouring chunks.
+        """
+        links = {}
+        for tile, other in self.border('h', cx, cy) + self.border('v', cx, cy):
+            links.setdefault(tile, []).append(other)
+        for other, tile in self.border('h', cx - 1, cy) + self.border('v', cx, cy - 1):
+            links.setdefault(tile, []).append(other)
+        return links
+
+    def chunk_graph(self, cx, cy):
+        """
+        (links, tile -> index, distance fields) for a chunk, where distance
+        field i holds the in-chunk BFS distance from entrance i to every tile.
+        """
+        graph = self.graphs.get((cx, cy))
+        if graph is None:
+            links = self.entrances(cx, cy)
+            tiles = list(links)
+            graph = (links, {tile: index for index, tile in enumerate(tiles)}, self.chunk_distances(cx, cy, tiles))
+            self.graphs[(cx, cy)] = graph
+        return graph
+
+    def chunk_distances(self, cx, cy, sources):
+        """
+        Breadth-first distances inside one chunk from each source tile, run for
+        all sources at once. Returns an int16 array [source, row, col] relative
+        to the chunk, UNREACHED where a tile cannot be reached.
+        """
+        size = self.chunk_size
+        col0 = cx * size
+        row0 = cy * size
+        cols = np.arange(col0, col0 + size)
+        rows = np.arange(row0, row0 + size)
+        walkable = self.walkability.tiles_walkable_batch(cols[None, :], rows[:, None])
+        distance = np.full((len(sources), size, size), UNREACHED, dtype=np.int16)
+        if not sources:
+            return distance
+        frontier = np.zeros((len(sources), size, size), dtype=bool)
+        for index, (col, row) in enumerate(sources):
+            frontier[index, row - row0, col - col0] = True
+            distance[index, row - row0, col - col0] = 0
+        step = 0
+        while frontier.any():
+            step += 1
+            grown = np.zeros_like(frontier)
+            grown[:, 1:, :] |= frontier[:, :-1, :]
+            grown[:, :-1, :] |= frontier[:, 1:, :]
+            grown[:, :, 1:] |= frontier[:, :, :-1]
+            grown[:, :, :-1] |= frontier[:, :, 1:]
+            frontier = grown & walkable & (distance == UNREACHED)
+            distance[frontier] = step
+        return distance
+
+    def warm(self, cx, cy, budget, resident=None):
+        """
+        Build the graphs of up to `budget` more chunks, nearest to chunk
+        (cx, cy) first, so searches around there find them ready instead of
+        building them mid-query. With `resident` (a test for (cx, cy) keys),
+        only chunks whose four neighbours are resident too are built, so
+        warming never loads chunks. Returns the number of graphs built.
+        """
+        if (cx, cy) != self.warm_center:
+            self.warm_center = (cx, cy)
+            self.warm_ring = 0
+        def on_map(key):
+            return 0 <= key[0] < self.chunks_x and 0 <= key[1] < self.chunks_y
+
+        def loaded(key):
+            # A chunk and the neighbours whose border tiles its graph reads
+            return resident is None or all(resident(other) or not on_map(other) for other in (
+                key, (key[0] - 1, key[1]), (key[0] + 1, key[1]), (key[0], key[1] - 1), (key[0], key[1] + 1)))
+
+        last_ring = max(cx, self.chunks_x - 1 - cx, cy, self.chunks_y - 1 - cy)
+        built = 0
+        while self.warm_ring <= last_ring:
+            complete = True
+            for key in ring_cells(cx, cy, self.warm_ring):
+                if not on_map(key) or key in self.graphs:
+                    continue
+                if not loaded(key):
+                    complete = False
+                    continue
+                if built == budget:
+                    return built
+                self.chunk_graph(*key)
+                built += 1
+            if not complete:
+                break  # Wait for the rest of this ring to become resident
+            self.warm_ring += 1
+        return built
+
+    # --- Queries ---------------------------------------------------------
+
+    def chunk_of(self, tile):
+        return tile[0] // self.chunk_size, tile[1] // self.chunk_size
+
+    def find_path(self, start, goal):
+        """
+        Tile path from `start` to `goal` (both (col, row)) as a list of tiles
+        including both ends, or None if there is no path.
+        """
+        walkability = self.walkability
+        if not (walkability.is_walkable_tile(*start) and walkability.is_walkable_tile(*goal)):
+            return None
+        if start == goal:
+            return [start]
+        start_chunk = self.chunk_of(start)
+        goal_chunk = self.chunk_of(goal)
+        start_field = self.chunk_distances(*start_chunk, [start])[0]
+        goal_field = self.chunk_distances(*goal_chunk, [goal])[0]
+
+        route = self.search_abstract(start, goal, start_chunk, goal_chunk, start_field, goal_field)
+        if route is None:
+            return None
+        return self.refine(route, start_field, goal_field)
+
+    def local_distance(self, field, chunk, tile):
+        size = self.chunk_size
+        return int(field[tile[1] - chunk[1] * size, tile[0] - chunk[0] * size])
+
+    def search_abstract(self, start, goal, start_chunk, goal_chunk, start_field, goal_field):
+        """
+        A* over entrance tiles, with the start and goal temporarily linked into
+        the graph of their chunks. Returns the list of abstract tiles visited.
+        """
+        def heuristic(tile):
+            return abs(tile[0] - goal[0]) + abs(tile[1] - goal[1])
+
+        def neighbours(tile):
+            chunk = self.chunk_of(tile)
+            if tile == start:
+                links, index, _ = self.chunk_graph(*start_chunk)
+                for other in index:
+                    cost = self.local_distance(start_field, start_chunk, other)
+                    if cost != UNREACHED:
+                        yield other, cost
+                for other in links.get(start, []):
+                    yield other, 1  # The start may itself be an entrance
+                if start_chunk == goal_chunk:
+                    cost = self.local_distance(start_field, start_chunk, goal)
+                    if cost != UNREACHED:
+                        yield goal, cost
+                return
+            links, index, fields = self.chunk_graph(*chunk)
+            field = fields[index[tile]]
+            for other in index:
+                if other != tile:
+                    cost = self.local_distance(field, chunk, other)
+                    if cost != UNREACHED:
+                        yield other, cost
+            for other in links[tile]:
+                yield other, 1
+            if chunk == goal_chunk:
+                cost = self.local_distance(goal_field, goal_chunk, tile)
+                if cost != UNREACHED:
+                    yield goal, cost
+
+        counter = itertools.count()
+        open_heap = [(heuristic(start), heuristic(start), next(counter), start)]
+        best = {start: 0}
+        came_from = {}
+        closed = set()
+        while open_heap:
+            _, _, _, tile = heapq.heappop(open_heap)
+            if tile == goal:
+                route = [tile]
+                while tile in came_from:
+                    tile = came_from[tile]
+                    route.append(tile)
+                return route[::-1]
+            if tile in closed:
+                continue
+            closed.add(tile)
+            for other, cost in neighbours(tile):
+                g = best[tile] + cost
+                if g < best.get(other, float('inf')):
+                    best[other] = g
+                    came_from[other] = tile
+                    h = heuristic(other)
+                    # Ties are broken towards the goal (smaller h first)
+                    heapq.heappush(open_heap, (g + h, h, next(counter), other))
+        return None
+
+    def refine(self, route, start_field, goal_field):
+        """
+        Expand an abstract route into individual tile steps.
+        """
+        path = [route[0]]
+        for index in range(1, len(route)):
+            source = route[index - 1]
+            target = route[index]
+            source_chunk = self.chunk_of(source)
+            if source_chunk != self.chunk_of(target):
+                path.append(target)  # Crossing an entrance is a single step
+                continue
+            if index == len(route) - 1:
+                # Into the goal: descend the goal's field from the source
+                path += self.descend(goal_field, source_chunk, source)[1:]
+                continue
+            if index == 1:
+                field = start_field
+            else:
+                links, tile_index, fields = self.chunk_graph(*source_chunk)
+                field = fields[tile_index[source]]
+            # Descend the source's field from the target, then reverse it
+            path += self.descend(field, source_chunk, target)[::-1][1:]
+        return path
+
+    def descend(self, field, chunk, tile):
+        """
+        Follow a distance field downhill from `tile` to its source (distance 0).
+        """
+        size = self.chunk_size
+        col0 = chunk[0] * size
+        row0 = chunk[1] * size
+        col, row = tile
+        steps = [tile]
+        distance = int(field[row - row0, col - col0])
+        while distance > 0:
+            for d_col, d_row in STEPS:
+                next_col = col + d_col - col0
+                next_row = row + d_row - row0
+                if 0 <= next_col < size and 0 <= next_row < size and field[next_row, next_col] == distance - 1:
+                    col += d_col
+                    row += d_row
+                    break
+            distance -= 1
+            steps.append((col, row))
+        return steps
+
+
+def ring_cells(cx, cy, ring):
+    """
+    Cells at Chebyshev distance `ring` from (cx, cy).
+    """
+    if ring == 0:
+        yield (cx, cy)
+        return
+    for x in range(cx - ring, cx + ring + 1):
+        yield (x, cy - ring)
+        yield (x, cy + ring)
+    for y in range(cy - ring + 1, cy + ring):
+        yield (cx - ring, y)
+        yield (cx + ring, y)
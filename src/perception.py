@@ -0,0 +1,46 @@
+# perception.py
+
+import numpy as np
+
+
+class Perception:
+    """
+    Line-of-sight queries over the opacity grid (see OpacityGrid).
+
+    A ray between two tiles is marched one tile at a time along its longer
+    axis; it is clear if none of the tiles strictly between its ends is
+    opaque. Any number of rays are marched together, and rays drop out of
+    the batch as soon as they are blocked or finished, so the cost follows
+    the total length of the rays that are still open.
+    """
+    def __init__(self, opacity):
+        self.opacity = opacity
+
+    def line_of_sight(self, from_col, from_row, to_col, to_row):
+        return bool(self.line_of_sight_batch(from_col, from_row, to_col, to_row))
+
+    def line_of_sight_batch(self, from_cols, from_rows, to_cols, to_rows):
+        """
+        True for each ray (from tile -> to tile) with a clear view.
+        Arguments are arrays (or scalars) of tile coordinates.
+        """
+        from_cols, from_rows, to_cols, to_rows = np.broadcast_arrays(
+            *(np.asarray(value, dtype=np.int64) for value in (from_cols, from_rows, to_cols, to_rows)))
+        shape = from_cols.shape
+        from_cols = from_cols.ravel()
+        from_rows = from_rows.ravel()
+        d_cols = to_cols.ravel() - from_cols
+        d_rows = to_rows.ravel() - from_rows
+        lengths = np.maximum(np.abs(d_cols), np.abs(d_rows))
+        clear = np.ones(lengths.size, dtype=bool)
+        active = np.nonzero(lengths > 1)[0]  # Rays with tiles between their ends
+        step = 1
+        while active.size:
+            t = step / lengths[active]
+            # Round halves up, the same way for every ray
+            cols = from_cols[active] + np.floor(d_cols[active] * t + 0.5).astype(np.int64)
+            rows = from_rows[active] + np.floor(d_rows[active] * t + 0.5).astype(np.int64)
+            clear[active] = ~self.opacity.tiles_opaque_batch(cols, rows)
+            step += 1
+            active = active[clear[active] & (lengths[active] > step)]
+        return clear.reshape(shape)
@@ -5,19 +5,13 @@ import config
 import os
 from inventory import Inventory
 from items import Item
+from asset_manager import assets
 
 class Player(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
-        # Load sprite sheet using the absolute path from config
-        try:
-            self.sprite_sheet = pygame.image.load(config.PLAYER_SPRITE_PATH).convert_alpha()
-        except pygame.error as e:
-            print(f"Unable to load player sprite at {config.PLAYER_SPRITE_PATH}: {e}")
-            # Handle the missing sprite sheet gracefully
-            self.sprite_sheet = pygame.Surface((config.PLAYER_SPRITE_WIDTH, config.PLAYER_SPRITE_HEIGHT))
-            self.sprite_sheet.fill(config.WHITE)  # Fallback color
         self.frames = self.load_frames()
+        self.variants = assets.load_variants(('player', config.PLAYER_SPRITE_PATH), self.frames)  # Tinted copies, e.g. 'damage'
         self.current_frame = 0
         self.direction = 'down'  # Initial direction
         self.image = self.frames[self.direction][self.current_frame]
@@ -39,25 +33,11 @@ class Player(pygame.sprite.Sprite):
         self.is_flashing = False
         self.flash_duration = 10  # Frames to flash
         self.flash_timer = 0
-        self.original_image = self.image.copy()
-        self.flash_color = (255, 0, 0)  # Red color for flash
         self.recoil_distance_factor = 5  # Adjust this factor to control recoil sensitivity
-        self.flash_overlay = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-        self.flash_overlay.fill((255, 0, 0, 100))  # Semi-transparent red
 
-        # Load attack sound (optional)
-        try:
-            self.attack_sound = pygame.mixer.Sound(os.path.join(config.BASE_DIR, 'assets', 'sounds', 'attack.wav'))
-        except pygame.error as e:
-            print(f"Unable to load attack sound: {e}")
-            self.attack_sound = None  # Handle missing sound gracefully
-
-        # Load hit sound (optional)
-        try:
-            self.hit_sound = pygame.mixer.Sound(os.path.join(config.BASE_DIR, 'assets', 'sounds', 'player_hit.wav'))
-        except pygame.error as e:
-            print(f"Unable to load hit sound: {e}")
-            self.hit_sound = None  # Handle missing sound gracefully
+        # Load attack and hit sounds (optional)
+        self.attack_sound = assets.load_sound(os.path.join(config.BASE_DIR, 'assets', 'sounds', 'attack.wav'))
+        self.hit_sound = assets.load_sound(os.path.join(config.BASE_DIR, 'assets', 'sounds', 'player_hit.wav'))
 
     
     def receive_xp(self, amount):
@@ -75,27 +55,24 @@ class Player(pygame.sprite.Sprite):
         0 - Up, 1 - Right, 2 - Down, 3 - Left
         Each row has 4 frames for walking animation.
         """
-        frames = {'up': [], 'right': [], 'down': [], 'left': []}
+        frame_width = config.PLAYER_SPRITE_WIDTH
+        frame_height = config.PLAYER_SPRITE_HEIGHT
+        # Scale the frames up for better visibility
+        scaled_size = (frame_width * 2, frame_height * 2)
         directions = ['up', 'right', 'down', 'left']
-        for row, direction in enumerate(directions):
-            for col in range(4):  # 4 frames per direction
-                frame_rect = (
-                    col * config.PLAYER_SPRITE_WIDTH,
-                    row * config.PLAYER_SPRITE_HEIGHT,
-                    config.PLAYER_SPRITE_WIDTH,
-                    config.PLAYER_SPRITE_HEIGHT
-                )
-                try:
-                    frame = self.sprite_sheet.subsurface(frame_rect)
-                    # Scale the frame up for better visibility
-                    scaled_frame = pygame.transform.scale(
-                        frame,
-                        (config.PLAYER_SPRITE_WIDTH * 2, config.PLAYER_SPRITE_HEIGHT * 2)
-                    )
-                    frames[direction].append(scaled_frame)
-                except ValueError as ve:
-                    print(f"Error extracting frame at {frame_rect}: {ve}")
-        return frames
+        try:
+            # Sliced and scaled once by the asset manager (or read from the asset bundle)
+            sheet_frames = assets.load_frames(config.PLAYER_SPRITE_PATH, frame_width, frame_height, scaled_size)
+        except pygame.error as e:
+            print(f"Unable to load player sprite at {config.PLAYER_SPRITE_PATH}: {e}")
+            # Handle the missing sprite sheet gracefully
+            fallback = pygame.Surface(scaled_size)
+            fallback.fill(config.WHITE)  # Fallback color
+            return {direction: [fallback] for direction in directions}
+        # Frames come back row by row, one row per direction
+        per_row = len(sheet_frames) // len(directions)
+        return {direction: sheet_frames[row * per_row:row * per_row + 4]  # 4 frames per direction
+                for row, direction in enumerate(directions)}
 
     def handle_movement(self, keys_pressed, world):
         self.moving = False
@@ -134,18 +111,20 @@ class Player(pygame.sprite.Sprite):
             self.rect.y = new_y
         else:
             # Prevent movement; provide feedback
-            print("Cannot move onto water!")
+            print("Cannot move onto water or obstacles!")
 
     def update(self, dt):
+        # While flashing, the same frame is taken from the pre-tinted copies
+        frames = self.variants['damage'] if self.is_flashing else self.frames
         if self.moving:
             self.animation_timer += config.PLAYER_ANIMATION_SPEED
             if self.animation_timer >= len(self.frames[self.direction]):
                 self.animation_timer = 0
             self.current_frame = int(self.animation_timer)
-            self.image = self.frames[self.direction][self.current_frame]
+            self.image = frames[self.direction][self.current_frame]
         else:
             # Idle frame (first frame of the current direction)
-            self.image = self.frames[self.direction][0]
+            self.image = frames[self.direction][0]
         if self.attack_cooldown > 0:
             self.attack_cooldown -= 1
         if self.is_flashing:
@@ -153,15 +132,8 @@ class Player(pygame.sprite.Sprite):
             self.flash_timer -= 1
             if self.flash_timer <= 0:
                 self.is_flashing = False
-    def draw(self, surface, camera):
-        # Calculate player's position relative to the camera
-        draw_x = self.rect.x - camera.offset_x
-        draw_y = self.rect.y - camera.offset_y
-        surface.blit(self.image, (draw_x, draw_y))
-        
-        # Draw flash overlay if flashing
-        if self.is_flashing:
-            surface.blit(self.flash_overlay, (draw_x, draw_y))
+    def submit_draw(self, draw_list):
+        draw_list.submit('entities', self.image, self.rect.x, self.rect.y)
 
     def get_attack_effect_position(self):
         """
@@ -323,7 +295,7 @@ class Player(pygame.sprite.Sprite):
             attack_range = 50  # Define the range of the attack
             attack_rect = self.get_attack_rect(attack_range)
             # Check collision with enemies within the attack_rect
-            hits = [enemy for enemy in enemies if attack_rect.colliderect(enemy.rect)]
+            hits = enemies.query_rect(attack_rect)
             if hits:
                 for enemy in hits:
                     enemy.take_damage(10)  # Define damage amount
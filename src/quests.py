@@ -2,7 +2,6 @@
 
 import random
 import config
-import pygame
 
 class Quest:
     def __init__(self, quest_type, description, objective, reward, target):
@@ -107,11 +106,15 @@ class QuestManager:
         """
         Update all active quests and handle completion.
         """
+        # Pick up items once per frame, looking only at the chunks around the player
+        collected_items = []
+        if any(quest.quest_type == 'collection' for quest in self.active_quests):
+            collected_items = world.pick_up_items(player.rect)
         for quest in self.active_quests[:]:
             if quest.quest_type == 'collection':
-                # Check if player has collected a mushroom
-                collected_items = pygame.sprite.spritecollide(player, world.active_items, True)
-                for item in collected_items:
+                # Items picked up this frame go to the first collection quest
+                quest_items, collected_items = collected_items, []
+                for item in quest_items:
                     if item.item_type == 'mushroom':
                         # Attempt to add the item to inventory
                         added = player.inventory.add_item(item, game)
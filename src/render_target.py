@@ -0,0 +1,95 @@
+# render_target.py
+
+import math
+import pygame
+import config
+
+
+class RenderTarget:
+    """
+    The surface the world is drawn to each frame, and how it reaches the window.
+
+    At config.RENDER_SCALE 1 the window itself is the target. Below 1 the
+    world is drawn into an internal surface that fraction of the window's
+    size and upscaled once per frame with pygame.transform.scale, so filling
+    and blending cost drops with the square of the scale. When the window is
+    a whole number of internal pixels wide (e.g. scale 0.5 or 1/3), the
+    frame is scaled pixel for pixel into a centred part of the window and
+    partial frames only scale their dirty rects; otherwise the whole frame
+    is stretched over the window.
+    """
+    def __init__(self, window, scale=config.RENDER_SCALE):
+        self.window = window
+        width, height = window.get_size()
+        self.scaled = scale != 1
+        factor = 1 / scale
+        self.integer = abs(factor - round(factor)) < 1e-6
+        if not self.scaled:
+            self.surface = window
+            self.view = window.get_rect()
+        elif self.integer:
+            factor = round(factor)
+            self.surface = pygame.Surface((max(1, width // factor), max(1, height // factor))).convert()
+            self.view = pygame.Rect(0, 0, self.surface.get_width() * factor, self.surface.get_height() * factor)
+            self.view.center = window.get_rect().center  # Leftover window pixels become an even black border
+        else:
+            self.surface = pygame.Surface((max(1, round(width * scale)), max(1, round(height * scale)))).convert()
+            self.view = window.get_rect()
+        self.size = self.surface.get_size()
+        self.view_surface = window.subsurface(self.view) if self.scaled else window
+        self.scale_x = self.view.width / self.size[0]  # Window pixels per internal pixel
+        self.scale_y = self.view.height / self.size[1]
+
+    def to_window(self, rect):
+        """
+        Window rect covering an internal rect.
+        """
+        if not self.scaled:
+            return pygame.Rect(rect)
+        left = self.view.x + math.floor(rect.left * self.scale_x)
+        top = self.view.y + math.floor(rect.top * self.scale_y)
+        right = self.view.x + math.ceil(rect.right * self.scale_x)
+        bottom = self.view.y + math.ceil(rect.bottom * self.scale_y)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def to_internal(self, rect):
+        """
+        Internal rect covering a window rect (e.g. where the UI was drawn).
+        """
+        if not self.scaled:
+            return pygame.Rect(rect)
+        left = math.floor((rect.left - self.view.x) / self.scale_x)
+        top = math.floor((rect.top - self.view.y) / self.scale_y)
+        right = math.ceil((rect.right - self.view.x) / self.scale_x)
+        bottom = math.ceil((rect.bottom - self.view.y) / self.scale_y)
+        return pygame.Rect(left, top, right - left, bottom - top).clip(self.surface.get_rect())
+
+    def frame_point(self, pos):
+        """
+        Internal pixel under a window position (e.g. the mouse).
+        """
+        return (int((pos[0] - self.view.x) / self.scale_x), int((pos[1] - self.view.y) / self.scale_y))
+
+    def upscale(self, rects=None):
+        """
+        Copy the internal surface to the window, everywhere or only inside `rects`.
+        """
+        if not self.scaled:
+            return
+        if rects is None or not self.integer:
+            if self.view != self.window.get_rect():
+                self.window.fill(config.BLACK)
+            pygame.transform.scale(self.surface, self.view.size, self.view_surface)
+            return
+        for rect in rects:
+            target = self.to_window(rect).move(-self.view.x, -self.view.y)
+            pygame.transform.scale(self.surface.subsurface(rect), target.size, self.view_surface.subsurface(target))
+
+    def present(self, rects=None):
+        """
+        Show the frame: a full flip, or an update of the window area under `rects`.
+        """
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update([self.to_window(rect) for rect in rects])
@@ -0,0 +1,86 @@
+# spatial_index.py
+
+import itertools
+import pygame
+
+
+class SpatialGroup(pygame.sprite.Group):
+    """
+    A sprite Group that also buckets its sprites into a uniform grid of
+    cell_size x cell_size pixel cells, keyed on world coordinates.
+
+    A sprite is registered in every cell its rect overlaps when it is
+    added, so sprites must not move while in the group (ground items).
+    Rect queries only visit the cells they cover, so their cost depends on
+    how many sprites are nearby rather than on the size of the group.
+    """
+    def __init__(self, cell_size, *sprites):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> set of sprites overlapping that cell
+        self.spans = {}  # sprite -> (cx0, cy0, cx1, cy1) inclusive range of cells it is in
+        self.order = {}  # sprite -> insertion number, to keep results in group order
+        self.counter = itertools.count()
+        super().__init__(*sprites)
+
+    def cell_span(self, rect):
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                max(rect.right - 1, rect.left) // size, max(rect.bottom - 1, rect.top) // size)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        span = self.cell_span(sprite.rect)
+        self.spans[sprite] = span
+        self.order[sprite] = next(self.counter)
+        self.link(sprite, span)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.unlink(sprite, self.spans.pop(sprite))
+        del self.order[sprite]
+
+    def link(self, sprite, span):
+        cx0, cy0, cx1, cy1 = span
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                self.cells.setdefault((cx, cy), set()).add(sprite)
+
+    def unlink(self, sprite, span):
+        cx0, cy0, cx1, cy1 = span
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = self.cells[(cx, cy)]
+                bucket.discard(sprite)
+                if not bucket:
+                    del self.cells[(cx, cy)]
+
+    def candidates(self, cx0, cy0, cx1, cy1):
+        """
+        All sprites registered in the inclusive cell range.
+        """
+        found = set()
+        cells = self.cells
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # Query covers more cells than are occupied; scan the occupied ones
+            for (cx, cy), bucket in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.update(bucket)
+            return found
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def in_group_order(self, sprites):
+        return sorted(sprites, key=self.order.__getitem__)
+
+    def query_rect(self, rect, ordered=False):
+        """
+        Sprites whose rect collides with `rect`. With ordered=True they are
+        returned in the order they were added to the group (e.g. for drawing).
+        """
+        rect = pygame.Rect(rect)
+        hits = [sprite for sprite in self.candidates(*self.cell_span(rect)) if rect.colliderect(sprite.rect)]
+        return self.in_group_order(hits) if ordered else hits
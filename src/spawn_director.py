@@ -0,0 +1,209 @@
+# spawn_director.py
+
+import random
+import numpy as np
+import pygame
+import config
+from tile_store import TERRAIN_TYPES
+from enemy_system import DIRECTION_STEPS, ENEMY_SPEED, IDLE
+
+
+class SpawnDirector:
+    """
+    Keeps a steady enemy population around the player, and puts the
+    population of distant chunks to sleep.
+
+    Every chunk within config.SPAWN_RADIUS chunks of the player has a target
+    number of enemies, derived from its terrain (config.ENEMY_DENSITY), and
+    each pass tops up the chunks below their target at positions outside
+    the camera view.
+
+    Enemies more than config.SLEEP_RADIUS chunks away leave the enemy
+    system and are kept as compact records (see EnemySystem.store) under
+    their chunk, at no per-frame cost. When the player comes back within
+    config.WAKE_RADIUS chunks, the chunk wakes: its enemies wander for the
+    in-game time that passed while it slept and become live again.
+
+    Passes run every config.SPAWN_INTERVAL frames and only handle a few
+    enemies each, so the population follows the player without frame spikes.
+    """
+    def __init__(self, enemy_system, world, player):
+        self.enemy_system = enemy_system
+        self.world = world
+        self.player = player
+        self.chunk_pixels = world.tiles.chunk_size * config.TILE_SIZE
+        self.densities = np.array([config.ENEMY_DENSITY.get(name, 0) for name in TERRAIN_TYPES], dtype=np.float64)
+        self.targets = {}  # (cx, cy) -> (chunk version, target enemy count)
+        self.sleeping = {}  # (cx, cy) -> list of (in-game minute put to sleep, enemy records)
+        self.timer = config.SPAWN_INTERVAL  # Run a pass on the first update
+
+    def chunk_target(self, chunk):
+        """
+        Target enemy count for a chunk: the terrain densities averaged over its tiles.
+        """
+        key = (chunk.cx, chunk.cy)
+        cached = self.targets.get(key)
+        if cached is None or cached[0] != chunk.version:
+            cached = (chunk.version, float(self.densities[chunk.terrain].mean()))
+            self.targets[key] = cached
+        return cached[1]
+
+    def update(self, camera):
+        self.timer += 1
+        if self.timer < config.SPAWN_INTERVAL:
+            return
+        self.timer = 0
+        player_cx = self.player.rect.centerx // self.chunk_pixels
+        player_cy = self.player.rect.centery // self.chunk_pixels
+        self.sleep_far(player_cx, player_cy)
+        self.wake_near(player_cx, player_cy)
+        self.populate(player_cx, player_cy, camera)
+
+    def now(self):
+        time_manager = self.world.time_manager
+        return time_manager.total_minutes() if time_manager is not None else 0
+
+    def enemy_chunks(self):
+        """
+        Chunk coordinates of every live enemy's center.
+        """
+        system = self.enemy_system
+        n = system.count
+        centers_x = system.x[:n].astype(np.int64) + system.width[:n] // 2
+        centers_y = system.y[:n].astype(np.int64) + system.height[:n] // 2
+        return centers_x // self.chunk_pixels, centers_y // self.chunk_pixels
+
+    def sleep_far(self, player_cx, player_cy):
+        """
+        Move enemies far from the player into their chunk's sleeping records.
+        """
+        cxs, cys = self.enemy_chunks()
+        far = np.nonzero(np.maximum(np.abs(cxs - player_cx), np.abs(cys - player_cy)) > config.SLEEP_RADIUS)[0]
+        far = far[:config.SLEEP_BUDGET]
+        if not far.size:
+            return
+        chunks = list(zip(cxs[far].tolist(), cys[far].tolist()))
+        records = self.enemy_system.store(far)
+        now = self.now()
+        for key in set(chunks):
+            mine = np.array([chunk == key for chunk in chunks])
+            self.sleeping.setdefault(key, []).append((now, records[mine]))
+
+    def wake_near(self, player_cx, player_cy):
+        """
+        Bring the sleeping enemies of resident chunks near the player back to life.
+        """
+        radius = config.WAKE_RADIUS
+        for cy in range(player_cy - radius, player_cy + radius + 1):
+            for cx in range(player_cx - radius, player_cx + radius + 1):
+                if (cx, cy) not in self.sleeping:
+                    continue
+                # Catch-up needs the chunk's walkability, so it must be resident
+                chunk = self.world.tiles.chunks.get((cx, cy))
+                if chunk is None:
+                    continue
+                now = self.now()
+                for slept_at, records in self.sleeping.pop((cx, cy)):
+                    self.catch_up(records, chunk, now - slept_at)
+                    self.enemy_system.restore(records)
+
+    def catch_up(self, records, chunk, minutes):
+        """
+        Advance sleeping enemies by `minutes` of in-game time in a few coarse
+        wander steps, each walked a tile at a time, keeping them on walkable
+        ground inside their chunk.
+        """
+        time_manager = self.world.time_manager
+        speed = time_manager.time_speed if time_manager is not None else 1
+        # Game.update advances the clock by 60 / FPS minutes per frame at time_speed 1
+        frames = minutes * config.FPS / (60 * speed)
+        if not config.AI_FAR_INTERVAL or not len(records):
+            return  # Far enemies are frozen, so sleeping ones are too
+        # As many coarse steps as a far enemy would have taken, up to CATCH_UP_STEPS
+        steps = int(min(config.CATCH_UP_STEPS, frames // config.AI_FAR_INTERVAL))
+        if steps <= 0:
+            return
+        step_length = min(ENEMY_SPEED * frames / steps, self.chunk_pixels / 4)
+        system = self.enemy_system
+        widths = np.array([system.type_size(system.type_names[type_id])[0] for type_id in records['type_id']])
+        heights = np.array([system.type_size(system.type_names[type_id])[1] for type_id in records['type_id']])
+        left = chunk.cx * self.chunk_pixels
+        top = chunk.cy * self.chunk_pixels
+        xs = records['x'].astype(np.float64)
+        ys = records['y'].astype(np.float64)
+        count = len(records)
+        # Each step is walked a tile at a time, so it cannot jump over obstacles
+        tile_steps = int(np.ceil(step_length / config.TILE_SIZE))
+        distances = np.arange(tile_steps + 1)[:, None] * (step_length / tile_steps)
+        for _ in range(steps):
+            # Like an idle enemy: walk one way for a while, then pick another
+            step = DIRECTION_STEPS[system.rng.integers(0, len(DIRECTION_STEPS), count)]
+            # Every stop along the way, a tile apart; all moves between stops are checked in one batch
+            path_xs = np.clip(xs + step[:, 0] * distances, left, left + self.chunk_pixels - widths)
+            path_ys = np.clip(ys + step[:, 1] * distances, top, top + self.chunk_pixels - heights)
+            resolved_xs, resolved_ys = self.world.resolve_moves(
+                path_xs[:-1].ravel(), path_ys[:-1].ravel(), path_xs[1:].ravel(), path_ys[1:].ravel(),
+                np.tile(widths, tile_steps), np.tile(heights, tile_steps))
+            blocked = ((resolved_xs != path_xs[1:].ravel()) | (resolved_ys != path_ys[1:].ravel())).reshape(tile_steps, count)
+            # Each enemy walks up to the stop before its first blocked move
+            reached = np.where(blocked.any(axis=0), blocked.argmax(axis=0), tile_steps)
+            xs = path_xs[reached, np.arange(count)]
+            ys = path_ys[reached, np.arange(count)]
+        records['x'] = xs
+        records['y'] = ys
+        records['state'] = IDLE
+
+    def populate(self, player_cx, player_cy, camera):
+        radius = config.SPAWN_RADIUS
+        size = 2 * radius + 1
+        cxs, cys = self.enemy_chunks()
+        # Live enemies per chunk of the window around the player
+        inside = (np.abs(cxs - player_cx) <= radius) & (np.abs(cys - player_cy) <= radius)
+        cells = (cys[inside] - player_cy + radius) * size + (cxs[inside] - player_cx + radius)
+        counts = np.bincount(cells, minlength=size * size)
+
+        view = pygame.Rect(camera.offset_x, camera.offset_y, camera.width, camera.height)
+        budget = config.SPAWN_BUDGET
+        # Chunks in random order, so no part of the window is always topped up first
+        cells = list(range(size * size))
+        random.shuffle(cells)
+        for cell in cells:
+            cx = player_cx + cell % size - radius
+            cy = player_cy + cell // size - radius
+            # Only resident chunks: spawning never forces a chunk to be generated
+            chunk = self.world.tiles.chunks.get((cx, cy))
+            if chunk is None:
+                continue
+            missing = int(np.ceil(self.chunk_target(chunk) - counts[cell]))
+            while missing > 0 and budget > 0:
+                if not self.spawn_in_chunk(chunk, view):
+                    break
+                missing -= 1
+                budget -= 1
+            if budget == 0:
+                return
+
+    def spawn_in_chunk(self, chunk, view):
+        """
+        Spawn one enemy at a random walkable spot of the chunk outside `view`,
+        of a type suited to the terrain there. Returns False if no spot was found.
+        """
+        size = chunk.size
+        for _ in range(config.SPAWN_ATTEMPTS):
+            local_col = random.randrange(size)
+            local_row = random.randrange(size)
+            enemy_types = config.ENEMY_BIOME_TYPES.get(TERRAIN_TYPES[chunk.terrain[local_row, local_col]])
+            if not enemy_types:
+                continue
+            enemy_type = random.choice(enemy_types)
+            width, height = self.enemy_system.type_size(enemy_type)
+            x = (chunk.cx * size + local_col) * config.TILE_SIZE
+            y = (chunk.cy * size + local_row) * config.TILE_SIZE
+            rect = pygame.Rect(x, y, width, height)
+            if rect.colliderect(view) or rect.right > config.WORLD_WIDTH or rect.bottom > config.WORLD_HEIGHT:
+                continue
+            if not self.world.is_area_walkable(rect) or self.enemy_system.query_rect(rect):
+                continue
+            self.enemy_system.spawn(x, y, enemy_type)
+            return True
+        return False
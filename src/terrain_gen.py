@@ -0,0 +1,281 @@
+# terrain_gen.py
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import config
+from tile_store import OVERLAY_IDS, TERRAIN_IDS, NO_FRUIT
+
+# Ken Perlin's reference permutation, identical to the table used by the `noise` package
+_PERM_BASE = [
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140, 36, 103, 30, 69,
+    142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120, 234, 75, 0, 26, 197, 62, 94, 252,
+    219, 203, 117, 35, 11, 32, 57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168,
+    68, 175, 74, 165, 71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211,
+    133, 230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161, 1, 216, 80,
+    73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130, 116, 188, 159, 86, 164, 100,
+    109, 198, 173, 186, 3, 64, 52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82,
+    85, 212, 207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248,
+    152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98,
+    108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228, 251, 34, 242, 193, 238,
+    210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31,
+    181, 199, 106, 157, 184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138, 236, 205,
+    93, 222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156, 180
+]
+PERM = np.array(_PERM_BASE * 2, dtype=np.intp)
+# Gradient index for a lattice corner: PERM[PERM[A + j]] & 15, folded into one lookup
+CORNER_HASH = PERM[PERM] & 15
+
+# x/y components of the 16 gradient vectors used for 2D noise
+GRAD_X = np.array([1, -1, 1, -1, 1, -1, 1, -1, 0, 0, 0, 0, 1, -1, 0, 0], dtype=np.float32)
+GRAD_Y = np.array([1, 1, -1, -1, 0, 0, 0, 0, 1, -1, 1, -1, 0, 0, -1, 1], dtype=np.float32)
+
+# Upper bounds of each terrain ID after normalizing noise to [0,1]:
+# water < 0.1 <= sand < 0.3 <= grass < 0.6 <= forest < 0.7 <= mountain
+BIOME_THRESHOLDS = np.array([0.1, 0.3, 0.6, 0.7])
+
+# Bump whenever a change to this module alters generated tiles; invalidates on-disk world caches
+GENERATOR_VERSION = 1
+
+# config settings that worker processes must share with the parent
+GENERATION_SETTINGS = ('WORLD_SEED', 'CHUNK_SIZE', 'NOISE_SCALE', 'NOISE_OCTAVES', 'NOISE_PERSISTENCE',
+                       'NOISE_LACUNARITY', 'NOISE_REPEAT', 'NOISE_BASE')
+
+# Biome-specific overlay chances
+TREE_CHANCE = 0.5
+FRUIT_CHANCE = 0.01
+FLOWER_CHANCE = 0.005
+ROCK_CHANCE = 0.02
+SANDCASTLE_CHANCE = 0.001
+
+
+def _fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def _lattice(coords, repeat, base):
+    """
+    Split 1D float32 coordinates into wrapped lattice indices and fractional parts,
+    exactly as noise2() in the `noise` package does.
+    """
+    repeat = np.float32(repeat)
+    i = np.floor(np.fmod(coords, repeat)).astype(np.intp)
+    ii = np.fmod((i + 1).astype(np.float32), repeat).astype(np.intp)
+    i = (i & 255) + base
+    ii = (ii & 255) + base
+    frac = coords - np.floor(coords)
+    return i, ii, frac
+
+
+def _noise2_grid(xs, ys, repeatx, repeaty, base):
+    """
+    Single octave of 2D Perlin noise for every (y, x) pair of the 1D inputs.
+    Returns a float32 array indexed [row, col].
+    """
+    i, ii, x = _lattice(xs, repeatx, base)
+    j, jj, y = _lattice(ys, repeaty, base)
+    fx = _fade(x)[np.newaxis, :]
+    fy = _fade(y)[:, np.newaxis]
+    x = x[np.newaxis, :]
+    y = y[:, np.newaxis]
+    j = j[:, np.newaxis]
+    jj = jj[:, np.newaxis]
+
+    a = PERM[i][np.newaxis, :]
+    b = PERM[ii][np.newaxis, :]
+    aa = CORNER_HASH[a + j]
+    ab = CORNER_HASH[a + jj]
+    ba = CORNER_HASH[b + j]
+    bb = CORNER_HASH[b + jj]
+
+    x1 = x - 1
+    y1 = y - 1
+    g_aa = x * GRAD_X[aa] + y * GRAD_Y[aa]
+    g_ba = x1 * GRAD_X[ba] + y * GRAD_Y[ba]
+    g_ab = x * GRAD_X[ab] + y1 * GRAD_Y[ab]
+    g_bb = x1 * GRAD_X[bb] + y1 * GRAD_Y[bb]
+
+    top = g_aa + fx * (g_ba - g_aa)
+    bottom = g_ab + fx * (g_bb - g_ab)
+    return top + fy * (bottom - top)
+
+
+def pnoise2_grid(xs, ys, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024, base=0):
+    """
+    Vectorized equivalent of noise.pnoise2 evaluated on the grid spanned by
+    the 1D coordinate arrays `xs` (columns) and `ys` (rows).
+    Returns a float32 array of shape (len(ys), len(xs)).
+    """
+    xs = np.asarray(xs, dtype=np.float32)
+    ys = np.asarray(ys, dtype=np.float32)
+    if octaves == 1:
+        return _noise2_grid(xs, ys, repeatx, repeaty, base)
+
+    freq = np.float32(1.0)
+    amp = np.float32(1.0)
+    max_amp = np.float32(0.0)
+    persistence = np.float32(persistence)
+    lacunarity = np.float32(lacunarity)
+    total = np.zeros((len(ys), len(xs)), dtype=np.float32)
+    for _ in range(octaves):
+        total += _noise2_grid(xs * freq, ys * freq,
+                              np.float32(repeatx) * freq, np.float32(repeaty) * freq, base) * amp
+        max_amp += amp
+        freq *= lacunarity
+        amp *= persistence
+    return total / max_amp
+
+
+def terrain_noise(col0, row0, width, height):
+    """
+    Normalized [0,1] terrain noise for a rectangular block of tiles.
+    """
+    scale = config.NOISE_SCALE
+    xs = (np.arange(col0, col0 + width, dtype=np.float64) / scale).astype(np.float32)
+    ys = (np.arange(row0, row0 + height, dtype=np.float64) / scale).astype(np.float32)
+    noise_val = pnoise2_grid(xs, ys,
+                             octaves=config.NOISE_OCTAVES,
+                             persistence=config.NOISE_PERSISTENCE,
+                             lacunarity=config.NOISE_LACUNARITY,
+                             repeatx=config.NOISE_REPEAT,
+                             repeaty=config.NOISE_REPEAT,
+                             base=config.NOISE_BASE)
+    return noise_val.astype(np.float64) + 0.5
+
+
+def classify_biomes(noise_val):
+    """
+    Map normalized noise values to terrain IDs with a single thresholding pass.
+    """
+    return np.digitize(noise_val, BIOME_THRESHOLDS).astype(np.uint8)
+
+
+def roll_features(terrain, rng, fruit_count):
+    """
+    Roll overlays and fruit for a block of terrain IDs as vectorized masks.
+    Returns (overlay, fruit) uint8 arrays with the same shape as `terrain`.
+    """
+    rolls = rng.random(terrain.shape)
+    overlay = np.zeros(terrain.shape, dtype=np.uint8)
+
+    trees = (terrain == TERRAIN_IDS['forest']) & (rolls < TREE_CHANCE)
+    overlay[trees] = OVERLAY_IDS['tree']
+    overlay[(terrain == TERRAIN_IDS['grass']) & (rolls < FLOWER_CHANCE)] = OVERLAY_IDS['flower']
+    overlay[(terrain == TERRAIN_IDS['mountain']) & (rolls < ROCK_CHANCE)] = OVERLAY_IDS['rock']
+    overlay[(terrain == TERRAIN_IDS['sand']) & (rolls < SANDCASTLE_CHANCE)] = OVERLAY_IDS['sandcastle']
+
+    fruit = np.full(terrain.shape, NO_FRUIT, dtype=np.uint8)
+    if fruit_count > 0:
+        # Only trees can bear fruit, so roll just for those tiles
+        tree_rows, tree_cols = np.nonzero(trees)
+        bearing = rng.random(len(tree_rows)) < FRUIT_CHANCE
+        fruit[tree_rows[bearing], tree_cols[bearing]] = rng.integers(
+            1, fruit_count + 1, size=int(bearing.sum()), dtype=np.uint8)
+    return overlay, fruit
+
+
+def chunk_rng(seed, cx, cy):
+    """
+    Deterministic random generator for one chunk, derived from the world seed
+    and the chunk coordinates so chunks can be generated in any order.
+    """
+    return np.random.default_rng([seed, cx & 0xFFFFFFFF, cy & 0xFFFFFFFF])
+
+
+def generate_terrain(col0, row0, width, height):
+    """
+    Terrain IDs for a rectangular block of tiles (no overlays or fruit).
+    """
+    return classify_biomes(terrain_noise(col0, row0, width, height))
+
+
+def generate_region(col0, row0, width, height, seed, fruit_count, chunk_size=config.CHUNK_SIZE):
+    """
+    Generate terrain, overlay and fruit arrays for a chunk-aligned block of tiles.
+    Noise is computed for the whole block at once; overlays and fruit are rolled
+    per chunk from chunk_rng, so the result does not depend on how the map is
+    split into regions.
+    """
+    terrain = generate_terrain(col0, row0, width, height)
+    overlay = np.zeros(terrain.shape, dtype=np.uint8)
+    fruit = np.zeros(terrain.shape, dtype=np.uint8)
+    for y in range(0, height, chunk_size):
+        for x in range(0, width, chunk_size):
+            rng = chunk_rng(seed, (col0 + x) // chunk_size, (row0 + y) // chunk_size)
+            block = terrain[y:y + chunk_size, x:x + chunk_size]
+            overlay[y:y + chunk_size, x:x + chunk_size], fruit[y:y + chunk_size, x:x + chunk_size] = \
+                roll_features(block, rng, fruit_count)
+    return terrain, overlay, fruit
+
+
+def split_regions(cols, rows, region_size):
+    """
+    Split a cols x rows tile block into rectangular (col0, row0, width, height) regions.
+    """
+    return [(col0, row0, min(region_size, cols - col0), min(region_size, rows - row0))
+            for row0 in range(0, rows, region_size)
+            for col0 in range(0, cols, region_size)]
+
+
+def _init_worker(settings):
+    """
+    Make a worker process see the same generation settings as the parent.
+    """
+    for name, value in settings.items():
+        setattr(config, name, value)
+
+
+def _generate_into_shared(shm_name, shape, region, seed, fruit_count):
+    """
+    Worker entry point: generate one region and write it straight into the
+    shared (3, rows, cols) layer array.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        layers = np.ndarray((3,) + shape, dtype=np.uint8, buffer=shm.buf)
+        col0, row0, width, height = region
+        block = (slice(row0, row0 + height), slice(col0, col0 + width))
+        layers[0][block], layers[1][block], layers[2][block] = \
+            generate_region(col0, row0, width, height, seed, fruit_count)
+        del layers  # Release the buffer before closing the shared memory
+    finally:
+        shm.close()
+
+
+def generate_world_arrays(cols, rows, seed, fruit_count, workers=1):
+    """
+    Generate whole-map terrain, overlay and fruit arrays. `cols` and `rows`
+    must be multiples of config.CHUNK_SIZE.
+
+    The map is split into fixed regions of GENERATION_REGION_CHUNKS chunks
+    per side. With workers > 1 the regions are generated by a process pool
+    writing into shared memory. Randomness is derived per chunk, so the
+    output is identical for any worker count.
+    """
+    shape = (rows, cols)
+    regions = split_regions(cols, rows, config.GENERATION_REGION_CHUNKS * config.CHUNK_SIZE)
+
+    if workers <= 1 or len(regions) == 1:
+        terrain = np.empty(shape, dtype=np.uint8)
+        overlay = np.empty(shape, dtype=np.uint8)
+        fruit = np.empty(shape, dtype=np.uint8)
+        for col0, row0, width, height in regions:
+            block = (slice(row0, row0 + height), slice(col0, col0 + width))
+            terrain[block], overlay[block], fruit[block] = \
+                generate_region(col0, row0, width, height, seed, fruit_count)
+        return terrain, overlay, fruit
+
+    settings = {name: getattr(config, name) for name in GENERATION_SETTINGS}
+    shm = shared_memory.SharedMemory(create=True, size=3 * rows * cols)
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(regions)),
+                                 initializer=_init_worker, initargs=(settings,)) as pool:
+            futures = [pool.submit(_generate_into_shared, shm.name, shape, region, seed, fruit_count)
+                       for region in regions]
+            for future in futures:
+                future.result()  # Re-raise any worker error
+        layers = np.ndarray((3,) + shape, dtype=np.uint8, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return layers[0], layers[1], layers[2]
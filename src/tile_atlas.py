@@ -0,0 +1,126 @@
+# tile_atlas.py
+
+import pygame
+import config
+from tile_store import TERRAIN_TYPES, TERRAIN_IDS, OVERLAY_IDS, OVERLAY_TYPES, NO_FRUIT
+
+ATLAS_COLUMNS = 16  # Cells per atlas row
+
+# Overlays each terrain can end up with: rolled by terrain_gen.roll_features
+# plus the paths stamped by World.generate_paths. Fruit only grows on trees,
+# and a path laid over a tree keeps its fruit.
+EXPECTED_OVERLAYS = {
+    'sand': ['sandcastle'],
+    'grass': ['flower', 'path_vertical', 'path_horizontal'],
+    'forest': ['tree', 'path_vertical', 'path_horizontal'],
+    'mountain': ['rock'],
+}
+FRUIT_BEARING = {
+    'forest': ['tree', 'path_vertical', 'path_horizontal'],
+}
+
+
+class TileAtlas:
+    """
+    One Surface holding a pre-composited tile-sized cell for every (terrain,
+    overlay, fruit) combination: terrain image, mountain/sand decoration,
+    overlay and fruit baked together, so drawing a tile is a single blit.
+
+    Combinations the generator can produce are baked up front; anything else
+    (e.g. tiles edited at runtime) is baked the first time it is requested.
+    Water is animated and drawn separately, so it never gets a cell; an
+    overlay or fruit on water is drawn from a transparent decal instead.
+    """
+    def __init__(self, images):
+        self.images = images
+        self.cell_size = config.TILE_SIZE
+        self.cells = {}  # (terrain_id, overlay_id, fruit_id) -> Rect in self.surface
+        self.decals = {}  # (overlay_id, fruit_id) -> transparent Surface, for tiles over water
+        # Terrain images are opaque, so every baked cell is too; an opaque
+        # display-format atlas makes each tile blit a plain copy
+        self.surface = pygame.Surface((ATLAS_COLUMNS * self.cell_size, self.cell_size)).convert()
+        self.bake_expected()
+
+    def bake_expected(self):
+        fruit_ids = range(1, len(self.images.get('fruit', [])) + 1)
+        for tile_type in TERRAIN_TYPES:
+            if tile_type == 'water':
+                continue
+            terrain_id = TERRAIN_IDS[tile_type]
+            self.rect_for(terrain_id, 0, NO_FRUIT)
+            for overlay in EXPECTED_OVERLAYS.get(tile_type, []):
+                self.rect_for(terrain_id, OVERLAY_IDS[overlay], NO_FRUIT)
+            for overlay in FRUIT_BEARING.get(tile_type, []):
+                for fruit_id in fruit_ids:
+                    self.rect_for(terrain_id, OVERLAY_IDS[overlay], fruit_id)
+
+    def rect_for(self, terrain_id, overlay_id, fruit_id):
+        """
+        Return the atlas Rect for a tile combination, baking it if needed.
+        """
+        key = (terrain_id, overlay_id, fruit_id)
+        rect = self.cells.get(key)
+        if rect is None:
+            rect = self.allocate_cell()
+            self.compose(rect, terrain_id, overlay_id, fruit_id)
+            self.cells[key] = rect
+        return rect
+
+    def decal_for(self, overlay_id, fruit_id):
+        """
+        Return a tile-sized Surface with only the overlay and fruit layers on
+        a transparent background, baking it if needed.
+        """
+        key = (overlay_id, fruit_id)
+        decal = self.decals.get(key)
+        if decal is None:
+            size = self.cell_size
+            if overlay_id:
+                # Copied rather than blitted, so its alpha is kept exactly
+                decal = self.images[OVERLAY_TYPES[overlay_id]].copy()
+            else:
+                decal = pygame.Surface((size, size), pygame.SRCALPHA).convert_alpha()
+                decal.fill((0, 0, 0, 0))
+            if fruit_id != NO_FRUIT and fruit_id <= len(self.images['fruit']):
+                decal.blit(self.images['fruit'][fruit_id - 1], (0, 0))
+            self.decals[key] = decal
+        return decal
+
+    def allocate_cell(self):
+        """
+        Reserve the next free cell, growing the atlas by a row when it is full.
+        """
+        index = len(self.cells)
+        col = index % ATLAS_COLUMNS
+        row = index // ATLAS_COLUMNS
+        if (row + 1) * self.cell_size > self.surface.get_height():
+            grown = pygame.Surface((self.surface.get_width(), (row + 1) * self.cell_size)).convert()
+            grown.blit(self.surface, (0, 0))
+            self.surface = grown
+        return pygame.Rect(col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
+
+    def compose(self, rect, terrain_id, overlay_id, fruit_id):
+        """
+        Draw terrain, decorations, overlay and fruit into one atlas cell.
+        """
+        size = self.cell_size
+        cell = pygame.Surface((size, size), pygame.SRCALPHA)
+        cell.fill((0, 0, 0, 0))
+        tile_type = TERRAIN_TYPES[terrain_id]
+        cell.blit(self.images.get(tile_type, self.images['grass']), (0, 0))
+
+        # Add biome-specific patterns
+        if tile_type == 'mountain':
+            # Example: Add mountain peaks or shading
+            pygame.draw.polygon(cell, (100, 100, 100), [(0, size), (size // 2, 0), (size, size)], 1)
+        elif tile_type == 'sand':
+            # Example: Add sand dunes or ripples
+            pygame.draw.line(cell, (210, 180, 140), (0, size - 2), (size, 2), 1)
+
+        # Draw overlays
+        if overlay_id:
+            cell.blit(self.images[OVERLAY_TYPES[overlay_id]], (0, 0))
+        # Draw fruit if present
+        if fruit_id != NO_FRUIT and fruit_id <= len(self.images['fruit']):
+            cell.blit(self.images['fruit'][fruit_id - 1], (0, 0))
+        self.surface.blit(cell, rect)
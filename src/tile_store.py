@@ -0,0 +1,274 @@
+# tile_store.py
+
+import numpy as np
+import config
+from walkability import WalkabilityGrid, OpacityGrid
+
+# ID <-> name tables for the compact tile layers.
+# Terrain IDs are ordered by noise threshold (see terrain_gen.BIOME_THRESHOLDS).
+TERRAIN_TYPES = ['water', 'sand', 'grass', 'forest', 'mountain']
+TERRAIN_IDS = {name: index for index, name in enumerate(TERRAIN_TYPES)}
+
+# Overlay ID 0 means "no overlay"
+OVERLAY_TYPES = [None, 'tree', 'flower', 'rock', 'sandcastle', 'path_vertical', 'path_horizontal']
+OVERLAY_IDS = {name: index for index, name in enumerate(OVERLAY_TYPES)}
+
+# The fruit layer stores the fruit frame index + 1, so 0 means "no fruit"
+NO_FRUIT = 0
+
+LAYERS = ('terrain', 'overlay', 'fruit')
+
+# Overlays that block movement even on walkable terrain
+BLOCKING_OVERLAY_IDS = [OVERLAY_IDS[name] for name in config.BLOCKING_OVERLAYS]
+
+# Terrain and overlays that block line of sight
+SIGHT_BLOCKING_TERRAIN_IDS = [TERRAIN_IDS[name] for name in config.SIGHT_BLOCKING_TERRAIN]
+SIGHT_BLOCKING_OVERLAY_IDS = [OVERLAY_IDS[name] for name in config.SIGHT_BLOCKING_OVERLAYS]
+
+
+def walkable_mask(terrain, overlay):
+    """
+    Boolean walkability of a block of tiles: anything but water, unless a
+    blocking overlay sits on it.
+    """
+    return (terrain != TERRAIN_IDS['water']) & ~np.isin(overlay, BLOCKING_OVERLAY_IDS)
+
+
+def opaque_mask(terrain, overlay):
+    """
+    Boolean opacity of a block of tiles: mountains, and tiles with a tree or rock.
+    """
+    return np.isin(terrain, SIGHT_BLOCKING_TERRAIN_IDS) | np.isin(overlay, SIGHT_BLOCKING_OVERLAY_IDS)
+
+
+class TileChunk:
+    """
+    A fixed-size square block of tiles stored as compact uint8 arrays.
+    Arrays are indexed [row, col] relative to the chunk's top-left tile.
+    """
+    def __init__(self, cx, cy, size, terrain=None, overlay=None, fruit=None):
+        self.cx = cx
+        self.cy = cy
+        self.size = size
+        self.terrain = terrain if terrain is not None else np.zeros((size, size), dtype=np.uint8)
+        self.overlay = overlay if overlay is not None else np.zeros((size, size), dtype=np.uint8)
+        self.fruit = fruit if fruit is not None else np.zeros((size, size), dtype=np.uint8)
+        self.version = 0  # Bumped whenever the chunk's contents change
+        self.modified = False  # True once gameplay edits diverge from the generated contents
+
+    def layer(self, name):
+        return getattr(self, name)
+
+    def nbytes(self):
+        return self.terrain.nbytes + self.overlay.nbytes + self.fruit.nbytes
+
+
+class ChunkedTileStore:
+    """
+    Tile map split into fixed-size chunks of uint8 terrain/overlay/fruit IDs.
+    All coordinates are in tiles (columns and rows), not pixels.
+
+    Without a chunk_loader every chunk is allocated up front. With one, chunks
+    are created lazily by chunk_loader(cx, cy) the first time they are touched
+    and can later be evicted again.
+
+    `arrays` may supply whole-map (terrain, overlay, fruit) arrays padded to a
+    multiple of chunk_size; chunks then become views into them instead of
+    owning separate buffers.
+
+    `walkability` and `opacity` are bit grids derived from the terrain and
+    overlay layers, held per chunk like the layers themselves. They are
+    filled in as chunks are loaded (or by rebuild_walkability), updated by
+    set_tile and dropped with evicted chunks. Asking either grid about a
+    chunk that is not resident loads it, the same as reading its tiles.
+    """
+    def __init__(self, cols, rows, chunk_size=config.CHUNK_SIZE, chunk_loader=None, arrays=None):
+        self.cols = cols
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.chunks_x = -(-cols // chunk_size)  # Ceiling division
+        self.chunks_y = -(-rows // chunk_size)
+        self.chunk_loader = chunk_loader
+        self.chunks = {}
+        self.arrays = None  # Whole-map layer arrays, when chunks are views into them
+        self.walkability = WalkabilityGrid(cols, rows, chunk_size, loader=self.load_chunk_bits)
+        self.opacity = OpacityGrid(cols, rows, chunk_size, loader=self.load_chunk_bits)
+        if arrays is not None:
+            self.attach_arrays(*arrays)
+        elif chunk_loader is None:
+            for cy in range(self.chunks_y):
+                for cx in range(self.chunks_x):
+                    self.chunks[(cx, cy)] = TileChunk(cx, cy, chunk_size)
+
+    def attach_arrays(self, terrain, overlay, fruit):
+        """
+        Replace all chunks with views into whole-map layer arrays of shape
+        (chunks_y * chunk_size, chunks_x * chunk_size).
+        """
+        size = self.chunk_size
+        expected = (self.chunks_y * size, self.chunks_x * size)
+        if terrain.shape != expected:
+            raise ValueError(f"Expected layer arrays of shape {expected}, got {terrain.shape}")
+        self.arrays = (terrain, overlay, fruit)
+        self.chunks = {}
+        for cy in range(self.chunks_y):
+            for cx in range(self.chunks_x):
+                block = (slice(cy * size, (cy + 1) * size), slice(cx * size, (cx + 1) * size))
+                self.chunks[(cx, cy)] = TileChunk(cx, cy, size, terrain[block], overlay[block], fruit[block])
+
+    def in_bounds(self, col, row):
+        return 0 <= col < self.cols and 0 <= row < self.rows
+
+    def get_chunk(self, cx, cy):
+        """
+        Return the chunk at chunk coordinates (cx, cy), loading it if needed.
+        Returns None for chunks outside the map.
+        """
+        chunk = self.chunks.get((cx, cy))
+        if chunk is None and self.chunk_loader is not None:
+            if 0 <= cx < self.chunks_x and 0 <= cy < self.chunks_y:
+                chunk = self.chunk_loader(cx, cy)
+                self.chunks[(cx, cy)] = chunk
+                self.update_chunk_walkability(chunk)
+        return chunk
+
+    def load_chunk_bits(self, cx, cy):
+        """
+        Make sure chunk (cx, cy) is resident and has walkability and opacity
+        bits (the bit grids call this for chunks they have no bits for).
+        """
+        chunk = self.get_chunk(cx, cy)
+        if chunk is not None and (cx, cy) not in self.walkability.slots:
+            self.update_chunk_walkability(chunk)
+
+    def update_chunk_walkability(self, chunk):
+        """
+        Re-derive the walkability and opacity bits of one chunk from its layers.
+        """
+        size = self.chunk_size
+        self.walkability.write_region(chunk.cx * size, chunk.cy * size,
+                                      walkable_mask(chunk.terrain, chunk.overlay))
+        self.opacity.write_region(chunk.cx * size, chunk.cy * size, opaque_mask(chunk.terrain, chunk.overlay))
+
+    def rebuild_walkability(self):
+        """
+        Re-derive the walkability and opacity bits of every resident chunk.
+        """
+        if self.arrays is not None:
+            # Chunks are views into whole-map arrays; derive everything in one pass
+            terrain, overlay, _ = self.arrays
+            self.walkability.write_region(0, 0, walkable_mask(terrain, overlay))
+            self.opacity.write_region(0, 0, opaque_mask(terrain, overlay))
+            return
+        for chunk in self.chunks.values():
+            self.update_chunk_walkability(chunk)
+
+    def chunk_for_tile(self, col, row):
+        """
+        Return (chunk, local_col, local_row) for the given tile.
+        """
+        size = self.chunk_size
+        return self.get_chunk(col // size, row // size), col % size, row % size
+
+    def evict_outside(self, cx0, cy0, cx1, cy1):
+        """
+        Drop resident chunks outside the chunk window [cx0, cx1) x [cy0, cy1).
+        Unmodified chunks are regenerated from the seed when touched again;
+        modified chunks are kept. Returns the number of chunks evicted.
+        """
+        if self.chunk_loader is None:
+            return 0
+        evicted = [key for key, chunk in self.chunks.items()
+                   if not chunk.modified and not (cx0 <= key[0] < cx1 and cy0 <= key[1] < cy1)]
+        for key in evicted:
+            del self.chunks[key]
+            self.walkability.drop_chunk(*key)
+            self.opacity.drop_chunk(*key)
+        return len(evicted)
+
+    def tile_at(self, col, row):
+        """
+        Return the (terrain_id, overlay_id, fruit_id) triple for a tile.
+        """
+        chunk, lc, lr = self.chunk_for_tile(col, row)
+        return int(chunk.terrain[lr, lc]), int(chunk.overlay[lr, lc]), int(chunk.fruit[lr, lc])
+
+    def terrain_at(self, col, row):
+        chunk, lc, lr = self.chunk_for_tile(col, row)
+        return int(chunk.terrain[lr, lc])
+
+    def overlay_at(self, col, row):
+        chunk, lc, lr = self.chunk_for_tile(col, row)
+        return int(chunk.overlay[lr, lc])
+
+    def set_tile(self, col, row, terrain=None, overlay=None, fruit=None):
+        """
+        Change one or more layers of a single tile and mark its chunk as modified.
+        """
+        chunk, lc, lr = self.chunk_for_tile(col, row)
+        if terrain is not None:
+            chunk.terrain[lr, lc] = terrain
+        if overlay is not None:
+            chunk.overlay[lr, lc] = overlay
+        if fruit is not None:
+            chunk.fruit[lr, lc] = fruit
+        chunk.version += 1
+        chunk.modified = True
+        if terrain is not None or overlay is not None:
+            self.walkability.set_tile(col, row, bool(walkable_mask(chunk.terrain[lr, lc], chunk.overlay[lr, lc])))
+            self.opacity.set_tile(col, row, bool(opaque_mask(chunk.terrain[lr, lc], chunk.overlay[lr, lc])))
+
+    def read_region(self, layer, col0, row0, width, height, fill=0):
+        """
+        Copy a rectangular block of one layer into a new array indexed [row, col].
+        Tiles outside the map (or in missing chunks) are set to `fill`.
+        """
+        out = np.full((height, width), fill, dtype=np.uint8)
+        size = self.chunk_size
+        col1 = min(col0 + width, self.cols)
+        row1 = min(row0 + height, self.rows)
+        for cy in range(max(row0, 0) // size, (row1 - 1) // size + 1 if row1 > 0 else 0):
+            for cx in range(max(col0, 0) // size, (col1 - 1) // size + 1 if col1 > 0 else 0):
+                chunk = self.get_chunk(cx, cy)
+                if chunk is None:
+                    continue
+                # Overlap between the chunk and the requested block, in tile coordinates
+                x0 = max(col0, cx * size, 0)
+                x1 = min(col1, (cx + 1) * size)
+                y0 = max(row0, cy * size, 0)
+                y1 = min(row1, (cy + 1) * size)
+                if x0 >= x1 or y0 >= y1:
+                    continue
+                out[y0 - row0:y1 - row0, x0 - col0:x1 - col0] = \
+                    chunk.layer(layer)[y0 - cy * size:y1 - cy * size, x0 - cx * size:x1 - cx * size]
+        return out
+
+    def write_region(self, col0, row0, terrain, overlay=None, fruit=None):
+        """
+        Copy [row, col] arrays for a rectangular block of tiles into the chunks.
+        """
+        layers = {'terrain': terrain, 'overlay': overlay, 'fruit': fruit}
+        height, width = terrain.shape
+        size = self.chunk_size
+        for cy in range(row0 // size, (row0 + height - 1) // size + 1):
+            for cx in range(col0 // size, (col0 + width - 1) // size + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    continue
+                x0 = max(col0, cx * size)
+                x1 = min(col0 + width, (cx + 1) * size)
+                y0 = max(row0, cy * size)
+                y1 = min(row0 + height, (cy + 1) * size)
+                for name, data in layers.items():
+                    if data is None:
+                        continue
+                    chunk.layer(name)[y0 - cy * size:y1 - cy * size, x0 - cx * size:x1 - cx * size] = \
+                        data[y0 - row0:y1 - row0, x0 - col0:x1 - col0]
+                chunk.version += 1
+                self.update_chunk_walkability(chunk)
+
+    def nbytes(self):
+        """
+        Total memory held by the tile arrays, in bytes.
+        """
+        return sum(chunk.nbytes() for chunk in self.chunks.values())
@@ -34,6 +34,12 @@ class TimeManager:
         
         self.update_overlays()
     
+    def total_minutes(self):
+        """
+        In-game minutes since the start of day 1 (does not wrap at midnight).
+        """
+        return (self.current_day - 1) * self.day_length + self.current_time
+
     def change_season(self):
         """
         Advance to the next season.
@@ -111,6 +117,12 @@ class TimeManager:
             tint_overlay.fill(tint_color)
             self.overlay.blit(tint_overlay, (0, 0))
     
+    def overlay_color(self):
+        """
+        Current colour of the lighting overlay, which is always filled uniformly.
+        """
+        return tuple(self.overlay.get_at((0, 0)))
+
     def draw_lighting(self, surface):
         """
         Draw lighting overlays onto the game surface.
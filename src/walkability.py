@@ -0,0 +1,340 @@
+# walkability.py
+
+import numpy as np
+import config
+
+WINDOW_TILES = 9  # Widest box row (in tiles) read from a single 16-bit window
+INITIAL_BLOCKS = 64  # Chunk blocks allocated up front; the pool doubles when full
+TABLE_CELLS = 1 << 16  # Largest chunk-coordinate window indexed by a lookup table
+
+
+class TileBitGrid:
+    """
+    One bit per tile of the map, stored per chunk: every chunk that has been
+    loaded owns a block of chunk_size rows packed eight tiles to a byte
+    (bit n of a byte is local column 8 * byte + n). The blocks share one
+    pooled array, so batch queries gather from all of them at once, and
+    memory follows the resident chunks rather than the size of the map.
+
+    A query touching a chunk without a block first calls loader(cx, cy),
+    which is expected to load the chunk and write its bits (so asking about
+    an unloaded chunk loads it). Tiles outside the map, or of chunks still
+    without a block, read as 0 (False). drop_chunk() frees a block again when
+    its chunk is evicted.
+
+    The grids only store results; ChunkedTileStore derives them from the
+    terrain and overlay layers and keeps them current as tiles change.
+
+    The *_batch methods take NumPy arrays (or sequences) of coordinates and
+    answer for all of them at once.
+    """
+    def __init__(self, cols, rows, chunk_size=config.CHUNK_SIZE, loader=None):
+        self.cols = cols
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.chunks_x = -(-cols // chunk_size)
+        self.chunks_y = -(-rows // chunk_size)
+        self.row_bytes = (chunk_size + 7) // 8
+        self.blocks = np.zeros((INITIAL_BLOCKS, chunk_size, self.row_bytes), dtype=np.uint8)
+        self.slots = {}  # (cx, cy) -> index of the chunk's block in self.blocks
+        self.free = list(range(INITIAL_BLOCKS - 1, -1, -1))  # Unused block indices
+        self.loader = loader
+        self.index_stale = True  # Lookup structures below need rebuilding after blocks come or go
+        self.table = None  # [cy - table_y, cx - table_x] -> block index or -1, over the resident chunks
+        self.table_x = 0
+        self.table_y = 0
+        self.sorted_keys = np.zeros(0, dtype=np.int64)  # Fallback when the resident chunks are too spread out
+        self.sorted_slots = np.zeros(0, dtype=np.intp)
+        self.version = 0  # Bumped on every change, so derived data (e.g. flow fields) can tell when to rebuild
+        self.listeners = []  # Called as listener(col0, row0, width, height) after a block of tiles changes
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def notify(self, col0, row0, width, height):
+        self.version += 1
+        for listener in self.listeners:
+            listener(col0, row0, width, height)
+
+    # --- Chunk blocks -----------------------------------------------------
+
+    def block_for(self, cx, cy):
+        """
+        Index of the block of chunk (cx, cy), allocating a cleared one if needed.
+        """
+        slot = self.slots.get((cx, cy))
+        if slot is None:
+            if not self.free:
+                grown = np.zeros((2 * len(self.blocks),) + self.blocks.shape[1:], dtype=np.uint8)
+                grown[:len(self.blocks)] = self.blocks
+                self.free = list(range(len(grown) - 1, len(self.blocks) - 1, -1))
+                self.blocks = grown
+            slot = self.free.pop()
+            self.blocks[slot] = 0
+            self.slots[(cx, cy)] = slot
+            self.index_stale = True
+        return slot
+
+    def drop_chunk(self, cx, cy):
+        """
+        Free the block of an evicted chunk. Its tiles are not changed, just
+        no longer held, so listeners are not notified.
+        """
+        slot = self.slots.pop((cx, cy), None)
+        if slot is not None:
+            self.free.append(slot)
+            self.index_stale = True
+
+    def rebuild_index(self):
+        """
+        Index the resident chunks: a table over the window of chunk
+        coordinates they span, or sorted keys if that window is too large.
+        """
+        self.index_stale = False
+        self.table = None
+        if not self.slots:
+            self.sorted_keys = np.zeros(0, dtype=np.int64)
+            self.sorted_slots = np.zeros(0, dtype=np.intp)
+            return
+        keys = np.array(list(self.slots), dtype=np.int64)
+        slots = np.fromiter(self.slots.values(), dtype=np.intp, count=len(self.slots))
+        cx0, cy0 = keys.min(axis=0)
+        cx1, cy1 = keys.max(axis=0)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) <= TABLE_CELLS:
+            self.table = np.full((cy1 - cy0 + 1, cx1 - cx0 + 1), -1, dtype=np.intp)
+            self.table[keys[:, 1] - cy0, keys[:, 0] - cx0] = slots
+            self.table_x = int(cx0)
+            self.table_y = int(cy0)
+            return
+        flat_keys = keys[:, 0] * self.chunks_y + keys[:, 1]
+        order = np.argsort(flat_keys)
+        self.sorted_keys = flat_keys[order]
+        self.sorted_slots = slots[order]
+
+    def lookup(self, cxs, cys):
+        """
+        Block index for each in-map chunk coordinate, -1 where there is none.
+        """
+        if self.index_stale:
+            self.rebuild_index()
+        if self.table is not None:
+            height, width = self.table.shape
+            if self.table_x == 0 and self.table_y == 0 and width == self.chunks_x and height == self.chunks_y:
+                return self.table.reshape(-1)[cys * width + cxs]  # The table spans the map; callers pass in-map chunks
+            # Unsigned, so coordinates left of or above the table also compare as outside it
+            tx = (cxs - self.table_x).astype(np.uintp)
+            ty = (cys - self.table_y).astype(np.uintp)
+            inside = (tx < width) & (ty < height)
+            return np.where(inside, self.table.reshape(-1)[np.where(inside, ty * width + tx, 0)], -1)
+        if self.sorted_keys.size == 0:
+            return np.full(np.shape(cxs), -1, dtype=np.intp)
+        keys = cxs.astype(np.int64) * self.chunks_y + cys
+        index = np.minimum(np.searchsorted(self.sorted_keys, keys), self.sorted_keys.size - 1)
+        return np.where(self.sorted_keys[index] == keys, self.sorted_slots[index], -1)
+
+    def chunk_slots(self, cxs, cys):
+        """
+        Like lookup(), but chunks without a block are handed to the loader first.
+        """
+        slots = self.lookup(cxs, cys)
+        if self.loader is not None:
+            missing = slots < 0
+            if missing.any():
+                for cx, cy in set(zip(cxs[missing].tolist(), cys[missing].tolist())):
+                    self.loader(cx, cy)
+                slots = self.lookup(cxs, cys)
+        return slots
+
+    def byte_indices(self, cols, rows):
+        """
+        Flat index into self.blocks of the byte holding each tile's bit, and
+        whether the tile has one (inside the map, in a chunk with a block).
+        Tiles without one get index 0.
+        """
+        cols, rows = np.broadcast_arrays(np.asarray(cols, dtype=np.intp), np.asarray(rows, dtype=np.intp))
+        # Unsigned, so negative coordinates also compare as outside the map
+        inside = (cols.astype(np.uintp) < self.cols) & (rows.astype(np.uintp) < self.rows)
+        safe_cols = np.where(inside, cols, 0)
+        safe_rows = np.where(inside, rows, 0)
+        size = self.chunk_size
+        if size & (size - 1) == 0:
+            # Power of two: shifts and masks instead of much slower integer division
+            shift = size.bit_length() - 1
+            slots = self.chunk_slots(safe_cols >> shift, safe_rows >> shift)
+            local_cols = safe_cols & (size - 1)
+            local_rows = safe_rows & (size - 1)
+        else:
+            slots = self.chunk_slots(safe_cols // size, safe_rows // size)
+            local_cols = safe_cols % size
+            local_rows = safe_rows % size
+        present = inside & (slots >= 0)
+        index = (slots * size + local_rows) * self.row_bytes + (local_cols >> 3)
+        return np.where(present, index, 0), present
+
+    # --- Reading and writing tiles --------------------------------------
+
+    def write_region(self, col0, row0, mask):
+        """
+        Store a [row, col] boolean block with its top-left tile at
+        (col0, row0). Parts of the block outside the map are ignored.
+        """
+        height = min(mask.shape[0], self.rows - row0)
+        width = min(mask.shape[1], self.cols - col0)
+        if height <= 0 or width <= 0:
+            return
+        size = self.chunk_size
+        for cy in range(row0 // size, (row0 + height - 1) // size + 1):
+            for cx in range(col0 // size, (col0 + width - 1) // size + 1):
+                # Overlap of the block with this chunk, in tiles
+                x0 = max(col0, cx * size)
+                x1 = min(col0 + width, (cx + 1) * size)
+                y0 = max(row0, cy * size)
+                y1 = min(row0 + height, (cy + 1) * size)
+                slot = self.block_for(cx, cy)  # May grow the pool, so index it afterwards
+                block = self.blocks[slot]
+                # Unpack the chunk's bits, overwrite the overlap, pack them again
+                bits = np.unpackbits(block, axis=1, bitorder='little')
+                bits[y0 - cy * size:y1 - cy * size, x0 - cx * size:x1 - cx * size] = \
+                    mask[y0 - row0:y1 - row0, x0 - col0:x1 - col0]
+                block[:] = np.packbits(bits, axis=1, bitorder='little')
+        self.notify(col0, row0, width, height)
+
+    def set_tile(self, col, row, value):
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            size = self.chunk_size
+            slot = self.block_for(col // size, row // size)
+            block = self.blocks[slot]
+            local_col = col % size
+            if value:
+                block[row % size, local_col >> 3] |= 1 << (local_col & 7)
+            else:
+                block[row % size, local_col >> 3] &= ~(1 << (local_col & 7)) & 0xFF
+            self.notify(col, row, 1, 1)
+
+    def tile(self, col, row):
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            size = self.chunk_size
+            key = (col // size, row // size)
+            if key not in self.slots and self.loader is not None:
+                self.loader(*key)
+            slot = self.slots.get(key)
+            if slot is None:
+                return False
+            local_col = col % size
+            return bool((int(self.blocks[slot, row % size, local_col >> 3]) >> (local_col & 7)) & 1)
+        return False
+
+    def tiles_batch(self, cols, rows):
+        """
+        Bits of many tiles at once. Returns a boolean array.
+        """
+        index, present = self.byte_indices(cols, rows)
+        local_cols = np.asarray(cols, dtype=np.intp) % self.chunk_size
+        return present & ((self.blocks.reshape(-1)[index] >> (local_cols & 7)) & 1).astype(bool)
+
+    def nbytes(self):
+        return len(self.slots) * self.chunk_size * self.row_bytes
+
+
+class WalkabilityGrid(TileBitGrid):
+    """
+    Whether each tile can be walked on. Tiles outside the map are never walkable.
+    """
+    def is_walkable_tile(self, col, row):
+        return self.tile(col, row)
+
+    def tiles_walkable_batch(self, cols, rows):
+        """
+        Walkability of many tiles at once. Returns a boolean array.
+        """
+        return self.tiles_batch(cols, rows)
+
+    def is_walkable_batch(self, xs, ys):
+        """
+        Walkability of the tiles under many pixel positions at once.
+        """
+        tile_size = config.TILE_SIZE
+        cols = np.floor_divide(np.asarray(xs), tile_size).astype(np.intp)
+        rows = np.floor_divide(np.asarray(ys), tile_size).astype(np.intp)
+        return self.tiles_walkable_batch(cols, rows)
+
+    def boxes_walkable_batch(self, xs, ys, widths, heights):
+        """
+        True for each pixel box (x, y, width, height) whose every overlapped
+        tile is walkable.
+        """
+        tile_size = config.TILE_SIZE
+        # Whole pixels first: integer division is much cheaper than float floor division
+        xs = np.floor(xs).astype(np.intp)
+        ys = np.floor(ys).astype(np.intp)
+        col0 = xs // tile_size
+        row0 = ys // tile_size
+        col1 = (xs + np.maximum(np.asarray(widths, dtype=np.intp) - 1, 0)) // tile_size
+        row1 = (ys + np.maximum(np.asarray(heights, dtype=np.intp) - 1, 0)) // tile_size
+        col0, row0, col1, row1 = np.broadcast_arrays(col0, row0, col1, row1)
+        result = np.ones(col0.shape, dtype=bool)
+        if result.size == 0:
+            return result
+        spans = col1 - col0 + 1
+        if spans.max() > WINDOW_TILES or self.chunk_size % 8:
+            # Wide boxes, or chunks whose rows do not end on a byte boundary:
+            # visit tile offsets up to the largest box; smaller boxes ignore the extra ones
+            for dy in range(int((row1 - row0).max()) + 1):
+                for dx in range(int(spans.max())):
+                    covered = (col0 + dx <= col1) & (row0 + dy <= row1)
+                    result &= ~covered | self.tiles_walkable_batch(col0 + dx, row0 + dy)
+            return result
+
+        # Narrow boxes: each row of a box is a run of at most WINDOW_TILES bits,
+        # read at once from a 16-bit window over the byte holding its first
+        # tile and the next one (possibly in the next chunk)
+        inside = (col0 >= 0) & (row0 >= 0) & (col1 < self.cols) & (row1 < self.rows)
+        col0 = np.where(inside, col0, 0)
+        row0 = np.where(inside, row0, 0)
+        row1 = np.where(inside, row1, 0)
+        next_col = np.minimum((col0 | 7) + 1, self.cols - 1)  # Past the map edge the run ends in the first byte
+        shift = (col0 & 7).astype(np.uint16)
+        wanted = ((1 << spans) - 1).astype(np.uint16)
+        result = inside
+        for dy in range(int((row1 - row0).max()) + 1):
+            covered = row0 + dy <= row1
+            row = np.where(covered, row0 + dy, row0)
+            # Both bytes of every window in one lookup
+            index, present = self.byte_indices(np.stack((col0, next_col)), np.stack((row, row)))
+            low_index, high_index = index
+            low_present, high_present = present
+            flat = self.blocks.reshape(-1)  # After byte_indices: loading chunks may grow the pool
+            high = np.where(high_present, flat[high_index], 0).astype(np.uint16)
+            window = flat[low_index].astype(np.uint16) | (high << 8)
+            result &= ~covered | (low_present & ((window >> shift) & wanted == wanted))
+        return result
+
+    def slide_boxes_batch(self, xs, ys, new_xs, new_ys, widths, heights):
+        """
+        Resolve moves of many boxes from (xs, ys) towards (new_xs, new_ys),
+        one axis at a time, so a box blocked on one axis still slides along
+        the other. Boxes that start on unwalkable ground move freely so they
+        can leave it. Returns the resolved (xs, ys) arrays.
+        """
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        new_xs = np.asarray(new_xs)
+        new_ys = np.asarray(new_ys)
+        stuck = ~self.boxes_walkable_batch(xs, ys, widths, heights)
+        resolved_xs = np.where(stuck | self.boxes_walkable_batch(new_xs, ys, widths, heights), new_xs, xs)
+        resolved_ys = np.where(stuck | self.boxes_walkable_batch(resolved_xs, new_ys, widths, heights), new_ys, ys)
+        return resolved_xs, resolved_ys
+
+
+class OpacityGrid(TileBitGrid):
+    """
+    Whether each tile blocks line of sight (mountains, trees, rocks).
+    """
+    def is_opaque_tile(self, col, row):
+        return self.tile(col, row)
+
+    def tiles_opaque_batch(self, cols, rows):
+        """
+        Opacity of many tiles at once. Returns a boolean array.
+        """
+        return self.tiles_batch(cols, rows)
@@ -1,154 +1,69 @@
 # world.py 
 from items import Item
+import os
 import pygame
 import random
+import numpy as np
 import config
-import noise  # Ensure the noise library is installed
+from tile_store import ChunkedTileStore, TileChunk, TERRAIN_TYPES, TERRAIN_IDS, OVERLAY_IDS
+from chunk_renderer import ChunkRenderer
+from tile_atlas import TileAtlas
+from asset_manager import assets
+from spatial_index import SpatialGroup
+from flow_field import FlowField
+from perception import Perception
+from pathfinding import HierarchicalPathfinder
+import world_cache
+from terrain_gen import generate_region, generate_terrain, generate_world_arrays
 
 
-class Tile:
-    def __init__(self, x, y, tile_type, images):
-        self.x = x
-        self.y = y
-        self.tile_type = tile_type
-        self.images = images  # Dictionary of loaded images
-        self.image = self.get_image()
-        self.is_special = False
-        self.special_type = None
-        self.overlay = None  # For biome-specific elements
-        self.has_fruit = False  # Indicates if the tile has a fruit
-        self.fruit_image = None  # Holds the assigned fruit image
-
-        # Assign overlay based on tile type
-        if self.tile_type == 'forest':
-            # 50% chance to place a tree on a forest tile
-            if random.random() < 0.5:
-                self.overlay = 'tree'
-                # 1% chance to place a fruit near a tree
-                if random.random() < 0.01:
-                    self.has_fruit = True
-                    if 'fruit' in self.images and len(self.images['fruit']) > 0:
-                        self.fruit_image = random.choice(self.images['fruit'])
-        elif self.tile_type == 'grass':
-            # 0.5% chance to place a flower on a grass tile
-            if random.random() < 0.005:
-                self.overlay = 'flower'
-        elif self.tile_type == 'mountain':
-            # 2% chance to place a rock on a mountain tile
-            if random.random() < 0.02:
-                self.overlay = 'rock'
-        elif self.tile_type == 'sand':
-            # 0.1% chance to place a sandcastle on a sand tile
-            if random.random() < 0.001:
-                self.overlay = 'sandcastle'
-            # 10% chance to place an oasis on a sand tile
-            elif random.random() < 0.1:
-                # Oasis image is not included, so skip
-                pass
-        # Add more biome-specific overlays as needed
-
-    def get_image(self):
-        if self.tile_type in config.TERRAIN_TILES:
-            if self.tile_type == 'water' and isinstance(self.images['water'], list):
-                return self.images['water'][0]  # Return the first frame as default
-            else:
-                return self.images[self.tile_type]
-        else:
-            # Fallback to grass if type unknown
-            return self.images['grass']
-
-    def draw(self, surface, camera, animated=False, animation_frame=0):
-        # Calculate position relative to camera
-        draw_x = self.x - camera.offset_x
-        draw_y = self.y - camera.offset_y
-
-        # Only draw if within the visible screen
-        if -config.TILE_SIZE < draw_x < config.WIDTH and -config.TILE_SIZE < draw_y < config.HEIGHT:
-            # For animated tiles, use the current animation frame
-            if self.tile_type == 'water' and animated:
-                # Ensure animation_frame is within bounds
-                if animation_frame < len(self.images['water']):
-                    animated_image = self.images['water'][animation_frame]
-                else:
-                    animated_image = self.images['water'][0]  # Fallback to first frame
-                surface.blit(animated_image, (draw_x, draw_y))
-            else:
-                # Ensure self.image is a Surface before blitting
-                if isinstance(self.image, pygame.Surface):
-                    surface.blit(self.image, (draw_x, draw_y))
-                else:
-                    # If self.image is unexpectedly a list, fallback to first frame
-                    if isinstance(self.image, list) and len(self.image) > 0:
-                        surface.blit(self.image[0], (draw_x, draw_y))
-                    else:
-                        # Fallback to a white square if all else fails
-                        fallback_surface = pygame.Surface((config.TILE_SIZE, config.TILE_SIZE))
-                        fallback_surface.fill(config.WHITE)
-                        surface.blit(fallback_surface, (draw_x, draw_y))
-
-            # Add biome-specific patterns
-            if self.tile_type == 'mountain':
-                # Example: Add mountain peaks or shading
-                pygame.draw.polygon(surface, (100, 100, 100),
-                                    [(draw_x, draw_y + config.TILE_SIZE),
-                                     (draw_x + config.TILE_SIZE // 2, draw_y),
-                                     (draw_x + config.TILE_SIZE, draw_y + config.TILE_SIZE)],
-                                    1)
-            elif self.tile_type == 'forest':
-                # Optionally, add additional forest-specific patterns
-                pass
-            elif self.tile_type == 'sand':
-                # Example: Add sand dunes or ripples
-                pygame.draw.line(surface, (210, 180, 140),
-                                 (draw_x, draw_y + config.TILE_SIZE - 2),
-                                 (draw_x + config.TILE_SIZE, draw_y + 2), 1)
-
-            # Draw overlays
-            if self.overlay == 'tree':
-                surface.blit(self.images['tree'], (draw_x, draw_y))
-            elif self.overlay == 'path_vertical':
-                surface.blit(self.images['path_vertical'], (draw_x, draw_y))
-            elif self.overlay == 'path_horizontal':
-                surface.blit(self.images['path_horizontal'], (draw_x, draw_y))
-            elif self.overlay == 'rock':
-                surface.blit(self.images['rock'], (draw_x, draw_y))
-            elif self.overlay == 'sandcastle':
-                surface.blit(self.images['sandcastle'], (draw_x, draw_y))
-            elif self.overlay == 'flower':
-                surface.blit(self.images['flower'], (draw_x, draw_y))
-            # Draw fruit if present
-            if self.has_fruit and self.fruit_image:
-                surface.blit(self.fruit_image, (draw_x, draw_y))
-            # Add more overlays as needed
-
 class World:
-    def __init__(self, width, height):
+    def __init__(self, width, height, time_manager=None, streaming=None):
         self.width = width
         self.height = height
-        self.tiles = []
+        self.time_manager = time_manager
+        self.streaming = config.WORLD_STREAMING if streaming is None else streaming
+        self.cols = width // config.TILE_SIZE
+        self.rows = height // config.TILE_SIZE
         # Initialize special_locations to prevent AttributeError
         self.special_locations = {}
         self.load_images()
-        self.generate_world()
-        self.generate_paths()  # Add path generation
+        self.fruit_count = len(self.images.get('fruit', []))
+        self.generate_paths()  # Path layout comes straight from noise, so it is known before any chunk exists
+        # Compact chunked tile storage (terrain, overlay and fruit IDs)
+        if self.streaming:
+            # Chunks are generated the first time the camera or a gameplay query touches them
+            self.tiles = ChunkedTileStore(self.cols, self.rows, chunk_loader=self.load_chunk)
+        else:
+            self.tiles = ChunkedTileStore(self.cols, self.rows, arrays=self.generate_world())
+            for chunk in self.tiles.chunks.values():
+                self.apply_paths(chunk)
+            self.tiles.rebuild_walkability()
+        # Steering towards the player for chasing enemies (retargeted by Game.update)
+        self.flow_field = FlowField(self.tiles.walkability)
+        # Line of sight through mountains, trees and rocks
+        self.perception = Perception(self.tiles.opacity)
+        # Long-distance routes over the chunk graph (see find_path)
+        self.pathfinder = HierarchicalPathfinder(self.tiles.walkability, self.tiles.chunk_size)
         self.animation_frame = 0  # For animated tiles
         self.animation_timer = 0
-        self.active_items = pygame.sprite.Group()
+        self.renderer = ChunkRenderer(self)
+        # Items lying on the ground, bucketed by world chunk
+        self.active_items = SpatialGroup(config.CHUNK_SIZE * config.TILE_SIZE)
 
     
     def load_images(self):
-        # Load all terrain images
+        # Load all terrain images (shared with every other user of the asset manager)
+        tile_size = (config.TILE_SIZE, config.TILE_SIZE)
         self.images = {}
         for tile_type, path in config.TERRAIN_TILES.items():
             try:
-                image = pygame.image.load(path).convert_alpha()
-                # Scale image to TILE_SIZE
-                image = pygame.transform.scale(image, (config.TILE_SIZE, config.TILE_SIZE))
-                self.images[tile_type] = image
+                # Scaled to TILE_SIZE
+                self.images[tile_type] = assets.load_image(path, tile_size)
             except pygame.error as e:
                 print(f"Unable to load {tile_type} image at {path}: {e}")
                 # Fallback to white surface
-                self.images[tile_type] = pygame.Surface((config.TILE_SIZE, config.TILE_SIZE))
+                self.images[tile_type] = pygame.Surface(tile_size)
                 self.images[tile_type].fill(config.WHITE)
 
         # Load additional elements
@@ -156,198 +71,202 @@ class World:
         for element in overlay_elements:
             try:
                 image_path = getattr(config, f"{element.upper()}_IMAGE")
-                image = pygame.image.load(image_path).convert_alpha()
                 # Handle sprite sheets for 'fruit'
                 if element == 'fruit':
-                    # Assuming 'fruit.png' is a 4x4 sprite sheet
-                    sheet_width, sheet_height = image.get_size()
-                    frame_width = config.TILE_SIZE
-                    frame_height = config.TILE_SIZE
-                    num_frames = (sheet_width // frame_width) * (sheet_height // frame_height)
-                    fruit_frames = []
-                    for row in range(sheet_height // frame_height):
-                        for col in range(sheet_width // frame_width):
-                            frame = image.subsurface(
-                                (col * frame_width, row * frame_height, frame_width, frame_height)
-                            )
-                            fruit_frames.append(pygame.transform.scale(frame, (config.TILE_SIZE, config.TILE_SIZE)))
-                    self.images['fruit'] = fruit_frames
+                    # Assuming 'fruit.png' is a 4x4 sprite sheet of tile-sized frames
+                    self.images['fruit'] = assets.load_frames(image_path, config.TILE_SIZE, config.TILE_SIZE, tile_size)
                 elif element == 'path':
                     # Load both vertical and horizontal path images
-                    path_vertical = pygame.transform.scale(image, (config.TILE_SIZE, config.TILE_SIZE))
-                    path_horizontal = pygame.transform.rotate(path_vertical, 90)
+                    path_vertical = assets.load_image(image_path, tile_size)
                     self.images['path_vertical'] = path_vertical
-                    self.images['path_horizontal'] = path_horizontal
+                    self.images['path_horizontal'] = assets.get(('rotated', image_path, tile_size, 90),
+                                                                lambda: pygame.transform.rotate(path_vertical, 90))
                 else:
-                    self.images[element] = pygame.transform.scale(image, (config.TILE_SIZE, config.TILE_SIZE))
+                    self.images[element] = assets.load_image(image_path, tile_size)
             except pygame.error as e:
                 print(f"Unable to load {element} image at {getattr(config, f'{element.upper()}_IMAGE')}: {e}")
                 # Fallback to transparent surface
                 if element == 'fruit':
                     self.images[element] = []
                 else:
-                    self.images[element] = pygame.Surface((config.TILE_SIZE, config.TILE_SIZE), pygame.SRCALPHA)
+                    self.images[element] = pygame.Surface(tile_size, pygame.SRCALPHA)
                     self.images[element].fill((0, 0, 0, 0))  # Transparent fallback
 
         # Load ocean animation frames if ocean.png is a sprite sheet
-        self.water_frames = []
         try:
             # Assuming ocean.png is a sprite sheet with frames horizontally aligned
-            ocean_sprite_sheet = pygame.image.load(config.OCEAN_ANIMATION).convert_alpha()
-            sheet_width, sheet_height = ocean_sprite_sheet.get_size()
-            frame_width = config.TILE_SIZE
-            frame_height = config.TILE_SIZE
-            num_frames = sheet_width // frame_width
-            for i in range(num_frames):
-                frame = ocean_sprite_sheet.subsurface(
-                    (i * frame_width, 0, frame_width, frame_height)
-                )
-                self.water_frames.append(pygame.transform.scale(frame, (config.TILE_SIZE, config.TILE_SIZE)))
+            self.water_frames = assets.load_frames(config.OCEAN_ANIMATION, config.TILE_SIZE, config.TILE_SIZE, tile_size)
             if not self.water_frames:
-                raise ValueError("No frames extracted from ocean.png")
+                raise pygame.error("No frames extracted from ocean.png")
             self.images['water'] = self.water_frames
             print(f"Loaded {len(self.water_frames)} frames for animated water.")
         except pygame.error as e:
             print(f"Unable to load ocean animation at {config.OCEAN_ANIMATION}: {e}")
             # Fallback to static water image
             try:
-                water_static = pygame.image.load(config.TERRAIN_TILES['water']).convert_alpha()
-                water_static = pygame.transform.scale(water_static, (config.TILE_SIZE, config.TILE_SIZE))
-                self.images['water'] = [water_static]
+                self.images['water'] = [assets.load_image(config.TERRAIN_TILES['water'], tile_size)]
                 print("Using static water image as fallback.")
             except pygame.error as ex:
                 print(f"Unable to load fallback water image: {ex}")
-                self.images['water'] = [pygame.Surface((config.TILE_SIZE, config.TILE_SIZE))]
+                self.images['water'] = [pygame.Surface(tile_size)]
                 self.images['water'][0].fill(config.BLUE)
 
+        # Bake every terrain/overlay/fruit combination into a single atlas
+        self.atlas = TileAtlas(self.images)
+
     
     def generate_world(self):
-            # Adjust Perlin noise scale for larger world
-            scale = 200.0  # Increased from 150.0 for smoother transitions in larger world
-            octaves = 4
-            persistence = 0.5
-            lacunarity = 2.0
+        """
+        Generate the whole map up front and return its (terrain, overlay, fruit)
+        arrays. A matching world cached on disk is memory-mapped instead of
+        regenerated. Otherwise large maps are split into regions that are
+        generated in parallel by a process pool (see terrain_gen.generate_world_arrays).
+        """
+        size = config.CHUNK_SIZE
+        # Generate whole chunks, including the padding past the map edge, so the
+        # result matches chunks generated one at a time in streaming mode
+        cols = -(-self.cols // size) * size
+        rows = -(-self.rows // size) * size
+        params = world_cache.generation_params(cols, rows, self.fruit_count)
+        if config.WORLD_CACHE_ENABLED:
+            arrays = world_cache.load(params)
+            if arrays is not None:
+                return arrays
 
-            self.tiles = []
-            for row in range(self.height // config.TILE_SIZE):
-                for col in range(self.width // config.TILE_SIZE):
-                    x = col * config.TILE_SIZE
-                    y = row * config.TILE_SIZE
-                    noise_val = noise.pnoise2(col / scale,
-                                            row / scale,
-                                            octaves=octaves,
-                                            persistence=persistence,
-                                            lacunarity=lacunarity,
-                                            repeatx=1024,
-                                            repeaty=1024,
-                                            base=0)
-                    # Normalize noise value to [0,1]
-                    noise_val = (noise_val + 0.5)
-                    tile_type = self.get_biome_from_noise(noise_val)
-                    tile = Tile(x, y, tile_type, self.images)
-                    self.tiles.append(tile)
-    
+        workers = config.GENERATION_WORKERS or os.cpu_count() or 1
+        if cols * rows < config.PARALLEL_GENERATION_MIN_TILES:
+            workers = 1
+        arrays = generate_world_arrays(cols, rows, config.WORLD_SEED, self.fruit_count, workers)
+        if config.WORLD_CACHE_ENABLED:
+            world_cache.save(params, arrays)
+        return arrays
 
-    def get_biome_from_noise(self, noise_val):
-        """
-        Determine biome type based on normalized noise value.
-        Adjust thresholds as needed for desired biome distribution.
-        """
-        if noise_val < 0.1:
-            return 'water'
-        elif noise_val < 0.3:
-            return 'sand'
-        elif noise_val < 0.6:
-            return 'grass'
-        elif noise_val < 0.7:
-            return 'forest'
-        else:
-            return 'mountain'
+    def load_chunk(self, cx, cy):
+        """
+        Generate a single chunk on demand (streaming mode).
+        """
+        size = self.tiles.chunk_size
+        terrain, overlay, fruit = generate_region(cx * size, cy * size, size, size,
+                                                  config.WORLD_SEED, self.fruit_count)
+        chunk = TileChunk(cx, cy, size, terrain, overlay, fruit)
+        self.apply_paths(chunk)
+        return chunk
 
     def generate_paths(self):
         """
         Generate connected paths in grass and forest biomes.
         Create multiple paths from the center in different directions.
         Paths will either lead to the edge of the world or loop back.
+        The resulting path tiles are stored per chunk in self.path_tiles and
+        stamped onto chunks by apply_paths as they are generated.
         """
-        start_x = self.width // 2
-        start_y = self.height // 2
+        start_col = (self.width // 2) // config.TILE_SIZE
+        start_row = (self.height // 2) // config.TILE_SIZE
 
         num_paths = 4  # Number of main paths
         path_length = 300  # Increased path length for better connectivity
 
         directions = ['up', 'down', 'left', 'right']
+        steps = {
+            'up': (0, -1, 'path_vertical'),
+            'down': (0, 1, 'path_vertical'),
+            'left': (-1, 0, 'path_horizontal'),
+            'right': (1, 0, 'path_horizontal'),
+        }
+        path_terrain = (TERRAIN_IDS['grass'], TERRAIN_IDS['forest'])
+        size = config.CHUNK_SIZE
 
+        self.path_tiles = {}
         for direction in directions[:num_paths]:
-            current_x = start_x
-            current_y = start_y
+            dc, dr, path_overlay = steps[direction]
+            # Terrain along the whole ray, computed directly from noise
+            end_col = start_col + dc * path_length
+            end_row = start_row + dr * path_length
+            ray = generate_terrain(min(start_col + dc, end_col), min(start_row + dr, end_row),
+                                   abs(dc) * (path_length - 1) + 1, abs(dr) * (path_length - 1) + 1).ravel()
+            if dc < 0 or dr < 0:
+                ray = ray[::-1]  # Order by distance from the start
+
+            for step in range(1, path_length + 1):
+                col = start_col + dc * step
+                row = start_row + dr * step
+                # Stop at the edge of the world, or at the first tile that is not grass or forest
+                if not (0 <= col < self.cols and 0 <= row < self.rows):
+                    break
+                if ray[step - 1] not in path_terrain:
+                    break
+                self.path_tiles.setdefault((col // size, row // size), []).append(
+                    (row % size, col % size, OVERLAY_IDS[path_overlay]))
+
+    def apply_paths(self, chunk):
+        """
+        Stamp precomputed path overlays onto a freshly generated chunk.
+        """
+        for local_row, local_col, overlay_id in self.path_tiles.get((chunk.cx, chunk.cy), []):
+            chunk.overlay[local_row, local_col] = overlay_id
+        chunk.version += 1
 
-            for _ in range(path_length):
-                if direction == 'up':
-                    new_x = current_x
-                    new_y = current_y - config.TILE_SIZE
-                    path_overlay = 'path_vertical'
-                elif direction == 'down':
-                    new_x = current_x
-                    new_y = current_y + config.TILE_SIZE
-                    path_overlay = 'path_vertical'
-                elif direction == 'left':
-                    new_x = current_x - config.TILE_SIZE
-                    new_y = current_y
-                    path_overlay = 'path_horizontal'
-                elif direction == 'right':
-                    new_x = current_x + config.TILE_SIZE
-                    new_y = current_y
-                    path_overlay = 'path_horizontal'
+    def update_streaming(self, camera):
+        """
+        Generate chunks just ahead of the camera and evict the ones far from it.
+        Does nothing unless the world is streaming.
+        """
+        if not self.streaming:
+            return
+        chunk_pixels = self.tiles.chunk_size * config.TILE_SIZE
+        cx0 = camera.offset_x // chunk_pixels
+        cy0 = camera.offset_y // chunk_pixels
+        cx1 = (camera.offset_x + camera.width) // chunk_pixels + 1
+        cy1 = (camera.offset_y + camera.height) // chunk_pixels + 1
 
-                # Check if new position is within the world
-                if 0 <= new_x < self.width and 0 <= new_y < self.height:
-                    # Find the tile at the new position
-                    tile_index = (new_y // config.TILE_SIZE) * (self.width // config.TILE_SIZE) + (new_x // config.TILE_SIZE)
-                    tile = self.tiles[tile_index]
+        margin = config.STREAM_PRELOAD_MARGIN
+        for cy in range(cy0 - margin, cy1 + margin):
+            for cx in range(cx0 - margin, cx1 + margin):
+                self.tiles.get_chunk(cx, cy)
 
-                    # Only modify tiles that are grass or forest
-                    if tile.tile_type in ['grass', 'forest']:
-                        # Set overlay to 'path_vertical' or 'path_horizontal'
-                        tile.overlay = path_overlay
-                        # Move to the new position
-                        current_x = new_x
-                        current_y = new_y
-                    else:
-                        # If tile is not grass or forest, stop path in this direction
-                        break
-                else:
-                    # If out of bounds, stop path
-                    break
+        keep = config.STREAM_KEEP_RADIUS
+        self.tiles.evict_outside(cx0 - keep, cy0 - keep, cx1 + keep, cy1 + keep)
 
-    def draw(self, surface, camera):
-        # Calculate visible area
-        start_col = max(0, camera.offset_x // config.TILE_SIZE)
-        end_col = min((camera.offset_x + camera.width) // config.TILE_SIZE + 1, self.width // config.TILE_SIZE)
-        start_row = max(0, camera.offset_y // config.TILE_SIZE)
-        end_row = min((camera.offset_y + camera.height) // config.TILE_SIZE + 1, self.height // config.TILE_SIZE)
+    def warm_pathfinder(self, x, y):
+        """
+        Build the pathfinder's abstract graph for a few more resident chunks
+        around pixel position (x, y), nearest first (see HierarchicalPathfinder.warm).
+        """
+        chunk_pixels = self.tiles.chunk_size * config.TILE_SIZE
+        self.pathfinder.warm(int(x // chunk_pixels), int(y // chunk_pixels), config.PATHFINDER_WARM_BUDGET,
+                             self.tiles.chunks.__contains__)
 
-        for row in range(start_row, end_row):
-            for col in range(start_col, end_col):
-                tile_index = row * (self.width // config.TILE_SIZE) + col
-                tile = self.tiles[tile_index]
-                animated = False
-                frame = 0
-                if tile.tile_type == 'water' and len(self.images['water']) > 1:
-                    animated = True
-                    frame = self.animation_frame % len(self.images['water'])
-                tile.draw(surface, camera, animated, frame)
-        
-        # Handle animated tiles
+    def animate(self):
+        """
+        Advance animated tiles by one frame. Returns True if the water frame changed.
+        """
         if len(self.images['water']) > 1:
             self.animation_timer += 1
             if self.animation_timer >= 10:
                 self.animation_timer = 0
                 self.animation_frame += 1
-        
-        # Draw active items
-        for item in self.active_items:
-            item.draw(surface, camera)
+                return True
+        return False
+
+    def draw(self, surface, camera):
+        # Terrain comes from pre-rendered chunk Surfaces
+        self.renderer.draw(surface, camera, self.animation_frame)
+
+    def submit_draw(self, draw_list, view):
+        """
+        Queue the active items overlapping `view` on the draw list's item layer.
+        """
+        for item in self.active_items.query_rect(view, ordered=True):
+            draw_list.submit('items', item.image, item.x, item.y)
+
+    def pick_up_items(self, rect):
+        """
+        Remove and return the active items touching `rect`.
+        Only the chunks `rect` overlaps are searched.
+        """
+        items = self.active_items.query_rect(rect, ordered=True)
+        self.active_items.remove(*items)
+        return items
 
     def get_tile_type(self, x, y):
         """
@@ -355,41 +274,75 @@ class World:
         """
         col = x // config.TILE_SIZE
         row = y // config.TILE_SIZE
-        if 0 <= col < self.width // config.TILE_SIZE and 0 <= row < self.height // config.TILE_SIZE:
-            tile_index = row * (self.width // config.TILE_SIZE) + col
-            return self.tiles[tile_index].tile_type
+        if self.tiles.in_bounds(col, row):
+            return TERRAIN_TYPES[self.tiles.terrain_at(col, row)]
         else:
             return 'water'  # Treat out-of-bounds as water
     
     def is_walkable(self, x, y):
         """
         Determine if the tile at pixel coordinates (x, y) is walkable.
+        Water and blocking overlays are not; out-of-bounds is treated as non-walkable.
         """
-        col = x // config.TILE_SIZE
-        row = y // config.TILE_SIZE
-        if 0 <= col < self.width // config.TILE_SIZE and 0 <= row < self.height // config.TILE_SIZE:
-            tile_index = row * (self.width // config.TILE_SIZE) + col
-            tile = self.tiles[tile_index]
-            return tile.tile_type != 'water'
-        else:
-            # Treat out-of-bounds as non-walkable
-            return False
-    
+        return self.tiles.walkability.is_walkable_tile(int(x // config.TILE_SIZE), int(y // config.TILE_SIZE))
+
+    def is_walkable_batch(self, xs, ys):
+        """
+        Vectorized is_walkable for arrays of pixel coordinates.
+        """
+        return self.tiles.walkability.is_walkable_batch(xs, ys)
+
+    def is_area_walkable(self, rect):
+        """
+        True if every tile under the pixel rect is walkable.
+        """
+        return bool(self.tiles.walkability.boxes_walkable_batch(rect[0], rect[1], rect[2], rect[3]))
+
+    def find_path(self, start_x, start_y, goal_x, goal_y):
+        """
+        Walkable route between two pixel positions, as a list of pixel
+        waypoints at the centers of the tiles along it (start and goal tiles
+        included). Returns None if the goal cannot be reached.
+        """
+        tile_size = config.TILE_SIZE
+        path = self.pathfinder.find_path((int(start_x // tile_size), int(start_y // tile_size)),
+                                         (int(goal_x // tile_size), int(goal_y // tile_size)))
+        if path is None:
+            return None
+        return [(col * tile_size + tile_size // 2, row * tile_size + tile_size // 2) for col, row in path]
+
+    def resolve_moves(self, prev_xs, prev_ys, xs, ys, widths, heights):
+        """
+        Undo the parts of moves from (prev_xs, prev_ys) to (xs, ys) that would
+        put boxes of the given sizes on unwalkable tiles, with one batched
+        check for all of them. The central half of each box is the footprint
+        that has to stay on walkable ground. Returns the resolved (xs, ys).
+        """
+        widths = np.asarray(widths)
+        heights = np.asarray(heights)
+        # Footprint: the central half of the box
+        offset_xs = widths // 4
+        offset_ys = heights // 4
+        resolved_xs, resolved_ys = self.tiles.walkability.slide_boxes_batch(
+            prev_xs + offset_xs, prev_ys + offset_ys, xs + offset_xs, ys + offset_ys,
+            np.maximum(widths // 2, 1), np.maximum(heights // 2, 1))
+        return resolved_xs - offset_xs, resolved_ys - offset_ys
+
     def spawn_mushrooms(self, count):
         """
         Spawn a specified number of mushrooms at random grass or forest tiles.
         """
+        spawnable = (TERRAIN_IDS['grass'], TERRAIN_IDS['forest'])
         spawned = 0
         attempts = 0
         max_attempts = count * 10  # Prevent infinite loops
         while spawned < count and attempts < max_attempts:
-            col = random.randint(0, (self.width // config.TILE_SIZE) - 1)
-            row = random.randint(0, (self.height // config.TILE_SIZE) - 1)
-            tile_index = row * (self.width // config.TILE_SIZE) + col
-            tile = self.tiles[tile_index]
-            if tile.tile_type in ['grass', 'forest'] and not tile.overlay:
-                x = tile.x + (config.TILE_SIZE - config.TILE_SIZE // 2) // 2  # Center the item
-                y = tile.y + (config.TILE_SIZE - config.TILE_SIZE // 2) // 2
+            col = random.randint(0, self.cols - 1)
+            row = random.randint(0, self.rows - 1)
+            terrain_id, overlay_id, _ = self.tiles.tile_at(col, row)
+            if terrain_id in spawnable and not overlay_id:
+                x = col * config.TILE_SIZE + (config.TILE_SIZE - config.TILE_SIZE // 2) // 2  # Center the item
+                y = row * config.TILE_SIZE + (config.TILE_SIZE - config.TILE_SIZE // 2) // 2
                 mushroom = Item(x, y, 'mushroom')
                 self.active_items.add(mushroom)
                 spawned += 1
@@ -0,0 +1,91 @@
+# world_cache.py
+
+import json
+import os
+import struct
+import numpy as np
+import config
+from terrain_gen import GENERATION_SETTINGS, GENERATOR_VERSION
+
+# File layout: magic, format version, header length, JSON header, then the
+# terrain, overlay and fruit layers as consecutive (rows, cols) uint8 arrays
+# starting at a page-aligned offset.
+MAGIC = b'ERWC'
+FORMAT_VERSION = 1
+PREFIX = struct.Struct('<4sII')
+DATA_ALIGNMENT = 4096
+
+
+def generation_params(cols, rows, fruit_count):
+    """
+    Everything that influences generated tile arrays. A cached world is only
+    reused when these match exactly.
+    """
+    params = {name: getattr(config, name) for name in GENERATION_SETTINGS}
+    params.update({
+        'generator_version': GENERATOR_VERSION,
+        'cols': cols,
+        'rows': rows,
+        'fruit_count': fruit_count,
+    })
+    return params
+
+
+def cache_path(cols, rows):
+    return os.path.join(config.WORLD_CACHE_DIR, f"world_{cols}x{rows}.bin")
+
+
+def _data_offset(header_length):
+    end = PREFIX.size + header_length
+    return -(-end // DATA_ALIGNMENT) * DATA_ALIGNMENT
+
+
+def load(params):
+    """
+    Memory-map a cached world matching `params`.
+    Returns (terrain, overlay, fruit) arrays, or None if there is no usable cache.
+    Pages are read from disk only when a chunk is first touched; the mapping is
+    copy-on-write, so in-game edits never reach the file.
+    """
+    path = cache_path(params['cols'], params['rows'])
+    try:
+        with open(path, 'rb') as f:
+            magic, version, header_length = PREFIX.unpack(f.read(PREFIX.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            header = json.loads(f.read(header_length).decode('utf-8'))
+    except (OSError, struct.error, ValueError):
+        return None
+    if header != params:
+        if config.DEBUG:
+            print("World cache is stale; regenerating.")
+        return None
+
+    shape = (3, params['rows'], params['cols'])
+    try:
+        layers = np.memmap(path, dtype=np.uint8, mode='c', offset=_data_offset(header_length), shape=shape)
+    except (OSError, ValueError) as e:
+        print(f"Unable to map world cache at {path}: {e}")
+        return None
+    return layers[0], layers[1], layers[2]
+
+
+def save(params, arrays):
+    """
+    Write generated (terrain, overlay, fruit) arrays to the cache file.
+    The file is written under a temporary name and swapped in atomically.
+    """
+    path = cache_path(params['cols'], params['rows'])
+    header = json.dumps(params, sort_keys=True).encode('utf-8')
+    temp_path = path + '.tmp'
+    try:
+        os.makedirs(config.WORLD_CACHE_DIR, exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            f.write(b'\0' * (_data_offset(len(header)) - PREFIX.size - len(header)))
+            for layer in arrays:
+                f.write(np.ascontiguousarray(layer, dtype=np.uint8).tobytes())
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Unable to write world cache at {path}: {e}")
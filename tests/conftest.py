@@ -0,0 +1,88 @@
+# conftest.py
+
+import os
+import random
+import sys
+
+# Headless: SDL's dummy drivers need no display or sound device
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+import pygame
+import pytest
+import config
+
+
+@pytest.fixture(scope='session')
+def window():
+    pygame.init()
+    yield pygame.display.set_mode((config.WIDTH, config.HEIGHT))
+    pygame.quit()
+
+
+@pytest.fixture
+def game(window):
+    """
+    A fresh Game on the headless window, with seeded randomness.
+    """
+    from game import Game
+    random.seed(1)
+    np.random.seed(1)
+    game = Game(window, pygame.time.Clock())
+    game.enemy_system.rng = np.random.default_rng(1)
+    game.player.delta_time = 1  # The HUD reads it before the player's first update
+    return game
+
+
+def pixels(surface):
+    """
+    Surface contents as bytes, for exact comparisons.
+    """
+    return pygame.image.tobytes(surface, 'RGB')
+
+
+def spawn_around_player(game, count, spread_x=300, spread_y=250):
+    """
+    Spawn `count` enemies scattered around the player, so frames have moving sprites.
+    """
+    system = game.enemy_system
+    enemy_type = system.type_names[0]
+    rng = np.random.default_rng(2)
+    for _ in range(count):
+        system.spawn(game.player.rect.x + int(rng.integers(-spread_x, spread_x)),
+                     game.player.rect.y + int(rng.integers(-spread_y, spread_y)), enemy_type)
+
+
+class PlanCounter:
+    """
+    Wraps a tracker's plan() to count the frames it redrew only in part.
+    """
+    def __init__(self, tracker):
+        self.plan = tracker.plan
+        self.partial = 0
+        tracker.plan = self
+
+    def __call__(self, key, sprites, changed):
+        rects = self.plan(key, sprites, changed)
+        self.partial += rects is not None
+        return rects
+
+
+def run_frames(game, count, on_frame=None):
+    """
+    Update and render `count` frames. After each one the window must be
+    identical to a full redraw of the same frame. Returns the frames that
+    were drawn in part.
+    """
+    counter = PlanCounter(game.dirty_rects)
+    for frame in range(count):
+        if on_frame:
+            on_frame(frame)
+        game.update()
+        game.render()
+        shown = pixels(game.window)
+        game.draw_frame(None)
+        assert pixels(game.window) == shown, f"frame {frame}"
+    return counter.partial
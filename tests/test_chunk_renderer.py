@@ -0,0 +1,97 @@
+# test_chunk_renderer.py
+
+import random
+import pygame
+import config
+from chunk_renderer import ChunkRenderer
+from conftest import pixels
+from tile_store import OVERLAY_IDS, TERRAIN_IDS, TERRAIN_TYPES
+
+MAGENTA = (255, 0, 255)  # Anything the renderer leaves undrawn shows up in comparisons
+
+
+class TerrainCheck:
+    """
+    Draws the terrain through the game's renderer, whose back-buffer is
+    scrolled and patched frame to frame, and through a second renderer whose
+    buffer is thrown away every frame, so every pixel is drawn from scratch.
+    """
+    def __init__(self, game):
+        self.world = game.world
+        self.camera = game.camera
+        self.renderer = game.world.renderer
+        self.reference = ChunkRenderer(game.world)
+        self.surface = pygame.Surface((self.camera.width, self.camera.height)).convert()
+        self.expected = self.surface.copy()
+
+    def move_to(self, x, y):
+        self.camera.offset_x = max(0, min(x, self.world.width - self.camera.width))
+        self.camera.offset_y = max(0, min(y, self.world.height - self.camera.height))
+
+    def matches(self, frame=0):
+        self.surface.fill(MAGENTA)
+        self.renderer.draw(self.surface, self.camera, frame)
+        self.reference.buffer = None
+        self.expected.fill(MAGENTA)
+        self.reference.draw(self.expected, self.camera, frame)
+        return pixels(self.surface) == pixels(self.expected)
+
+
+def test_scrolled_buffer_matches_full_redraw(game):
+    check = TerrainCheck(game)
+    rng = random.Random(3)
+    x, y = game.camera.offset_x, game.camera.offset_y
+    check.move_to(x, y)
+    assert check.matches()
+    first_buffer = check.renderer.buffer
+    start = (check.renderer.buffer_x, check.renderer.buffer_y)
+    for frame in range(150):
+        # Mostly steady scrolling, which leaves the buffer's margin every few frames
+        x += rng.randint(-2, 6)
+        y += rng.randint(-6, 2)
+        check.move_to(x, y)
+        assert check.matches(frame // 10), f"frame {frame}"
+    # The buffer was scrolled and patched with strips rather than replaced
+    assert check.renderer.buffer is first_buffer
+    assert (check.renderer.buffer_x, check.renderer.buffer_y) != start
+
+
+def test_jumps_match_full_redraw(game):
+    check = TerrainCheck(game)
+    rng = random.Random(4)
+    for frame in range(30):
+        check.move_to(rng.randint(0, game.world.width), rng.randint(0, game.world.height))
+        assert check.matches(frame), f"frame {frame}"
+        # A short hop after each jump reuses the freshly drawn buffer
+        check.move_to(check.camera.offset_x + rng.randint(-40, 40), check.camera.offset_y + rng.randint(-40, 40))
+        assert check.matches(frame), f"frame {frame} after hop"
+
+
+def test_edited_tiles_are_redrawn(game):
+    check = TerrainCheck(game)
+    tiles = game.world.tiles
+    rng = random.Random(5)
+    check.move_to(game.camera.offset_x, game.camera.offset_y)
+    assert check.matches()
+    for edit in range(10):
+        # Change a tile on screen between frames
+        before = pixels(check.surface)
+        col = (check.camera.offset_x + rng.randrange(check.camera.width)) // config.TILE_SIZE
+        row = (check.camera.offset_y + rng.randrange(check.camera.height)) // config.TILE_SIZE
+        tiles.set_tile(col, row, terrain=(tiles.terrain_at(col, row) + 1) % len(TERRAIN_TYPES))
+        if edit % 2:
+            check.move_to(check.camera.offset_x + rng.randint(-3, 3), check.camera.offset_y + rng.randint(-3, 3))
+            assert check.matches(), f"edit {edit}"
+        else:
+            assert check.matches(), f"edit {edit}"
+            assert pixels(check.surface) != before, f"edit {edit} not drawn"
+
+    # An overlay on water is drawn over the water plane
+    before = pixels(check.surface)
+    tiles.set_tile(col, row, terrain=TERRAIN_IDS['water'])
+    assert check.matches()
+    water = pixels(check.surface)
+    assert water != before, "water not drawn"
+    tiles.set_tile(col, row, overlay=OVERLAY_IDS['rock'])
+    assert check.matches()
+    assert pixels(check.surface) != water, "overlay on water not drawn"
@@ -0,0 +1,43 @@
+# test_dirty_rects.py
+
+import pygame
+from conftest import run_frames, spawn_around_player
+from dirty_rects import merge_rects
+
+
+def test_partial_frames_match_full_redraw(game):
+    spawn_around_player(game, 40)
+    game.add_notification("hello there", 30)
+
+    def on_frame(frame):
+        if frame == 60:
+            game.player.gold += 12345  # The HUD grows mid-run
+
+    partial = run_frames(game, 120, on_frame)
+    assert partial > 0
+
+
+def test_camera_moves_redraw_everything(game):
+    spawn_around_player(game, 10)
+    run_frames(game, 5)
+
+    def on_frame(frame):
+        game.player.rect.x += 3  # The camera follows the player every frame
+
+    assert run_frames(game, 20, on_frame) == 0
+
+
+def test_merge_rects():
+    merged = merge_rects([pygame.Rect(0, 0, 10, 10), pygame.Rect(5, 5, 10, 10), pygame.Rect(30, 30, 5, 5),
+                          pygame.Rect(14, 14, 20, 20), pygame.Rect(50, 50, 0, 10)])
+    assert sorted(merged) == [pygame.Rect(0, 0, 35, 35)]
+    merged = merge_rects([pygame.Rect(0, 0, 10, 10), pygame.Rect(10, 0, 10, 10)])
+    assert len(merged) == 2  # Touching rects do not overlap
+
+
+def test_expired_ui_is_cleared(game):
+    # A quiet scene, so the frame the notification disappears is drawn in part
+    for view in list(game.enemy_system.views):
+        game.enemy_system.despawn(view)
+    game.add_notification("gone soon", 10)
+    assert run_frames(game, 30) > 20
@@ -0,0 +1,60 @@
+# test_render_target.py
+
+import pygame
+import pytest
+from conftest import run_frames, spawn_around_player
+from dirty_rects import DirtyRectTracker
+from render_target import RenderTarget
+
+SCALES = (1, 0.5, 1 / 3, 0.4)  # Pixel for pixel, whole-number upscales and a stretched one
+
+
+def use_scale(game, scale):
+    """
+    Switch a game to drawing the world at `scale` of the window's resolution.
+    """
+    game.target = RenderTarget(game.window, scale)
+    game.camera.width, game.camera.height = game.target.size
+    game.camera.update(game.player, game.world)
+    game.dirty_rects = DirtyRectTracker(*game.target.size)
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def test_partial_frames_match_full_redraw(game, scale):
+    use_scale(game, scale)
+    spawn_around_player(game, 40)
+    game.add_notification(f"scale {scale}", 30)
+
+    def on_frame(frame):
+        if frame == 30:
+            game.player.gold += 12345
+
+    partial = run_frames(game, 60, on_frame)
+    assert partial > 0
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def test_upscaled_frame_fills_view(game, scale):
+    use_scale(game, scale)
+    game.update()
+    game.render()
+    target = game.target
+    window = game.window.get_rect()
+    assert window.contains(target.view)
+    # Whole-number upscales centre the view; any leftover border is black
+    assert abs(target.view.centerx - window.centerx) <= 1 and abs(target.view.centery - window.centery) <= 1
+    if target.view != window:
+        assert game.window.get_at((0, 0))[:3] == (0, 0, 0)
+    # A rect the size of the internal frame covers the whole view
+    assert target.to_window(target.surface.get_rect()) == target.view
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def test_window_and_internal_rects_round_trip(game, scale):
+    use_scale(game, scale)
+    target = game.target
+    for rect in (pygame.Rect(0, 0, 10, 10), pygame.Rect(17, 23, 41, 9), pygame.Rect(100, 80, 1, 1)):
+        # A rect mapped to the window and back covers at least the original
+        assert target.to_internal(target.to_window(rect)).contains(rect)
+    assert target.frame_point(target.view.center) == (target.size[0] // 2, target.size[1] // 2)
+    assert target.frame_point(target.view.topleft) == (0, 0)